@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks: Benchmarks for the colourlab package, run by asv
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import numpy as np
+from colourlab import space
+
+# Numbers of colour points for all the benchmarks
+sizes = [10**2, 10**4, 10**6]
+
+
+def colours(n, seed=0):
+    """
+    Return n random colours in XYZ, within the sRGB gamut.
+
+    Parameters
+    ----------
+    n : int
+        The number of colours.
+    seed : int
+        Seed of the random number generator.
+
+    Returns
+    -------
+    xyz : ndarray
+        n x 3 array of colours in XYZ.
+    """
+    rgb = np.random.RandomState(seed).rand(n, 3) * .9 + .05
+    return space.srgb.to_XYZ(rgb)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_metric: Benchmarks for the metric module, run by asv
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from colourlab import space, data, metric, tensor
+from . import colours, sizes
+
+_poincare_disk = space.TransformPoincareDisk(space.cielab, 100.)
+
+# The colour metrics, as functions of two Points
+metrics = {
+    'dE_ab': metric.dE_ab,
+    'dE_uv': metric.dE_uv,
+    'dE_00': metric.dE_00,
+    'dE_E': metric.dE_E,
+    'dE_DIN99': metric.dE_DIN99,
+    'dE_DIN99b': metric.dE_DIN99b,
+    'dE_DIN99c': metric.dE_DIN99c,
+    'dE_DIN99d': metric.dE_DIN99d,
+    'euclidean': lambda d1, d2: metric.euclidean(space.cielab, d1, d2),
+    'poincare_disk': lambda d1, d2: metric.poincare_disk(_poincare_disk,
+                                                         d1, d2),
+    'linear': lambda d1, d2: metric.linear(space.cielab, d1, d2,
+                                           tensor.dE_ab),
+}
+
+
+class TimeMetric:
+    params = [sorted(metrics), sizes]
+    param_names = ['metric', 'n']
+    timeout = 300
+
+    def setup(self, name, n):
+        self.xyz1 = colours(n, 0)
+        self.xyz2 = colours(n, 1)
+
+    def time_metric(self, name, n):
+        metrics[name](data.Points(space.xyz, self.xyz1),
+                      data.Points(space.xyz, self.xyz2))
+
+
+class TimePairwise:
+    params = [['dE_ab', 'dE_00'], [10**2, 10**3]]
+    param_names = ['metric', 'n']
+    timeout = 300
+
+    def setup(self, name, n):
+        self.xyz1 = colours(n, 0)
+        self.xyz2 = colours(n, 1)
+
+    def time_pairwise(self, name, n):
+        metric.pairwise(data.Points(space.xyz, self.xyz1),
+                        data.Points(space.xyz, self.xyz2), metrics[name])
+
+    def time_pairwise_nearest(self, name, n):
+        metric.pairwise(data.Points(space.xyz, self.xyz1),
+                        data.Points(space.xyz, self.xyz2), metrics[name],
+                        nearest=5)
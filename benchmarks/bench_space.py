@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_space: Benchmarks for the space module, run by asv
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import numpy as np
+from colourlab import space, data
+from . import colours, sizes
+
+# The colour space instances of the space module
+spaces = sorted(name for name in space._registry if not name.startswith('_'))
+
+
+class SpaceBenchmark:
+    """
+    Common setup of the colour space benchmarks.
+    """
+    params = [spaces, sizes]
+    param_names = ['space', 'n']
+    timeout = 300
+
+    def setup(self, name, n):
+        self.space = space.registered(name)
+        self.xyz = colours(n)
+        self.ndata = self.space.from_XYZ(self.xyz)
+
+
+class TimeFromXYZ(SpaceBenchmark):
+
+    def time_from_XYZ(self, name, n):
+        self.space.from_XYZ(self.xyz)
+
+
+class TimeToXYZ(SpaceBenchmark):
+
+    def setup(self, name, n):
+        super(TimeToXYZ, self).setup(name, n)
+        try:
+            self.space.to_XYZ(self.ndata[:1])
+        except RuntimeError:        # e.g., no inverse of CIEDE00
+            raise NotImplementedError
+
+    def time_to_XYZ(self, name, n):
+        self.space.to_XYZ(self.ndata)
+
+
+class TimeJacobian(SpaceBenchmark):
+
+    def time_jacobian_XYZ(self, name, n):
+        self.space.jacobian_XYZ(data.Points(space.xyz, self.xyz))
+
+    def time_inv_jacobian_XYZ(self, name, n):
+        self.space.inv_jacobian_XYZ(data.Points(space.xyz, self.xyz))
+
+
+class TimeTensorTransport(SpaceBenchmark):
+
+    def setup(self, name, n):
+        super(TimeTensorTransport, self).setup(name, n)
+        self.metrics = self.space.empty_matrix(self.xyz)
+        self.metrics[:] = np.eye(3)
+
+    def time_metrics_to_XYZ(self, name, n):
+        points = data.Points(space.xyz, self.xyz)
+        data.Tensors(self.space, self.metrics, points).get(space.xyz)
+
+    def time_metrics_from_XYZ(self, name, n):
+        points = data.Points(space.xyz, self.xyz)
+        data.Tensors(space.xyz, self.metrics, points).get(self.space)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_tensor: Benchmarks for the tensor module, run by asv
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from colourlab import space, data, tensor
+from . import colours, sizes
+
+_poincare_disk = space.TransformPoincareDisk(space.cielab, 100.)
+
+# The colour metric tensors, as functions of Points
+tensors = {
+    'dE_ab': tensor.dE_ab,
+    'dE_uv': tensor.dE_uv,
+    'dE_00': tensor.dE_00,
+    'dE_E': tensor.dE_E,
+    'dE_DIN99': tensor.dE_DIN99,
+    'dE_DIN99b': tensor.dE_DIN99b,
+    'dE_DIN99c': tensor.dE_DIN99c,
+    'dE_DIN99d': tensor.dE_DIN99d,
+    'euclidean': lambda dat: tensor.euclidean(space.cielab, dat),
+    'poincare_disk': lambda dat: tensor.poincare_disk(_poincare_disk, dat),
+}
+
+
+class TimeTensor:
+    params = [sorted(tensors), sizes]
+    param_names = ['tensor', 'n']
+    timeout = 300
+
+    def setup(self, name, n):
+        self.xyz = colours(n)
+
+    def time_tensor(self, name, n):
+        tensors[name](data.Points(space.xyz, self.xyz))
+
+    def time_tensor_XYZ(self, name, n):
+        tensors[name](data.Points(space.xyz, self.xyz)).get(space.xyz)
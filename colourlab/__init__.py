@@ -19,7 +19,22 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
-# Main file. Just import the other files.
+# Main file. The other files are imported when first used (PEP 562), so
+# that importing the package does not pull in matplotlib, scipy and numba.
 
-from colourlab import space, data, tensor, metric, \
-    statistics, misc, image, gamut
+import importlib
+
+__all__ = ['space', 'data', 'tensor', 'metric', 'linalg', 'statistics',
+           'misc', 'image', 'gamut', 'lut', 'parallel', 'adaptation',
+           'instrument']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module ' + repr(__name__) + ' has no attribute ' +
+                         repr(name))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
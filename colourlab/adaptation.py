@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+adaptation: Chromatic adaptation transforms, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import numpy as np
+from . import data, space
+
+
+# =============================================================================
+# Auxiliary functions
+# =============================================================================
+
+
+def white_key(white):
+    """
+    Return a hashable key for a white point.
+
+    Parameters
+    ----------
+    white : data.Points or ndarray
+        The white point, as Points or as an ndarray in XYZ.
+
+    Returns
+    -------
+    key : tuple
+        The XYZ coordinates of the white point.
+    """
+    if isinstance(white, data.Points):
+        white = white.get(space.xyz)
+    return tuple(float(w) for w in np.ravel(white))
+
+
+# =============================================================================
+# Chromatic adaptation transform
+# =============================================================================
+
+
+class CAT:
+    """
+    Chromatic adaptation of a colour data set to many white points.
+
+    The adaptation is a von Kries scaling in the cone-like colour space of
+    a chromatic adaptation transform, ciecat16 by default, combined with
+    the transforms to and from XYZ into one 3 x 3 matrix in XYZ for each
+    pair of source and destination white points. The colour data are
+    adapted to any number of white point pairs in one batched matrix
+    product, and the results are kept by white point pair:
+
+    .. code:: python
+
+        d65 = colourlab.data.white_D65
+        cat = colourlab.adaptation.CAT(col_data)
+        col_A, col_F11 = cat.adapt([(d65, colourlab.data.white_A),
+                                    (d65, colourlab.data.white_F11)])
+
+    For the colour space of the von Kries scaling, the result is the same
+    as with Points.new_white_point.
+    """
+
+    def __init__(self, dat, sp=space.ciecat16):
+        """
+        Construct instance for the given colour data.
+
+        Parameters
+        ----------
+        dat : data.Points
+            The colour data to adapt.
+        sp : space.TransformLinear
+            The colour space of the von Kries scaling, linear from XYZ.
+        """
+        self.data = dat
+        self.space = sp
+        self.matrices = dict()      # adaptation matrices by white point pair
+        self.results = dict()       # adapted data by white point pair
+
+    def matrix(self, from_white, to_white):
+        """
+        Return the adaptation matrix in XYZ for the given white points.
+
+        Parameters
+        ----------
+        from_white : data.Points or ndarray
+            The white point of the colour data.
+        to_white : data.Points or ndarray
+            The white point to adapt to.
+
+        Returns
+        -------
+        matrix : ndarray
+            3 x 3 matrix taking XYZ data from from_white to to_white.
+        """
+        key = (white_key(from_white), white_key(to_white))
+        if key not in self.matrices:
+            wh_in = self.space.from_XYZ(np.array(key[0]))
+            wh_out = self.space.from_XYZ(np.array(key[1]))
+            self.matrices[key] = np.dot(
+                self.space.M_inv * (wh_out / wh_in), self.space.M)
+        return self.matrices[key]
+
+    def adapt(self, pairs):
+        """
+        Return the colour data adapted for the given white point pairs.
+
+        The data for the pairs not already adapted are computed as one
+        K x P x 3 batched matrix product in XYZ.
+
+        Parameters
+        ----------
+        pairs : list
+            List of K (from_white, to_white) pairs of white points.
+
+        Returns
+        -------
+        adapted : list
+            List of the K adapted data sets as Points in XYZ.
+        """
+        keys = [(white_key(f), white_key(t)) for f, t in pairs]
+        new_keys = [key for key in dict.fromkeys(keys)
+                    if key not in self.results]
+        if len(new_keys) > 0:
+            xyz_ = self.data.get_flattened(space.xyz)
+            mats = np.array([self.matrix(*key) for key in new_keys],
+                            xyz_.dtype)
+            adapted = np.matmul(xyz_, np.transpose(mats, (0, 2, 1)))
+            for key, ndata in zip(new_keys, adapted):
+                self.results[key] = data.Points(
+                    space.xyz, np.reshape(ndata, self.data.sh),
+                    dtype=self.data.dtype,
+                    cache_policy=self.data.cache_policy)
+        return [self.results[key] for key in keys]
+
+    def get(self, from_white, to_white):
+        """
+        Return the colour data adapted for the given white point pair.
+
+        Parameters
+        ----------
+        from_white : data.Points or ndarray
+            The white point of the colour data.
+        to_white : data.Points or ndarray
+            The white point to adapt to.
+
+        Returns
+        -------
+        adapted : data.Points
+            The adapted colour data in XYZ.
+        """
+        return self.adapt([(from_white, to_white)])[0]
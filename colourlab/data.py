@@ -20,10 +20,231 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 import os
 import re
+import shutil
+import tempfile
+import weakref
+import collections
 import numpy as np
 import inspect
-from matplotlib.patches import Ellipse
-from . import space, misc
+from . import space, misc, instrument, parallel
+
+
+# =============================================================================
+# Precision
+# =============================================================================
+
+_default_dtype = np.float64
+
+
+def _float_dtype(dtype):
+    """
+    Return the given floating point type, or the default if None.
+
+    Parameters
+    ----------
+    dtype : dtype
+        numpy.float32, numpy.float64, or None.
+
+    Returns
+    -------
+    dtype : type
+        numpy.float32 or numpy.float64.
+    """
+    if dtype is None:
+        return _default_dtype
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError('Unsupported floating point type: ' + str(dtype))
+    return dtype.type
+
+
+def set_default_dtype(dtype):
+    """
+    Set the floating point type of colour data constructed hereafter.
+
+    With numpy.float32, the data, the cached conversions and the
+    Jacobians of Points, Vectors and Tensors are kept in single
+    precision, halving the memory use. Numerically sensitive steps of
+    the conversions are still carried out in double precision.
+
+    Parameters
+    ----------
+    dtype : dtype
+        numpy.float64 (the default) or numpy.float32.
+    """
+    global _default_dtype
+    _default_dtype = _float_dtype(dtype)
+
+
+def get_default_dtype():
+    """
+    Return the floating point type of new colour data.
+
+    Returns
+    -------
+    dtype : type
+        numpy.float32 or numpy.float64.
+    """
+    return _default_dtype
+
+
+# =============================================================================
+# Conversion caches
+# =============================================================================
+
+
+class CachePolicy:
+    """
+    Policy for the caches of converted data in Points, Vectors and Tensors.
+    """
+
+    def __init__(self, budget=None, cache_private=True):
+        """
+        Construct new policy.
+
+        Parameters
+        ----------
+        budget : int
+            The maximum number of bytes of each cache, or None for no
+            limit. The least recently used data are evicted when the
+            budget is exceeded, except the given data and their XYZ
+            version, which are always kept.
+        cache_private : bool
+            If False, data in private colour spaces, i.e., the
+            intermediate spaces of the built-in colour spaces such as
+            space._din99d_lef, are not cached.
+        """
+        self.budget = budget
+        self.cache_private = cache_private
+
+
+class Cache:
+    """
+    Dictionary of colour data in different colour spaces with eviction.
+
+    Works as a dictionary with the colour spaces as keys, but stores data
+    according to a CachePolicy, and evicts the least recently used data
+    when the byte budget of the policy is exceeded. Pinned data are never
+    evicted.
+    """
+
+    def __init__(self, policy=None):
+        """
+        Construct new empty cache.
+
+        Parameters
+        ----------
+        policy : CachePolicy
+            The policy of the cache. Defaults to get_default_cache_policy().
+        """
+        self.policy = _default_cache_policy if policy is None else policy
+        self.entries = collections.OrderedDict()
+        self.pinned = set()
+        self.nbytes = 0
+
+    def __contains__(self, sp):
+        return sp in self.entries
+
+    def __getitem__(self, sp):
+        ndata = self.entries[sp]
+        self.entries.move_to_end(sp)
+        return ndata
+
+    def peek(self, sp):
+        """
+        Return the data in a colour space without counting it as a use.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space of the data.
+
+        Returns
+        -------
+        ndata : ndarray
+            The data, without changing the order of eviction.
+        """
+        return self.entries[sp]
+
+    def __setitem__(self, sp, ndata):
+        if sp not in self.pinned and sp.private and \
+                not self.policy.cache_private:
+            return
+        nbytes = ndata.nbytes
+        if sp in self.entries:
+            nbytes -= self.entries[sp].nbytes
+        self.entries[sp] = ndata
+        self.entries.move_to_end(sp)
+        self.nbytes += nbytes
+        if instrument.enabled:
+            instrument.count(sp, 'cache', nbytes=nbytes)
+        self.evict()
+
+    def __delitem__(self, sp):
+        nbytes = self.entries.pop(sp).nbytes
+        self.nbytes -= nbytes
+        self.pinned.discard(sp)
+        if instrument.enabled:
+            instrument.count(sp, 'cache', nbytes=-nbytes, evictions=1,
+                             calls=0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def pin(self, sp):
+        """
+        Keep the data in the given colour space regardless of the budget.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space of the data.
+        """
+        self.pinned.add(sp)
+
+    def evict(self):
+        """
+        Evict least recently used data until the budget is met.
+        """
+        if self.policy.budget is None:
+            return
+        for sp in list(self.entries):
+            if self.nbytes <= self.policy.budget:
+                break
+            if sp not in self.pinned:
+                del self[sp]
+
+
+_default_cache_policy = CachePolicy()
+
+
+def set_default_cache_policy(policy):
+    """
+    Set the cache policy of colour data constructed hereafter.
+
+    Parameters
+    ----------
+    policy : CachePolicy
+        The new default policy. The initial default has no budget and
+        caches all colour spaces.
+    """
+    global _default_cache_policy
+    _default_cache_policy = policy
+
+
+def get_default_cache_policy():
+    """
+    Return the cache policy of new colour data.
+
+    Returns
+    -------
+    policy : CachePolicy
+        The default cache policy.
+    """
+    return _default_cache_policy
 
 
 # =============================================================================
@@ -36,7 +257,8 @@ class Points:
     Class for keeping colour data in various colour spaces and shapes.
     """
 
-    def __init__(self, sp, ndata):
+    def __init__(self, sp, ndata, workspace=None, dtype=None,
+                 cache_policy=None):
         """
         Construct new instance and set colour space and data.
 
@@ -46,10 +268,27 @@ class Points:
             The colour space for the given instanisiation data.
         ndata : ndarray
             The colour data in the given space.
+        workspace : space.Workspace
+            Optional workspace providing the arrays for the converted
+            data. The converted data of a previous Points instance
+            of the same size using the same workspace are overwritten.
+        dtype : dtype
+            The floating point type of the data, numpy.float32 or
+            numpy.float64. Defaults to get_default_dtype().
+        cache_policy : CachePolicy
+            The policy for the cache of converted data, also used by
+            Vectors and Tensors at the points. Defaults to
+            get_default_cache_policy().
         """
+        self.cache_policy = (_default_cache_policy if cache_policy is None
+                             else cache_policy)
         self.data = None
+        self.paths = None
         self.sh = None
-        self.flattened_XYZ = None
+        self.source = None
+        self._flattened_XYZ = None
+        self.workspace = workspace
+        self.dtype = _float_dtype(dtype)
         self.set(sp, ndata)
 
     def flatten(self, ndata):
@@ -77,13 +316,35 @@ class Points:
         C_data = sh[len(sh) - 1]
         return np.reshape(ndata, [P_data, C_data])
 
+    def buffer(self, sp):
+        """
+        Return array from the workspace for the data in the given space.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space of the data to be stored.
+
+        Returns
+        -------
+        buffer : ndarray
+            P x C array, or None if the instance has no workspace.
+        """
+        if self.workspace is None:
+            return None
+        return self.workspace.array(sp, (int(np.prod(self.sh[:-1])),
+                                         self.sh[-1]), self.dtype)
+
     def set(self, sp, ndata):
         """
         Set colour space and data.
 
-        A new dictionary is constructed, and the data are added in the
-        provided colour space, as well as in the XYZ colour space
-        (using the SpaceXYZ class).
+        A new cache is constructed, and the data are added in the
+        provided colour space. The data in the XYZ colour space (using
+        the SpaceXYZ class) are computed when first needed, see
+        flattened_XYZ. Neither are evicted from the cache. Floating
+        point data are stored with the floating point type of the
+        instance, integer data as given.
 
         Parameters
         ----------
@@ -92,29 +353,68 @@ class Points:
         ndata : ndarray
             The colour data in the given space.
         """
-        ndata = np.array(ndata)
-        self.data = dict()
+        ndata = np.asarray(ndata)
+        ndata = np.array(ndata, self.dtype if ndata.dtype.kind == 'f'
+                         else None)
+        self.data = Cache(self.cache_policy)
+        self.data.pin(sp)
+        self.data.pin(space.xyz)
         self.data[sp] = ndata
+        self.paths = dict()
         self.sh = ndata.shape
-        flattened_data = self.flatten(ndata)
-        if sp == space.xyz:
-            self.flattened_XYZ = flattened_data
-        else:
-            self.flattened_XYZ = sp.to_XYZ(flattened_data)
-            self.data[space.xyz] = np.reshape(self.flattened_XYZ, self.sh)
+        self.source = sp
+        self._flattened_XYZ = None
 
-    def get(self, sp):
+    @property
+    def flattened_XYZ(self):
+        """
+        The colour data in XYZ as a P x 3 array.
+
+        Converted from the given data on first use, so that data that
+        are only used in the colour space they were given in are never
+        converted to XYZ.
+        """
+        if self._flattened_XYZ is None:
+            self._flattened_XYZ = self.convert_XYZ()
+            self.data[space.xyz] = np.reshape(self._flattened_XYZ, self.sh)
+        return self._flattened_XYZ
+
+    def convert_XYZ(self):
+        """
+        Convert the given data to XYZ.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x 3 array of the colour data in XYZ.
+        """
+        flattened_data = self.flatten(self.data[self.source])
+        if self.source == space.xyz:
+            return flattened_data.astype(self.dtype, copy=False)
+        out = self.buffer(space.xyz)
+        if out is None and flattened_data.dtype.kind != 'f':
+            out = np.empty(np.shape(flattened_data), self.dtype)
+        return self.source.to_XYZ(flattened_data, out).astype(self.dtype,
+                                                              copy=False)
+
+    def get(self, sp, out=None):
         """
         Return colour data in required colour space.
 
         If the data do not currently exist in the required colour
         space, the necessary colour conversion will take place, and
-        the results stored in the object or future use.
+        the results stored in the object or future use, as far as the
+        cache policy allows. The conversion starts from the nearest
+        colour space with existing data, see plan, and the path used is
+        stored in the paths dictionary. If an output array is given, the
+        data are written to it instead, and not stored.
 
         Parameters
         ----------
         sp : space.Space
             The colour space for the returned data.
+        out : ndarray
+            Optional array for the result, of the same shape as the data.
 
         Returns
         -------
@@ -122,12 +422,133 @@ class Points:
             The colour data in the given colour space.
         """
         if sp in self.data:
-            return self.data[sp]
-        else:
-            flattened_data = sp.from_XYZ(self.flattened_XYZ)
+            if instrument.enabled:
+                instrument.count(sp, 'get', hits=1)
+            if out is None:
+                return self.data[sp]
+            out[...] = self.data[sp]
+            return out
+        if instrument.enabled:
+            instrument.count(sp, 'get', misses=1)
+        path = self.plan(sp)
+        if out is None:
+            flattened_data = self.run(path, self.buffer(sp))
             ndata = np.reshape(flattened_data, self.sh)
             self.data[sp] = ndata
+            self.paths[sp] = path
             return ndata
+        else:
+            flattened_out = self.flatten(out)
+            flattened_data = self.run(path, flattened_out)
+            if not np.may_share_memory(flattened_data, out):
+                out[...] = np.reshape(flattened_data, self.sh)
+            return out
+
+    def plan(self, sp):
+        """
+        Return the conversion path to the required colour space.
+
+        The base links of the colour transforms form a tree with XYZ at
+        the root. The path follows the links from the required colour
+        space towards XYZ until a colour space with existing data in the
+        object, or XYZ, is found, so that, e.g., CIELCh data are computed
+        directly from existing CIELAB data rather than from XYZ. Integer
+        encoded data are not used as starting points.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space for the data.
+
+        Returns
+        -------
+        path : list
+            The colour spaces of the conversion, starting with the space
+            with existing data and ending with the required space.
+        """
+        path = [sp]
+        while not (path[-1] == space.xyz or
+                   (path[-1] in self.data and
+                    self.data.peek(path[-1]).dtype.kind == 'f')):
+            if isinstance(path[-1], space.Transform):
+                path.append(path[-1].base)
+            else:
+                path.append(space.xyz)
+        path.reverse()
+        return path
+
+    def convert(self, path, out=None, index=slice(None)):
+        """
+        Convert the data along the given conversion path.
+
+        Parameters
+        ----------
+        path : list
+            The colour spaces of the conversion as returned by plan.
+        out : ndarray
+            Optional array for the result.
+        index : slice
+            The part of the P flattened colours to convert, all by default.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x C array (or the given part of it) of the colour data in
+            the last space of the path.
+        """
+        if path[0] == space.xyz:
+            col = self.flattened_XYZ[index]
+        else:
+            col = self.flatten(self.data[path[0]])[index]
+        for base, sp in zip(path[:-1], path[1:]):
+            if isinstance(sp, space.Transform) and sp.base is base:
+                if instrument.enabled:
+                    col = instrument.timed(sp, 'from_base', 1, sp.call_base,
+                                           'from_base', col, out)
+                else:
+                    col = sp.call_base('from_base', col, out)
+            else:
+                col = sp.from_XYZ(col, out)
+            out = col
+        return col
+
+    def run(self, path, out=None):
+        """
+        Convert the data along the given conversion path.
+
+        With an executor in effect, see colourlab.parallel, the colours
+        are converted in chunks in parallel, written directly to the
+        output array. Otherwise, the same as convert.
+
+        Parameters
+        ----------
+        path : list
+            The colour spaces of the conversion as returned by plan.
+        out : ndarray
+            Optional P x C array for the result.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x C array of the colour data in the last space of the path.
+        """
+        if parallel.current()[0] is None:
+            return self.convert(path, out)
+        if path[0] == space.xyz:
+            source = self.flattened_XYZ     # converted before the chunks
+        else:
+            source = self.flatten(self.data[path[0]])
+        if out is None:
+            out = np.empty(np.shape(source), space.float_type(source))
+
+        def convert_chunk(chunk):
+            col = out[chunk]
+            res = self.convert(path, col, chunk)
+            if res is not col:
+                col[...] = res
+
+        parallel.run_chunks(convert_chunk, len(out), 2 * out[:1].nbytes)
+        return out
 
     def get_flattened(self, sp):
         """
@@ -175,7 +596,331 @@ class Points:
         von_kries_mat = np.array([[wh_out[0] / wh_in[0], 0, 0],
                                   [0, wh_out[1] / wh_in[1], 0],
                                   [0, 0, wh_out[2] / wh_in[2]]])
-        return Points(sp, self.get(space.TransformLinear(sp, von_kries_mat)))
+        return Points(sp, self.get(space.intern(
+            space.TransformLinear(sp, von_kries_mat))),
+                      dtype=self.dtype, cache_policy=self.cache_policy)
+
+
+class MappedPoints(Points):
+    """
+    Colour data kept in memory-mapped files rather than in memory.
+
+    The given data are used as they are, without copying, typically a
+    numpy.memmap or a .npy file. The data in XYZ and in all the colour
+    spaces requested later are stored in .npy files in a directory, and
+    the conversions are carried out in chunks of a bounded number of
+    colours. Data sets much larger than the available memory can thus be
+    converted. Methods computing other quantities from the data, such as
+    the Jacobians, work on the whole data set in memory.
+    """
+
+    def __init__(self, sp, ndata, directory=None, chunk_size=2**18,
+                 dtype=None, cache_policy=None):
+        """
+        Construct new instance and set colour space and data.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space for the given instanisiation data.
+        ndata : ndarray or str
+            The colour data in the given space, or the name of a .npy
+            file with the data, which is opened in memory-mapped mode.
+        directory : str
+            Directory for the files of the converted data, one for each
+            colour space. Should not be shared with other instances.
+            Defaults to a temporary directory, which is removed with
+            the instance.
+        chunk_size : int
+            The number of colours converted at a time.
+        dtype : dtype
+            The floating point type of the converted data, numpy.float32
+            or numpy.float64. Defaults to get_default_dtype().
+        cache_policy : CachePolicy
+            The policy for the cache of converted data. Evicted data
+            are only removed from the cache, not from the directory.
+        """
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='colourlab-')
+            weakref.finalize(self, shutil.rmtree, directory, True)
+        self.directory = directory
+        self.chunk_size = int(chunk_size)
+        self.files = None
+        self.file_count = 0     # never reused, arrays may still be held
+        super(MappedPoints, self).__init__(sp, ndata, dtype=dtype,
+                                           cache_policy=cache_policy)
+
+    def chunks(self):
+        """
+        Generate the slices of the flattened data to convert at a time.
+
+        Returns
+        -------
+        chunks : generator
+            Slices of at most chunk_size colours covering the data.
+        """
+        n = int(np.prod(self.sh[:-1]))
+        for start in range(0, n, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, n))
+
+    def mapped_array(self, sp):
+        """
+        Return a new memory-mapped array for the data in a colour space.
+
+        Each array gets a new file, so that arrays returned earlier, e.g.,
+        for data since evicted from the cache, are not overwritten.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space of the data to be stored.
+
+        Returns
+        -------
+        ndata : numpy.memmap
+            Array of the shape of the data, backed by a .npy file in the
+            directory of the instance.
+        """
+        filename = os.path.join(self.directory, 'space%d.npy' %
+                                self.file_count)
+        self.file_count += 1
+        self.files[sp] = filename
+        return np.lib.format.open_memmap(filename, mode='w+',
+                                         dtype=self.dtype, shape=self.sh)
+
+    def set(self, sp, ndata):
+        """
+        Set colour space and data.
+
+        The data are kept as given, and converted to XYZ in chunks when
+        first needed, unless they are already XYZ data of the floating
+        point type of the instance.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space for the given instanisiation data.
+        ndata : ndarray or str
+            The colour data in the given space, or the name of a .npy
+            file with the data.
+        """
+        if isinstance(ndata, str):
+            ndata = np.load(ndata, mmap_mode='r')
+        self.data = Cache(self.cache_policy)
+        self.data.pin(sp)
+        self.data.pin(space.xyz)
+        self.data[sp] = ndata
+        self.paths = dict()
+        self.files = dict()
+        self.sh = ndata.shape
+        self.source = sp
+        self._flattened_XYZ = None
+
+    def convert_XYZ(self):
+        """
+        Convert the given data to XYZ in chunks.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x 3 memory-mapped array of the colour data in XYZ.
+        """
+        ndata = self.data[self.source]
+        if self.source == space.xyz and ndata.dtype == self.dtype:
+            return self.flatten(ndata)
+        xyz_ = self.mapped_array(space.xyz)
+        flattened_data = self.flatten(ndata)
+        flattened_XYZ = self.flatten(xyz_)
+        for chunk in self.chunks():
+            col = flattened_XYZ[chunk]
+            res = self.source.to_XYZ(flattened_data[chunk], col)
+            if res is not col:
+                col[...] = res
+        xyz_.flush()
+        return flattened_XYZ
+
+    def get(self, sp, out=None):
+        """
+        Return colour data in required colour space.
+
+        If the data do not currently exist in the required colour
+        space, they are converted in chunks to a new memory-mapped
+        array, which is stored in the object for future use. If an
+        output array is given, the data are written to it instead, and
+        not stored.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space for the returned data.
+        out : ndarray
+            Optional array for the result, of the same shape as the data.
+
+        Returns
+        -------
+        ndata : ndarray
+            The colour data in the given colour space.
+        """
+        if sp in self.data or sp == space.xyz:
+            return super(MappedPoints, self).get(sp, out)
+        path = self.plan(sp)
+        ndata = self.mapped_array(sp) if out is None else out
+        flattened_data = self.flatten(ndata)
+        for chunk in self.chunks():
+            col = flattened_data[chunk]
+            res = self.convert(path, col, chunk)
+            if res is not col:
+                col[...] = res
+        if out is None:
+            ndata.flush()
+            self.data[sp] = ndata
+            self.paths[sp] = path
+        elif not np.may_share_memory(flattened_data, out):
+            out[...] = np.reshape(flattened_data, self.sh)
+        return ndata
+
+
+class GridPoints:
+    """
+    Regular grid of colour data, generated in chunks when needed.
+
+    The coordinates of the grid points are computed from their indices,
+    so that the full grid is never held in memory unless requested. The
+    grid points are ordered as by d_regular, with the z values varying
+    fastest. Grids much larger than the available memory can thus be
+    converted chunk by chunk:
+
+    .. code:: python
+
+        cube = colourlab.data.GridPoints(colourlab.space.srgb, *3 * [
+            np.linspace(0, 1, 1024)])
+        for chunk, points in cube.iter_points():
+            lab = points.get(colourlab.space.cielab)
+    """
+
+    def __init__(self, sp, x_val, y_val, z_val, chunk_size=2**18,
+                 dtype=None):
+        """
+        Construct new instance.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space of the grid.
+        x_val : ndarray
+            Array of x values.
+        y_val : ndarray
+            Array of y values.
+        z_val : ndarray
+            Array of z values.
+        chunk_size : int
+            The number of grid points generated at a time.
+        dtype : dtype
+            The floating point type of the data, numpy.float32 or
+            numpy.float64. Defaults to get_default_dtype().
+        """
+        self.sp = sp
+        self.dtype = _float_dtype(dtype)
+        self.axes = [np.asarray(val, self.dtype).ravel()
+                     for val in (x_val, y_val, z_val)]
+        self.shape = tuple(len(val) for val in self.axes)
+        self.chunk_size = int(chunk_size)
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def chunks(self):
+        """
+        Generate the slices of the flattened grid to generate at a time.
+
+        Returns
+        -------
+        chunks : generator
+            Slices of at most chunk_size grid points covering the grid.
+        """
+        n = len(self)
+        for start in range(0, n, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, n))
+
+    def coordinates(self, index=slice(None)):
+        """
+        Return the coordinates of the given grid points.
+
+        Parameters
+        ----------
+        index : slice or ndarray
+            The indices of the grid points in the flattened grid, all by
+            default.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x 3 array of colour data in the colour space of the grid.
+        """
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(len(self)))
+        ijk = np.unravel_index(index, self.shape)
+        return np.stack([val[i] for val, i in zip(self.axes, ijk)], axis=-1)
+
+    def points(self, index=slice(None)):
+        """
+        Return the given grid points as a Points instance.
+
+        Parameters
+        ----------
+        index : slice or ndarray
+            The indices of the grid points in the flattened grid, all by
+            default.
+
+        Returns
+        -------
+        data : data.Points
+            The colour data of the grid points.
+        """
+        return Points(self.sp, self.coordinates(index), dtype=self.dtype)
+
+    def iter_points(self):
+        """
+        Generate the grid chunk by chunk.
+
+        Returns
+        -------
+        chunks : generator
+            Pairs of the slice of the flattened grid and the Points
+            instance of the chunk.
+        """
+        for chunk in self.chunks():
+            yield chunk, self.points(chunk)
+
+    def get(self, sp, out=None):
+        """
+        Return the grid in the required colour space.
+
+        The grid is generated and converted chunk by chunk, so that only
+        the result, which can be a numpy.memmap, takes the full size.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space for the returned data.
+        out : ndarray
+            Optional array for the result, of the shape P x 3 or
+            nx x ny x nz x 3.
+
+        Returns
+        -------
+        ndata : ndarray
+            The colour data of the grid in the given colour space, P x 3
+            if no output array is given.
+        """
+        if out is None:
+            out = np.empty((len(self), 3), self.dtype)
+        flattened_out = np.reshape(out, (len(self), 3))
+        for chunk, points in self.iter_points():
+            points.get(sp, flattened_out[chunk])
+        if not np.may_share_memory(flattened_out, out):
+            out[...] = np.reshape(flattened_out, np.shape(out))
+        return out
 
 
 class Vectors:
@@ -199,7 +944,8 @@ class Vectors:
         self.points = None
         self.vectors = None
         self.sh = None
-        self.flattened_XYZ = None
+        self.source = None
+        self._flattened_XYZ = None
         self.set(sp, vectors_ndata, points_data)
 
     def flatten(self, ndata):
@@ -233,9 +979,9 @@ class Vectors:
         Set colour sp, points, and vectorss data.
 
         The points_data are taken care already of the type Points. A new
-        dictionary is constructed, and the vectors_ndata are added in
-        the provided colour space, as well as in the XYZ colour space
-        (using the SpaceXYZ class).
+        cache is constructed, and the vectors_ndata are added in
+        the provided colour space. The data in the XYZ colour space
+        (using the SpaceXYZ class) are computed when first needed.
 
         Parameters
         ----------
@@ -248,16 +994,30 @@ class Vectors:
         """
 
         self.points = points_data
-        self.vectors = dict()
-        vectors_ndata = np.array(vectors_ndata)
+        self.vectors = Cache(points_data.cache_policy)
+        self.vectors.pin(sp)
+        self.vectors.pin(space.xyz)
+        vectors_ndata = np.array(vectors_ndata, points_data.dtype)
         self.vectors[sp] = vectors_ndata
         self.sh = vectors_ndata.shape
-        flattened_data = self.flatten(vectors_ndata)
-        if sp == space.xyz:
-            self.flattened_XYZ = flattened_data
-        else:
-            self.flattened_XYZ = sp.vectors_to_XYZ(self.points, flattened_data)
-            self.vectors[space.xyz] = np.reshape(self.flattened_XYZ, self.sh)
+        self.source = sp
+        self._flattened_XYZ = None
+
+    @property
+    def flattened_XYZ(self):
+        """
+        The vector data in XYZ as a P x 3 array, converted on first use.
+        """
+        if self._flattened_XYZ is None:
+            flattened_data = self.flatten(self.vectors[self.source])
+            if self.source == space.xyz:
+                self._flattened_XYZ = flattened_data
+            else:
+                self._flattened_XYZ = self.source.vectors_to_XYZ(
+                    self.points, flattened_data)
+                self.vectors[space.xyz] = np.reshape(self._flattened_XYZ,
+                                                     self.sh)
+        return self._flattened_XYZ
 
     def get(self, sp):
         """
@@ -338,7 +1098,8 @@ class Tensors:
         self.points = None
         self.metrics = None
         self.sh = None
-        self.flattened_XYZ = None
+        self.source = None
+        self._flattened_XYZ = None
         self.set(sp, metrics_ndata, points_data)
 
     def flatten(self, ndata):
@@ -371,9 +1132,9 @@ class Tensors:
         Set colour sp, points, and metrics data.
 
         The points_data are taken care already of the type Points. A new
-        dictionary is constructed, and the metrics_ndata are added in
-        the provided colour space, as well as in the XYZ colour space
-        (using thespace.SpaceXYZ class).
+        cache is constructed, and the metrics_ndata are added in
+        the provided colour space. The data in the XYZ colour space
+        (using the space.SpaceXYZ class) are computed when first needed.
 
         Parameters
         ----------
@@ -385,15 +1146,30 @@ class Tensors:
             The colour points for the given tensor data.
         """
         self.points = points_data
-        self.metrics = dict()
+        self.metrics = Cache(points_data.cache_policy)
+        self.metrics.pin(sp)
+        self.metrics.pin(space.xyz)
+        metrics_ndata = np.asarray(metrics_ndata, points_data.dtype)
         self.sh = metrics_ndata.shape
         self.metrics[sp] = metrics_ndata
-        flattened_data = self.flatten(metrics_ndata)
-        if sp == space.xyz:
-            self.flattened_XYZ = flattened_data
-        else:
-            self.flattened_XYZ = sp.metrics_to_XYZ(points_data, flattened_data)
-            self.metrics[space.xyz] = np.reshape(self.flattened_XYZ, self.sh)
+        self.source = sp
+        self._flattened_XYZ = None
+
+    @property
+    def flattened_XYZ(self):
+        """
+        The tensor data in XYZ as a P x 3 x 3 array, converted on first use.
+        """
+        if self._flattened_XYZ is None:
+            flattened_data = self.flatten(self.metrics[self.source])
+            if self.source == space.xyz:
+                self._flattened_XYZ = flattened_data
+            else:
+                self._flattened_XYZ = self.source.metrics_to_XYZ(
+                    self.points, flattened_data)
+                self.metrics[space.xyz] = np.reshape(self._flattened_XYZ,
+                                                     self.sh)
+        return self._flattened_XYZ
 
     def get(self, sp):
         """
@@ -505,6 +1281,7 @@ class Tensors:
         ellipses : list
             List of Ellipse objects.
         """
+        from matplotlib.patches import Ellipse
         a_b_theta = self.get_ellipse_parameters(sp, plane, scale)
         points = self.points.get_flattened(sp).copy()
         points = points[:, plane]
@@ -604,34 +1381,162 @@ def resource_path(relative):
             inspect.getsourcefile(resource_path))) + '/' + relative
 
 
-def read_csv_file(filename, pad=-np.inf):
+# Binary cache of the data files
+
+_dataset_cache_dir = None
+_datasets = dict()      # read-only contents by file name, size and time
+
+
+def dataset_cache_dir():
     """
-    Read a CSV file and return pylab array.
+    Return the directory of the binary cache of the data files.
+
+    Set by set_dataset_cache_dir, or by the environment variable
+    COLOURLAB_CACHE. Otherwise, colourlab in the user's cache directory
+    ($XDG_CACHE_HOME or ~/.cache).
+
+    Returns
+    -------
+    directory : string
+        The cache directory.
+    """
+    if _dataset_cache_dir is not None:
+        return _dataset_cache_dir
+    if 'COLOURLAB_CACHE' in os.environ:
+        return os.environ['COLOURLAB_CACHE']
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or
+                        os.path.join(os.path.expanduser('~'), '.cache'),
+                        'colourlab')
+
+
+def set_dataset_cache_dir(directory):
+    """
+    Set the directory of the binary cache of the data files.
+
+    Parameters
+    ----------
+    directory : string
+        The cache directory, or None for the default, see
+        dataset_cache_dir.
+    """
+    global _dataset_cache_dir
+    _dataset_cache_dir = directory
+
+
+def load_dataset(filename, parse):
+    """
+    Return the numerical content of a data file, cached in binary form.
+
+    The first time, the file is parsed by the given function, and the
+    result is saved in the cache directory, see dataset_cache_dir, as .npy
+    for an array, and as .npz for a dictionary of arrays. The name of the
+    cache file includes the size and modification time of the data file,
+    so that the cache is rebuilt when the data file changes. If the cache
+    directory cannot be written, the file is parsed once per process.
+    Within a process, the content is also kept in memory, read only.
 
     Parameters
     ----------
     filename : string
-        Name of the CSV file to read
-    pad : float
-        Value to pad for missing values.
+        Name of the data file, relative to the package, or absolute.
+    parse : function
+        Function of the full path name of the data file, returning an
+        ndarray or a dictionary of ndarrays.
 
     Returns
     -------
-    csv_array : ndarray
-        The content of the file plus padding.
+    content : ndarray or dict
+        The read-only array, possibly memory-mapped, or a new dictionary
+        of read-only arrays.
+    """
+    if os.path.isabs(filename):
+        source = filename
+    else:
+        source = resource_path(filename)
+    stat = os.stat(source)
+    memo_key = (source, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _datasets:
+        for old in [old for old in _datasets if old[0] == source]:
+            del _datasets[old]
+        content = _cached_dataset(filename, source, stat, parse)
+        for ndata in (content.values() if isinstance(content, dict)
+                      else [content]):
+            ndata.setflags(write=False)
+        _datasets[memo_key] = content
+    content = _datasets[memo_key]
+    return dict(content) if isinstance(content, dict) else content
+
+
+def _cached_dataset(filename, source, stat, parse):
+    """
+    Read or build the binary cache of a data file, see load_dataset.
+    """
+    prefix = re.sub(r'[^\w.]', '_', filename.lstrip(os.sep)) + '-'
+    key = prefix + '%d-%d' % (stat.st_size, stat.st_mtime_ns)
+    directory = dataset_cache_dir()
+    if os.path.exists(os.path.join(directory, key + '.npy')):
+        return np.load(os.path.join(directory, key + '.npy'), mmap_mode='r')
+    if os.path.exists(os.path.join(directory, key + '.npz')):
+        with np.load(os.path.join(directory, key + '.npz')) as npz:
+            return dict(npz)
+    content = parse(source)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for fname in os.listdir(directory):     # outdated versions
+            if fname.startswith(prefix):
+                os.remove(os.path.join(directory, fname))
+        ext = '.npz' if isinstance(content, dict) else '.npy'
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=ext,
+                                         delete=False) as f:
+            if isinstance(content, dict):
+                np.savez(f, **content)
+            else:
+                np.save(f, content)
+        os.replace(f.name, os.path.join(directory, key + ext))
+    except OSError:
+        pass
+    return content
+
+
+def _parse_csv_file(fname):
+    """
+    Parse a CSV file of numbers, with nan for the missing values.
     """
-    f = open(resource_path(filename))
+    f = open(fname)
     data = f.readlines()
     f.close()
     for i in range(len(data)):
         data[i] = data[i].split(',')
         for j in range(len(data[i])):
             if data[i][j].strip() == '':
-                data[i][j] = pad
+                data[i][j] = np.nan
             else:
                 data[i][j] = float(data[i][j])
     return np.array(data)
 
+
+def read_csv_file(filename, pad=-np.inf):
+    """
+    Read a CSV file and return pylab array.
+
+    The file is parsed once, and then read from the binary cache, see
+    load_dataset.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the CSV file to read
+    pad : float
+        Value to pad for missing values.
+
+    Returns
+    -------
+    csv_array : ndarray
+        The content of the file plus padding.
+    """
+    data = load_dataset(filename, _parse_csv_file)
+    return np.where(np.isnan(data), pad, data)
+
 # White points:
 
 white_A = Points(space.xyz, space.Space.white_A)
@@ -727,21 +1632,10 @@ def d_Munsell(dataset='real'):
         fname = 'colour_data/' + dataset + '.dat'
     else:
         raise RuntimeError('Non-existing Munsell data set: ' + str(dataset))
-    infile = open(resource_path(fname), 'r')
-    data = infile.readlines()
-    infile.close()
-    data = data[1:]
-    for i in range(len(data)):
-        data[i] = data[i].split()
-    munsell_names = list(data)
-    for i in range(len(munsell_names)):
-        munsell_names[i] = munsell_names[i][0:3]
+    content = load_dataset(fname, _parse_munsell_file)
+    munsell_names = content['names'].tolist()
     munsell_hlc = list(munsell_names)
-    for i in range(len(data)):
-        data[i] = data[i][3:]
-        for j in range(len(data[i])):
-            data[i][j] = float(data[i][j])
-    data = np.array(data)
+    data = content['data'].copy()
     data[:, 2] = data[:, 2] / 100.
     data[data == 0] = 1e-16
     hue_list = ['10RP',
@@ -771,6 +1665,21 @@ def d_Munsell(dataset='real'):
     return Points(space.xyY, data), munsell_names, munsell_lab
 
 
+def _parse_munsell_file(fname):
+    """
+    Parse a Munsell renotation file into the names and the xyY data.
+    """
+    infile = open(fname, 'r')
+    data = infile.readlines()
+    infile.close()
+    data = data[1:]
+    for i in range(len(data)):
+        data[i] = data[i].split()
+    names = np.array([line[0:3] for line in data])
+    data = np.array([[float(item) for item in line[3:]] for line in data])
+    return {'names': names, 'data': data}
+
+
 def d_regular(sp, x_val, y_val, z_val):
     """
     Build regular data set of colour data in the given colour space.
@@ -793,20 +1702,7 @@ def d_regular(sp, x_val, y_val, z_val):
     data : data.Points
         Regular structure of colour data in the given colour space.
     """
-    x_len = np.shape(x_val)[0]
-    y_len = np.shape(y_val)[0]
-    z_len = np.shape(z_val)[0]
-    tot_len = x_len * y_len * z_len
-    ndata = np.zeros((tot_len, 3))
-    l = 0
-    for i in range(x_len):
-        for j in range(y_len):
-            for k in range(z_len):
-                ndata[l, 0] = x_val[i]
-                ndata[l, 1] = y_val[j]
-                ndata[l, 2] = z_val[k]
-                l = l + 1
-    return Points(sp, ndata)
+    return GridPoints(sp, x_val, y_val, z_val).points()
 
 # TODO:
 #
@@ -832,9 +1728,8 @@ def g_MacAdam():
     MacAdam : Tensors
         The metric tensors corresponding to the MacAdam ellipsoids.
     """
-    from scipy.io import loadmat
-    rawdata = loadmat(resource_path('tensor_data/macdata(xyabtheta).mat'))
-    rawdata = rawdata['unnamed']
+    rawdata = load_dataset('tensor_data/macdata(xyabtheta).mat',
+                           _parse_macadam_file)
     xyY = rawdata[:, 0:3].copy()
     xyY[:, 2] = 0.4             # arbitrary!
     points = Points(space.xyY, xyY)
@@ -853,6 +1748,28 @@ def g_MacAdam():
     return Tensors(space.xyY, g, points)
 
 
+def _parse_macadam_file(fname):
+    """
+    Read the MacAdam ellipse data from the MATLAB file.
+    """
+    from scipy.io import loadmat
+    return loadmat(fname)['unnamed']
+
+
+def _parse_three_observer_file(fname):
+    """
+    Parse the three observer data file.
+    """
+    f = open(fname)
+    rawdata = f.readlines()[:-1]
+    f.close()
+    for line in range(len(rawdata)):
+        rawdata[line] = rawdata[line].split('\t')
+        for item in range(len(rawdata[line])):
+            rawdata[line][item] = float(rawdata[line][item].strip())
+    return np.array(rawdata)
+
+
 def g_three_observer():
     """
     Wyszecki and Fielder's three observer data set.
@@ -868,14 +1785,8 @@ def g_three_observer():
     threeObserver : Tensors
         The metric tensors corresponding to the three observer ellipsoids.
     """
-    f = open(resource_path('tensor_data/3 observer.txt'))
-    rawdata = f.readlines()[:-1]
-    f.close()
-    for line in range(len(rawdata)):
-        rawdata[line] = rawdata[line].split('\t')
-        for item in range(len(rawdata[line])):
-            rawdata[line][item] = float(rawdata[line][item].strip())
-    rawdata = np.array(rawdata)
+    rawdata = load_dataset('tensor_data/3 observer.txt',
+                           _parse_three_observer_file)
     xyY = rawdata[:, 1:4].copy()
     xyY[:, 2] = 0.4             # arbitrary!
     points = Points(space.xyY, xyY)
@@ -986,6 +1897,21 @@ def g_Melgosa_xyY():
     return Tensors(space.xyY, m_xyY_metric, d_Melgosa())
 
 
+def _parse_bfd_file(fname):
+    """
+    Parse a BFD data file.
+    """
+    f = open(fname, 'r')
+    rawdata = f.readlines()
+    f.close()
+    for line in range(len(rawdata)):
+        rawdata[line] = re.sub(r'\s+', ' ', rawdata[line]).strip()
+        rawdata[line] = rawdata[line].split(' ')
+        for item in range(len(rawdata[line])):
+            rawdata[line][item] = float(rawdata[line][item])
+    return np.array(rawdata)
+
+
 def g_BFD(dataset='P'):
     """
     Return the BFD data set ellipses of the required type.
@@ -1002,20 +1928,12 @@ def g_BFD(dataset='P'):
         The BDF data set of the required type
     """
     if dataset == 'P':
-        file_name = resource_path('tensor_data/BFD_P.txt')
+        file_name = 'tensor_data/BFD_P.txt'
     elif dataset == 'A':
-        file_name = resource_path('tensor_data/BFD_A.txt')
+        file_name = 'tensor_data/BFD_A.txt'
     elif dataset == '2':
-        file_name = resource_path('tensor_data/BFD (2).txt')
-    f = open(file_name, 'r')
-    rawdata = f.readlines()
-    f.close()
-    for line in range(len(rawdata)):
-        rawdata[line] = re.sub(r'\s+', ' ', rawdata[line]).strip()
-        rawdata[line] = rawdata[line].split(' ')
-        for item in range(len(rawdata[line])):
-            rawdata[line][item] = float(rawdata[line][item])
-    rawdata = np.array(rawdata)
+        file_name = 'tensor_data/BFD (2).txt'
+    rawdata = load_dataset(file_name, _parse_bfd_file)
     xyY = rawdata[:, 0:3].copy()
     xyY[:, 2] = xyY[:, 2] / 100
     points = Points(space.xyY, xyY)
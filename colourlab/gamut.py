@@ -21,11 +21,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
 import numpy as np
-from scipy import spatial
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import art3d
-import scipy as sci
-from . import data
+from . import data, linalg
 
 
 class Gamut:
@@ -82,6 +78,7 @@ class Gamut:
         points : data.Points
             The colour points for the gamut.
         """
+        from scipy import spatial
 
         # Calculate the convex hull
         self.hull = spatial.ConvexHull(
@@ -112,6 +109,7 @@ class Gamut:
         center : ndarray
             Center of expansion.
         """
+        from scipy import spatial
 
         # Move all points so that 'center' is origin
         n_data = self.data.get_flattened(self.space)
@@ -232,32 +230,30 @@ class Gamut:
         inclusion = 0
         v_plus = []     # a list of vertices who's original edge contains P, and it's face is POSITIVE oriented
         v_minus = []    # a list of vertices who's original edge contains P, and it's face is NEGATIVE oriented
-        origin = np.array([0., 0., 0.])
 
-        for face in self.simplices:                         # Iterate through all the Gamuts facets.
-            facet = self.get_coordinates(face)
-            a = facet[0]
-            b = facet[1]
-            c = facet[2]
-
-            s_t = self.sign(np.array([origin, a, b, c]))    # sign of the face's original tetrahedron
+        # The orientations of all the tetrahedra, for all the facets at once.
+        facets = self.get_coordinates(self.simplices)   # shape(N,3,3)
+        a = facets[:, 0]
+        b = facets[:, 1]
+        c = facets[:, 2]
+        origin = np.zeros(np.shape(a))
+        qs = np.zeros(np.shape(a)) + q
+        all_s_t = self.signs(np.stack((origin, a, b, c), axis=1))  # signs of the faces' original tetrahedra
+        all_signs = self.signs(np.stack((np.stack((qs, a, b, c), axis=1),
+                                         np.stack((qs, a, c, origin), axis=1),
+                                         np.stack((qs, a, origin, b), axis=1),
+                                         np.stack((qs, b, origin, c), axis=1)),
+                                        axis=1))
+
+        for f, face in enumerate(self.simplices):      # Iterate through all the Gamuts facets.
+            s_t = all_s_t[f]
             s_nt = s_t*-1
-            signs = np.zeros(4)                             # array for indexing the sign values
+            signs = all_signs[f]                        # array for indexing the sign values
             zeros = 0
 
             # Check if q sees the same side of the tetrahedron's facets as origin does. If this is not true,
             # point is not inside.
-            signs[0] = self.sign(np.array([q, a, b, c]))
-            if signs[0] == s_nt:
-                continue
-            signs[1] = self.sign(np.array([q, a, c, origin]))
-            if signs[1] == s_nt:
-                continue
-            signs[2] = self.sign(np.array([q, a, origin, b]))
-            if signs[2] == s_nt:
-                continue
-            signs[3] = self.sign(np.array([q, b, origin, c]))
-            if signs[3] == s_nt:
+            if np.any(signs == s_nt):
                 continue
 
             for i in range(0, 3):
@@ -342,12 +338,25 @@ class Gamut:
             -1 if tetrahedron is NEGATIVE orientated(signed volume < 0)
         """
 
-        matrix = np.array([  # Creating the matrix for calculating a determinant, representing
-                           [t[0, 0], t[1, 0], t[2, 0], t[3, 0]],  # the signed volume of the t.
-                           [t[0, 1], t[1, 1], t[2, 1], t[3, 1]],
-                           [t[0, 2], t[1, 2], t[2, 2], t[3, 2]],
-                           [1, 1, 1, 1]])
-        return int(np.sign(sci.linalg.det(matrix)))*-1  # Calculates the signed volume and returns its sign.
+        return int(np.sign(linalg.orientation(t)))*-1  # Calculates the signed volume and returns its sign.
+
+    @staticmethod
+    def signs(t):
+        """
+        Calculates the orientations of a list of tetrahedra.
+
+        Parameters
+        ----------
+        t : ndarray
+            shape(N,4,3) The coordinates of the N tetrahedra.
+
+        Returns
+        -------
+        ndarray
+            shape(N,) The orientations, as returned by sign, as integers.
+        """
+
+        return -np.sign(linalg.orientation(t)).astype(int)
 
     def get_coordinates(self, indices):
         """
@@ -389,6 +398,7 @@ class Gamut:
         bool
             True if q is inside, or on the surface of the tetrahedron.
         """
+        from scipy import spatial
 
         # If the surface is to be excluded, return False if p is on the surface.
         if true_interior and (self.in_triangle(np.delete(t, 0, 0), p) or
@@ -599,6 +609,8 @@ class Gamut:
         sp : space.Space
             The colour space for computing the gamut.
         """
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import art3d
         nd_data = self.data.get_flattened(sp)              # Creates a new ndarray with points
         points = self.get_vertices(nd_data)             # ndarray with all the vertices
         x = points[:, 0]
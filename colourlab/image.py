@@ -27,7 +27,8 @@ class Image(data.Points):
     Subclass of data.Points specifically for image shaped data.
     """
 
-    def __init__(self, sp, ndata):
+    def __init__(self, sp, ndata, workspace=None, dtype=None,
+                 cache_policy=None):
         """
         Construct new image instance and set colour space and data.
 
@@ -37,8 +38,14 @@ class Image(data.Points):
             The colour space for the given instanisiation data.
         ndata : ndarray
             The colour data in the given space.
+        workspace : space.Workspace
+            Optional workspace providing the arrays for the converted data.
+        dtype : dtype
+            The floating point type of the data, see data.Points.
+        cache_policy : data.CachePolicy
+            The policy for the cache of converted data, see data.Points.
         """
-        data.Points.__init__(self, sp, ndata)
+        data.Points.__init__(self, sp, ndata, workspace, dtype, cache_policy)
 
         # Dimensions
         self.M = self.sh[0]
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+instrument: Counters and timings of the conversions, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import time
+import threading
+import contextlib
+
+
+# =============================================================================
+# State
+# =============================================================================
+
+enabled = False                 # checked by the instrumented code
+_collecting = 0                 # number of reports being collected
+_all_threads = []               # reports collected from all threads
+_local = threading.local()      # reports collected by the current thread
+_hooks = []                     # functions called with finished reports
+_lock = threading.Lock()
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+
+class Record:
+    """
+    Counters of one operation in one colour space.
+    """
+
+    fields = ('calls', 'elements', 'seconds', 'hits', 'misses', 'nbytes',
+              'evictions')
+
+    def __init__(self):
+        """
+        Construct instance with zero counters.
+        """
+        self.calls = 0          # number of calls
+        self.elements = 0       # number of colours processed
+        self.seconds = 0.       # wall time
+        self.hits = 0           # cache hits
+        self.misses = 0         # cache misses
+        self.nbytes = 0         # bytes cached, less the bytes evicted
+        self.evictions = 0      # cache evictions
+
+
+class Report:
+    """
+    Counters collected per colour space and operation, see collect.
+
+    The records are kept in a dictionary keyed by (space, operation). The
+    operations are from_base, to_base, jacobian_base and
+    inv_jacobian_base of the transforms, get of Points (with the cache
+    hits and misses), and cache (with the bytes stored in the caches,
+    less the bytes evicted, and the number of evictions).
+    """
+
+    def __init__(self):
+        """
+        Construct empty report.
+        """
+        self.records = dict()
+
+    def record(self, sp, op):
+        """
+        Return the record of the given colour space and operation.
+
+        Parameters
+        ----------
+        sp : space.Space
+            The colour space.
+        op : str
+            The operation.
+
+        Returns
+        -------
+        record : Record
+            The record, created if needed.
+        """
+        key = (sp, op)
+        if key not in self.records:
+            self.records[key] = Record()
+        return self.records[key]
+
+    def rows(self):
+        """
+        Return the records as a list of dictionaries, e.g., for export.
+
+        Returns
+        -------
+        rows : list
+            One dictionary per record, with the name of the colour space
+            (see name), the operation and the counters, sorted by
+            decreasing time.
+        """
+        rows = []
+        for (sp, op), rec in self.records.items():
+            row = {'space': name(sp), 'operation': op}
+            row.update((field, getattr(rec, field)) for field in Record.fields)
+            rows.append(row)
+        rows.sort(key=lambda row: -row['seconds'])
+        return rows
+
+    def __str__(self):
+        lines = ['%-24s %-18s %8s %12s %10s %8s %8s %12s %9s' %
+                 (('space', 'operation') + Record.fields)]
+        for row in self.rows():
+            lines.append('%-24s %-18s %8d %12d %10.4f %8d %8d %12d %9d' %
+                         tuple(row[key] for key in
+                               ('space', 'operation') + Record.fields))
+        return '\n'.join(lines)
+
+
+def name(sp):
+    """
+    Return the name of a colour space for the reports.
+
+    Parameters
+    ----------
+    sp : space.Space
+        The colour space.
+
+    Returns
+    -------
+    name : str
+        The registered name of the colour space, otherwise the class name.
+    """
+    from . import space
+    return space._registry_names.get(id(sp), type(sp).__name__)
+
+
+# =============================================================================
+# Collecting
+# =============================================================================
+
+
+def thread_reports():
+    """
+    Return the reports collecting the operations of the current thread.
+
+    Returns
+    -------
+    reports : list
+        The reports of the collect blocks of the current thread, or of
+        the thread that started the chunked execution, see adopt.
+    """
+    if not hasattr(_local, 'reports'):
+        _local.reports = []
+    return _local.reports
+
+
+@contextlib.contextmanager
+def adopt(reports):
+    """
+    Collect the operations of the current thread in the given reports.
+
+    Used by colourlab.parallel for the chunks run on the threads of a
+    pool, so that they are recorded by the thread starting the execution.
+
+    Parameters
+    ----------
+    reports : list
+        The reports, as returned by thread_reports.
+    """
+    previous = thread_reports()
+    _local.reports = reports
+    try:
+        yield
+    finally:
+        _local.reports = previous
+
+
+@contextlib.contextmanager
+def collect(all_threads=False):
+    """
+    Collect a report of the conversions within a with block.
+
+    By default, only the operations of the current thread are recorded,
+    including the chunks it runs on a thread pool, see colourlab.parallel.
+    Nested blocks record the same operations in both reports. The
+    instrumentation is enabled only while reports are being collected.
+    At the end of the block, the report is passed to the functions
+    registered by add_hook:
+
+    .. code:: python
+
+        with colourlab.instrument.collect() as report:
+            im.get(colourlab.space.cielab)
+        print(report)
+
+    Parameters
+    ----------
+    all_threads : bool
+        If True, record the operations of all the threads.
+
+    Yields
+    ------
+    report : Report
+        The report, filled in during the block.
+    """
+    global enabled, _collecting
+    report = Report()
+    reports = _all_threads if all_threads else thread_reports()
+    with _lock:
+        reports.append(report)
+        _collecting += 1
+        enabled = True
+    try:
+        yield report
+    finally:
+        with _lock:
+            reports.remove(report)
+            _collecting -= 1
+            enabled = _collecting > 0
+        for hook in list(_hooks):
+            hook(report)
+
+
+def add_hook(hook):
+    """
+    Add a function to be called with every finished report.
+
+    Parameters
+    ----------
+    hook : function
+        Function of a Report, e.g., exporting the rows to a database.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Remove a function added by add_hook.
+
+    Parameters
+    ----------
+    hook : function
+        The function.
+    """
+    _hooks.remove(hook)
+
+
+def count(sp, op, elements=0, seconds=0., hits=0, misses=0, nbytes=0,
+          evictions=0, calls=1):
+    """
+    Add to the counters of an operation in the reports of the thread.
+
+    Parameters
+    ----------
+    sp : space.Space
+        The colour space.
+    op : str
+        The operation.
+    elements : int
+        The number of colours processed.
+    seconds : float
+        The wall time.
+    hits : int
+        Cache hits.
+    misses : int
+        Cache misses.
+    nbytes : int
+        Bytes cached, negative for evicted data.
+    evictions : int
+        Cache evictions.
+    calls : int
+        The number of calls.
+    """
+    with _lock:
+        for report in thread_reports() + _all_threads:
+            rec = report.record(sp, op)
+            rec.calls += calls
+            rec.elements += elements
+            rec.seconds += seconds
+            rec.hits += hits
+            rec.misses += misses
+            rec.nbytes += nbytes
+            rec.evictions += evictions
+
+
+def timed(sp, op, core_ndim, method, *args):
+    """
+    Call a method, and count the call, the colours and the wall time.
+
+    Parameters
+    ----------
+    sp : space.Space
+        The colour space.
+    op : str
+        The operation.
+    core_ndim : int
+        Number of dimensions of the result per colour, 1 for colour data
+        and 2 for Jacobians.
+    method : function
+        The method to call.
+    *args
+        The arguments of the method.
+
+    Returns
+    -------
+    result : ndarray
+        The result of the method.
+    """
+    start = time.perf_counter()
+    res = method(*args)
+    seconds = time.perf_counter() - start
+    elements = 1
+    for length in res.shape[:res.ndim - core_ndim]:
+        elements *= length
+    count(sp, op, elements, seconds)
+    return res
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+linalg: Small matrix linear algebra, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+
+
+# =============================================================================
+# Closed form operations on lists of 3x3 matrices
+#
+# The functions operate on arrays of shape ... x 3 x 3, typically N x 3 x 3
+# lists of Jacobians, using the explicit formulae rather than one LAPACK
+# call per matrix.
+# =============================================================================
+
+
+def det3(m):
+    """
+    Return the determinants of a list of 3x3 matrices.
+
+    Parameters
+    ----------
+    m : ndarray
+        ... x 3 x 3 array of matrices.
+
+    Returns
+    -------
+    det : ndarray
+        ... array of determinants.
+    """
+    return (m[..., 0, 0] * (m[..., 1, 1] * m[..., 2, 2] -
+                            m[..., 1, 2] * m[..., 2, 1]) -
+            m[..., 0, 1] * (m[..., 1, 0] * m[..., 2, 2] -
+                            m[..., 1, 2] * m[..., 2, 0]) +
+            m[..., 0, 2] * (m[..., 1, 0] * m[..., 2, 1] -
+                            m[..., 1, 1] * m[..., 2, 0]))
+
+
+def adj3(m):
+    """
+    Return the adjugates (transposed cofactor matrices) of 3x3 matrices.
+
+    Parameters
+    ----------
+    m : ndarray
+        ... x 3 x 3 array of matrices.
+
+    Returns
+    -------
+    adj : ndarray
+        ... x 3 x 3 array of adjugate matrices, single precision for
+        single precision matrices, double precision otherwise.
+    """
+    m = np.asarray(m)
+    adj = np.empty(np.shape(m), np.result_type(m, np.float32))
+    adj[..., 0, 0] = m[..., 1, 1] * m[..., 2, 2] - m[..., 1, 2] * m[..., 2, 1]
+    adj[..., 0, 1] = m[..., 0, 2] * m[..., 2, 1] - m[..., 0, 1] * m[..., 2, 2]
+    adj[..., 0, 2] = m[..., 0, 1] * m[..., 1, 2] - m[..., 0, 2] * m[..., 1, 1]
+    adj[..., 1, 0] = m[..., 1, 2] * m[..., 2, 0] - m[..., 1, 0] * m[..., 2, 2]
+    adj[..., 1, 1] = m[..., 0, 0] * m[..., 2, 2] - m[..., 0, 2] * m[..., 2, 0]
+    adj[..., 1, 2] = m[..., 0, 2] * m[..., 1, 0] - m[..., 0, 0] * m[..., 1, 2]
+    adj[..., 2, 0] = m[..., 1, 0] * m[..., 2, 1] - m[..., 1, 1] * m[..., 2, 0]
+    adj[..., 2, 1] = m[..., 0, 1] * m[..., 2, 0] - m[..., 0, 0] * m[..., 2, 1]
+    adj[..., 2, 2] = m[..., 0, 0] * m[..., 1, 1] - m[..., 0, 1] * m[..., 1, 0]
+    return adj
+
+
+def singular(m, rtol=1e-12):
+    """
+    Return mask of the (numerically) singular matrices in a list.
+
+    A matrix is considered singular if the absolute value of the
+    determinant is not larger than rtol times the product of the norms
+    of its rows, or if it contains non-finite entries.
+
+    Parameters
+    ----------
+    m : ndarray
+        ... x 3 x 3 array of matrices.
+    rtol : float
+        Relative tolerance for the determinant.
+
+    Returns
+    -------
+    singular : ndarray
+        ... boolean array, True for the singular matrices.
+    """
+    scale = np.prod(np.sqrt(np.sum(m**2, axis=-1)), axis=-1)
+    det = det3(m)
+    return ~(np.abs(det) > rtol * scale)
+
+
+def inv3(m):
+    """
+    Return the inverses of a list of 3x3 matrices.
+
+    Computed as the adjugate divided by the determinant. Unlike
+    numpy.linalg.inv, no exception is raised for singular matrices;
+    their inverses are filled with NaN instead. Use singular to find
+    them beforehand if needed.
+
+    Parameters
+    ----------
+    m : ndarray
+        ... x 3 x 3 array of matrices.
+
+    Returns
+    -------
+    inv : ndarray
+        ... x 3 x 3 array of inverse matrices.
+    """
+    adj = adj3(m)
+    det = (m[..., 0, 0] * adj[..., 0, 0] + m[..., 0, 1] * adj[..., 1, 0] +
+           m[..., 0, 2] * adj[..., 2, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = adj / det[..., np.newaxis, np.newaxis]
+    inv[det == 0] = np.nan
+    return inv
+
+
+# =============================================================================
+# Orientation of tetrahedra
+# =============================================================================
+
+
+def orientation(t):
+    """
+    Return the orientation determinants of a list of tetrahedra.
+
+    For the tetrahedron with the vertices p0, p1, p2, p3, this is the
+    determinant of the 4x4 matrix with the columns (p0, 1), (p1, 1),
+    (p2, 1), and (p3, 1), i.e., minus six times the signed volume.
+    Computed as the 3x3 determinant of the edge vectors from p0.
+
+    Parameters
+    ----------
+    t : ndarray
+        ... x 4 x 3 array of tetrahedron vertices.
+
+    Returns
+    -------
+    det : ndarray
+        ... array of the orientation determinants.
+    """
+    t = np.asarray(t, dtype=float)
+    edges = t[..., 1:, :] - t[..., np.newaxis, 0, :]
+    return -det3(edges)
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lut: Three-dimensional lookup tables, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+from . import data, lut_core
+
+
+# =============================================================================
+# Lookup table class
+# =============================================================================
+
+
+class LUT3D:
+    """
+    Three-dimensional lookup table for converting between two colour spaces.
+
+    The exact conversion is computed once on a regular grid spanning the
+    domain of the input colour space, and colour data are then converted
+    by trilinear or tetrahedral interpolation in the table. For 8 and 16
+    bit integer input, the grid positions of all the possible input values
+    are tabulated as well, so that no arithmetic remains but the
+    interpolation itself:
+
+    .. code:: python
+
+        lut = colourlab.lut.LUT3D(colourlab.space.srgb,
+                                  colourlab.space.cielab, size=65)
+        im_lab = lut.apply(im_srgb_uint8)
+
+    The table is indexed [i, j, k] by the grid positions of the first,
+    second and third input coordinate, respectively. The interpolation is
+    run by the compiled kernels of lut_core if numba is installed, and by
+    vectorised numpy code otherwise.
+    """
+
+    interpolations = ('trilinear', 'tetrahedral')
+
+    def __init__(self, sp_in, sp_out, size=33, domain=((0, 0, 0), (1, 1, 1)),
+                 interpolation='tetrahedral', table=None):
+        """
+        Construct the lookup table.
+
+        Parameters
+        ----------
+        sp_in : space.Space
+            The colour space of the input data, or None.
+        sp_out : space.Space
+            The colour space of the output data, or None.
+        size : int
+            The number of grid points along each axis.
+        domain : array_like
+            2 x 3 array with the minimum and maximum of the grid along each
+            axis of the input colour space.
+        interpolation : str
+            'trilinear' or 'tetrahedral'.
+        table : ndarray
+            Optional size x size x size x 3 table. If not given, it is
+            computed from the two colour spaces.
+        """
+        if interpolation not in self.interpolations:
+            raise RuntimeError('Unknown interpolation: ' + str(interpolation))
+        self.sp_in = sp_in
+        self.sp_out = sp_out
+        self.size = int(size)
+        self.domain = np.array(domain, dtype=float).reshape((2, 3))
+        self.interpolation = interpolation
+        if table is None:
+            table = np.empty((self.size, self.size, self.size, 3))
+            data.GridPoints(self.sp_in, *self.axes(),
+                            dtype=np.float64).get(self.sp_out, table)
+        self.table = np.reshape(np.asarray(table, dtype=float),
+                                (self.size, self.size, self.size, 3))
+        self._flat_table = self.table.reshape((-1, 3))
+        self._int_tables = dict()
+
+    def axes(self):
+        """
+        Return the input coordinates of the grid along each axis.
+
+        Returns
+        -------
+        axes : list
+            Three arrays of size input coordinates.
+        """
+        return [np.linspace(self.domain[0, i], self.domain[1, i], self.size)
+                for i in range(3)]
+
+    def grid(self):
+        """
+        Return the input coordinates of the grid points.
+
+        Returns
+        -------
+        grid : ndarray
+            size x size x size x 3 array of colour data in the input space.
+        """
+        return np.stack(np.meshgrid(*self.axes(), indexing='ij'), axis=-1)
+
+    def positions(self, ndata):
+        """
+        Return the grid cells and the positions within them.
+
+        Input outside the domain is clipped to the boundary of the grid.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            N x 3 array of colour data in the input space.
+
+        Returns
+        -------
+        index : ndarray
+            N x 3 integer array, the lower corners of the grid cells.
+        frac : ndarray
+            N x 3 array of positions within the cells, in [0, 1].
+        """
+        t = (ndata - self.domain[0]) / (self.domain[1] - self.domain[0])
+        t = np.clip(t * (self.size - 1), 0, self.size - 1)
+        index = np.minimum(t.astype(np.intp), self.size - 2)
+        return index, t - index
+
+    def int_positions(self, dtype):
+        """
+        Return the tabulated grid positions for integer input.
+
+        The integer values are taken to span the full range of the data
+        type, with the maximum corresponding to the upper end of the
+        domain.
+
+        Parameters
+        ----------
+        dtype : dtype
+            numpy.uint8 or numpy.uint16.
+
+        Returns
+        -------
+        index : ndarray
+            K x 3 integer array of cell corners for the K possible values.
+        frac : ndarray
+            K x 3 array of positions within the cells.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in self._int_tables:
+            values = np.arange(np.iinfo(dtype).max + 1, dtype=float)
+            col = values[:, np.newaxis] / values[-1] * \
+                (self.domain[1] - self.domain[0]) + self.domain[0]
+            self._int_tables[dtype] = self.positions(col)
+        return self._int_tables[dtype]
+
+    def trilinear(self, index, frac):
+        """
+        Interpolate trilinearly within the given grid cells.
+
+        Parameters
+        ----------
+        index : ndarray
+            N x 3 integer array, the lower corners of the grid cells.
+        frac : ndarray
+            N x 3 array of positions within the cells.
+
+        Returns
+        -------
+        col : ndarray
+            N x 3 array of interpolated colour data in the output space.
+        """
+        s = self.size
+        base = (index[:, 0] * s + index[:, 1]) * s + index[:, 2]
+        col = np.zeros(np.shape(frac))
+        for di in (0, 1):
+            wi = frac[:, 0] if di else 1 - frac[:, 0]
+            for dj in (0, 1):
+                wj = wi * (frac[:, 1] if dj else 1 - frac[:, 1])
+                for dk in (0, 1):
+                    w = wj * (frac[:, 2] if dk else 1 - frac[:, 2])
+                    corner = self._flat_table[base + (di * s + dj) * s + dk]
+                    col += w[:, np.newaxis] * corner
+        return col
+
+    def tetrahedral(self, index, frac):
+        """
+        Interpolate tetrahedrally within the given grid cells.
+
+        Each cube is split into six tetrahedra along the main diagonal,
+        and the colour is interpolated linearly within the tetrahedron
+        containing the point, using four table entries instead of eight.
+
+        Parameters
+        ----------
+        index : ndarray
+            N x 3 integer array, the lower corners of the grid cells.
+        frac : ndarray
+            N x 3 array of positions within the cells.
+
+        Returns
+        -------
+        col : ndarray
+            N x 3 array of interpolated colour data in the output space.
+        """
+        s = self.size
+        strides = np.array([s * s, s, 1])
+        # Axes of the largest and smallest fractions, distinct also for ties
+        first = np.argmax(frac, axis=1)
+        last = 2 - np.argmin(frac[:, ::-1], axis=1)
+        f0 = np.max(frac, axis=1)
+        f2 = np.min(frac, axis=1)
+        f1 = np.sum(frac, axis=1) - f0 - f2
+        base = np.dot(index, strides)
+        step1 = base + strides[first]
+        step2 = base + (strides.sum() - strides[last])
+        col = (1 - f0)[:, np.newaxis] * self._flat_table[base]
+        col += (f0 - f1)[:, np.newaxis] * self._flat_table[step1]
+        col += (f1 - f2)[:, np.newaxis] * self._flat_table[step2]
+        col += f2[:, np.newaxis] * self._flat_table[base + strides.sum()]
+        return col
+
+    def apply(self, ndata):
+        """
+        Convert colour data by interpolation in the table.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            M x ... x N x 3 array of colour data in the input space. 8 and
+            16 bit unsigned integers are taken to span the domain.
+
+        Returns
+        -------
+        col : ndarray
+            M x ... x N x 3 array of colour data in the output space.
+        """
+        ndata = np.asarray(ndata)
+        flat = np.reshape(ndata, (-1, 3))
+        integer = ndata.dtype in (np.uint8, np.uint16)
+        if lut_core.HAVE_NUMBA:
+            col = np.empty(np.shape(flat))
+            tetrahedral = self.interpolation == 'tetrahedral'
+            if integer:
+                index, frac = self.int_positions(ndata.dtype)
+                lut_core.interpolate_int(self.table, flat, index, frac,
+                                         tetrahedral, col)
+            else:
+                scale = (self.size - 1) / (self.domain[1] - self.domain[0])
+                lut_core.interpolate(self.table, np.asarray(flat, float),
+                                     self.domain[0], scale, tetrahedral, col)
+            return np.reshape(col, np.shape(ndata))
+        if integer:
+            index_table, frac_table = self.int_positions(ndata.dtype)
+            channels = np.arange(3)
+            index = index_table[flat, channels]
+            frac = frac_table[flat, channels]
+        else:
+            index, frac = self.positions(flat)
+        col = getattr(self, self.interpolation)(index, frac)
+        return np.reshape(col, np.shape(ndata))
+
+    def error(self, ndata=None, samples=10000, seed=0):
+        """
+        Measure the error of the table against the exact conversion.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            Optional colour data in the input space to measure the error
+            for. If not given, random points within the domain are used.
+        samples : int
+            The number of random points.
+        seed : int
+            Seed of the random points.
+
+        Returns
+        -------
+        report : dict
+            The maximum ('max'), mean ('mean') and root mean square
+            ('rms') of the Euclidean error in the output space, and the
+            input colour with the maximum error ('argmax').
+        """
+        if self.sp_in is None or self.sp_out is None:
+            raise RuntimeError('The colour spaces of the table are unknown.')
+        if ndata is None:
+            rand = np.random.RandomState(seed).rand(samples, 3)
+            ndata = self.domain[0] + rand * (self.domain[1] - self.domain[0])
+        ndata = np.reshape(np.asarray(ndata, dtype=float), (-1, 3))
+        exact = self.sp_out.from_XYZ(self.sp_in.to_XYZ(ndata))
+        err = np.sqrt(np.sum((self.apply(ndata) - exact)**2, axis=1))
+        return {'max': np.max(err),
+                'mean': np.mean(err),
+                'rms': np.sqrt(np.mean(err**2)),
+                'argmax': ndata[np.argmax(err)]}
+
+    def save(self, fname):
+        """
+        Save the table to a numpy .npz file.
+
+        The colour spaces are not stored.
+
+        Parameters
+        ----------
+        fname : str
+            The file name.
+        """
+        np.savez(fname, table=self.table, domain=self.domain,
+                 interpolation=self.interpolation)
+
+    @classmethod
+    def load(cls, fname, sp_in=None, sp_out=None):
+        """
+        Load table saved by the save method.
+
+        Parameters
+        ----------
+        fname : str
+            The file name.
+        sp_in : space.Space
+            Optional colour space of the input data.
+        sp_out : space.Space
+            Optional colour space of the output data.
+
+        Returns
+        -------
+        lut : LUT3D
+            The lookup table.
+        """
+        with np.load(fname) as npz:
+            return cls(sp_in, sp_out, size=npz['table'].shape[0],
+                       domain=npz['domain'],
+                       interpolation=str(npz['interpolation']),
+                       table=npz['table'])
+
+    def save_cube(self, fname, title=None):
+        """
+        Export the table in the .cube format.
+
+        Parameters
+        ----------
+        fname : str
+            The file name.
+        title : str
+            Optional title of the table.
+        """
+        with open(fname, 'w') as f:
+            if title is not None:
+                f.write('TITLE "%s"\n' % title)
+            f.write('LUT_3D_SIZE %d\n' % self.size)
+            f.write('DOMAIN_MIN %.10g %.10g %.10g\n' % tuple(self.domain[0]))
+            f.write('DOMAIN_MAX %.10g %.10g %.10g\n' % tuple(self.domain[1]))
+            # The first coordinate varies fastest in .cube files
+            np.savetxt(f, np.transpose(self.table, (2, 1, 0, 3)).reshape(
+                (-1, 3)), fmt='%.10g')
+
+    @classmethod
+    def load_cube(cls, fname, sp_in=None, sp_out=None,
+                  interpolation='tetrahedral'):
+        """
+        Import table in the .cube format.
+
+        Parameters
+        ----------
+        fname : str
+            The file name.
+        sp_in : space.Space
+            Optional colour space of the input data.
+        sp_out : space.Space
+            Optional colour space of the output data.
+        interpolation : str
+            'trilinear' or 'tetrahedral'.
+
+        Returns
+        -------
+        lut : LUT3D
+            The lookup table.
+        """
+        size = None
+        domain = np.array([[0., 0, 0], [1, 1, 1]])
+        rows = []
+        with open(fname) as f:
+            for line in f:
+                words = line.split()
+                if len(words) == 0 or words[0].startswith('#'):
+                    continue
+                if words[0] == 'LUT_3D_SIZE':
+                    size = int(words[1])
+                elif words[0] == 'DOMAIN_MIN':
+                    domain[0] = [float(w) for w in words[1:4]]
+                elif words[0] == 'DOMAIN_MAX':
+                    domain[1] = [float(w) for w in words[1:4]]
+                elif words[0] == 'LUT_1D_SIZE':
+                    raise RuntimeError('1D .cube tables are not supported.')
+                elif words[0][0].isalpha():
+                    continue        # TITLE and other keywords
+                else:
+                    rows.append(line)
+        if size is None:
+            raise RuntimeError('No LUT_3D_SIZE in ' + str(fname))
+        table = np.loadtxt(rows, ndmin=2)
+        if table.shape != (size**3, 3):
+            raise RuntimeError('Wrong number of entries in ' + str(fname))
+        table = np.transpose(table.reshape((size, size, size, 3)),
+                             (2, 1, 0, 3))
+        return cls(sp_in, sp_out, size=size, domain=domain,
+                   interpolation=interpolation, table=table)
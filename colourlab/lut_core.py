@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lut_core: Lookup table interpolation kernels, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import sys
+
+try:                            # Use numba only when installed. The
+    from numba import jit       # kernels are only used if it is, since
+    HAVE_NUMBA = True           # the loops are too slow in pure Python.
+except ImportError:
+    HAVE_NUMBA = False
+
+if not HAVE_NUMBA or 'sphinx' in sys.modules:
+    HAVE_NUMBA = False
+
+    def jit(func):
+        return func
+
+
+@jit
+def _trilinear_point(table, i, j, k, fi, fj, fk, out, n):
+    """
+    Interpolate trilinearly for one point, storing the result in out[n].
+    """
+    for c in range(3):
+        c00 = table[i, j, k, c] * (1 - fk) + table[i, j, k + 1, c] * fk
+        c01 = table[i, j + 1, k, c] * (1 - fk) + \
+            table[i, j + 1, k + 1, c] * fk
+        c10 = table[i + 1, j, k, c] * (1 - fk) + \
+            table[i + 1, j, k + 1, c] * fk
+        c11 = table[i + 1, j + 1, k, c] * (1 - fk) + \
+            table[i + 1, j + 1, k + 1, c] * fk
+        out[n, c] = (c00 * (1 - fj) + c01 * fj) * (1 - fi) + \
+            (c10 * (1 - fj) + c11 * fj) * fi
+
+
+@jit
+def _tetrahedral_point(table, i, j, k, fi, fj, fk, out, n):
+    """
+    Interpolate tetrahedrally for one point, storing the result in out[n].
+    """
+    # Walk from corner (i, j, k) to (i + 1, j + 1, k + 1) along the axes
+    # in the order of decreasing fractions
+    if fi >= fj:
+        if fj >= fk:            # fi >= fj >= fk
+            i1, j1, k1, i2, j2, k2 = 1, 0, 0, 1, 1, 0
+            f0, f1, f2 = fi, fj, fk
+        elif fi >= fk:          # fi >= fk > fj
+            i1, j1, k1, i2, j2, k2 = 1, 0, 0, 1, 0, 1
+            f0, f1, f2 = fi, fk, fj
+        else:                   # fk > fi >= fj
+            i1, j1, k1, i2, j2, k2 = 0, 0, 1, 1, 0, 1
+            f0, f1, f2 = fk, fi, fj
+    else:
+        if fk >= fj:            # fk >= fj > fi
+            i1, j1, k1, i2, j2, k2 = 0, 0, 1, 0, 1, 1
+            f0, f1, f2 = fk, fj, fi
+        elif fk >= fi:          # fj > fk >= fi
+            i1, j1, k1, i2, j2, k2 = 0, 1, 0, 0, 1, 1
+            f0, f1, f2 = fj, fk, fi
+        else:                   # fj > fi > fk
+            i1, j1, k1, i2, j2, k2 = 0, 1, 0, 1, 1, 0
+            f0, f1, f2 = fj, fi, fk
+    for c in range(3):
+        out[n, c] = (1 - f0) * table[i, j, k, c] + \
+            (f0 - f1) * table[i + i1, j + j1, k + k1, c] + \
+            (f1 - f2) * table[i + i2, j + j2, k + k2, c] + \
+            f2 * table[i + 1, j + 1, k + 1, c]
+
+
+@jit
+def interpolate(table, ndata, lower, scale, tetrahedral, out):
+    """
+    Interpolate the table at floating point colour data.
+
+    Parameters
+    ----------
+    table : ndarray
+        S x S x S x 3 lookup table.
+    ndata : ndarray
+        N x 3 colour data in the input space.
+    lower : ndarray
+        The lower end of the domain.
+    scale : ndarray
+        The number of grid cells per unit along each axis.
+    tetrahedral : bool
+        Tetrahedral interpolation if True, trilinear if False.
+    out : ndarray
+        N x 3 array for the result.
+    """
+    top = table.shape[0] - 1
+    for n in range(ndata.shape[0]):
+        t0 = min(max((ndata[n, 0] - lower[0]) * scale[0], 0.), top)
+        t1 = min(max((ndata[n, 1] - lower[1]) * scale[1], 0.), top)
+        t2 = min(max((ndata[n, 2] - lower[2]) * scale[2], 0.), top)
+        i = min(int(t0), top - 1)
+        j = min(int(t1), top - 1)
+        k = min(int(t2), top - 1)
+        if tetrahedral:
+            _tetrahedral_point(table, i, j, k, t0 - i, t1 - j, t2 - k, out, n)
+        else:
+            _trilinear_point(table, i, j, k, t0 - i, t1 - j, t2 - k, out, n)
+
+
+@jit
+def interpolate_int(table, ndata, index, frac, tetrahedral, out):
+    """
+    Interpolate the table at integer colour data.
+
+    Parameters
+    ----------
+    table : ndarray
+        S x S x S x 3 lookup table.
+    ndata : ndarray
+        N x 3 integer colour data.
+    index : ndarray
+        K x 3 array of the grid cells for the K possible integer values.
+    frac : ndarray
+        K x 3 array of the positions within the cells.
+    tetrahedral : bool
+        Tetrahedral interpolation if True, trilinear if False.
+    out : ndarray
+        N x 3 array for the result.
+    """
+    for n in range(ndata.shape[0]):
+        v0 = ndata[n, 0]
+        v1 = ndata[n, 1]
+        v2 = ndata[n, 2]
+        if tetrahedral:
+            _tetrahedral_point(table, index[v0, 0], index[v1, 1],
+                               index[v2, 2], frac[v0, 0], frac[v1, 1],
+                               frac[v2, 2], out, n)
+        else:
+            _trilinear_point(table, index[v0, 0], index[v1, 1],
+                             index[v2, 2], frac[v0, 0], frac[v1, 1],
+                             frac[v2, 2], out, n)
@@ -19,8 +19,9 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import weakref
 import numpy as np
-from . import data, space
+from . import data, space, parallel
 
 
 # =============================================================================
@@ -51,18 +52,59 @@ def reshape_diff(diff, sh):
         return np.reshape(diff, tuple(np.array(sh)[:-1]))
 
 
+# Midpoints by the first and the second data set, see midpoints
+_midpoints = weakref.WeakKeyDictionary()
+
+
+def midpoints(sp, dat1, dat2):
+    """
+    Return the midpoints between the two data sets in the given space.
+
+    The midpoints are kept as long as both data sets, and returned again
+    for the same data sets and colour space, unless the data have been
+    set anew. The conversions of the midpoints, e.g., to XYZ for
+    computing the metric tensors, are thus shared by all the metrics
+    computed by linear for the same pairs of colours.
+
+    Parameters
+    ----------
+    sp : Space
+        The colour space of the midpoints.
+    dat1 : Points
+        The colour data of the first data set.
+    dat2 : Points
+        The colour data of the second data set.
+
+    Returns
+    -------
+    midpoints : Points
+        The flattened colour data of the midpoints.
+    """
+    spaces = _midpoints.setdefault(
+        dat1, weakref.WeakKeyDictionary()).setdefault(dat2, dict())
+    if sp in spaces:
+        data1, data2, midp = spaces[sp]
+        if data1() is dat1.data and data2() is dat2.data:
+            return midp
+    midp = data.Points(sp, (dat1.get_flattened(sp) +
+                            dat2.get_flattened(sp)) * .5)
+    spaces[sp] = (weakref.ref(dat1.data), weakref.ref(dat2.data), midp)
+    return midp
+
+
 # =============================================================================
 # Colour metric functions
 # =============================================================================
 
 
-def linear(sp, dat1, dat2, metric_tensor_function):
+def linear(sp, dat1, dat2, metric_tensor_function, executor=None):
     """
     Compute the linearised colour difference between the two data sets.
 
     The function metric_tensor_function is used to compute the metric tensor
     at the midpoint between the two data sets in the given colour space. Then
-    the colour metric is computed as dC^T * g * dC.
+    the colour metric is computed as dC^T * g * dC. The midpoints are
+    reused by later calls for the same data sets, see midpoints.
 
     Parameters
     ----------
@@ -74,21 +116,22 @@ def linear(sp, dat1, dat2, metric_tensor_function):
         The colour data of the second data set.
     metric_tensor_function : function
         Function giving the metric tensors at given colour data points.
+    executor : concurrent.futures.Executor, int or None
+        Optional executor for this call, see colourlab.parallel.
 
     Returns
     -------
     distance : ndarray
         Array of the difference or distances between the two data sets.
     """
-    d1 = dat1.get_flattened(sp)
-    d2 = dat2.get_flattened(sp)
-    midp = (d1 + d2) * .5
-    diff = d1 - d2
-    g = metric_tensor_function(data.Points(sp, midp))
-    g = g.get(sp)
-    m = np.zeros(np.shape(diff)[0])
-    for i in range(np.shape(m)[0]):
-        m[i] = np.sqrt(np.dot(diff[i].T, np.dot(g[i], diff[i])))
+    with parallel.using(executor):
+        diff = dat1.get_flattened(sp) - dat2.get_flattened(sp)
+        g = metric_tensor_function(midpoints(sp, dat1, dat2)).get(sp)
+        m = np.empty(np.shape(diff)[0], np.result_type(g, diff))
+        parallel.map_chunks(
+            lambda dc, gc, out: np.sqrt(
+                np.einsum('...i,...ij,...j->...', dc, gc, dc), out=out),
+            (diff, g), m)
     return reshape_diff(m, dat1.sh)
 
 
@@ -110,13 +153,19 @@ def euclidean(sp, dat1, dat2):
     distance : ndarray
         Array of the difference or distances between the two data sets.
     """
-    d1 = dat1.get_flattened(sp)
-    d2 = dat2.get_flattened(sp)
-    diff = d1 - d2
-    m = np.sqrt(diff[:, 0]**2 + diff[:, 1]**2 + diff[:, 2]**2)
+    m = _euclidean(dat1.get_flattened(sp), dat2.get_flattened(sp))
     return reshape_diff(m, dat1.sh)
 
 
+def _euclidean(d1, d2, out=None):
+    """
+    Compute the Euclidean metric from colour data, see euclidean.
+    """
+    diff = d1 - d2
+    return np.sqrt(diff[..., 0]**2 + diff[..., 1]**2 + diff[..., 2]**2,
+                   out=out)
+
+
 def poincare_disk(sp, dat1, dat2):
     """
     Compute the Poincare Disk metric betwen the two data sets.
@@ -139,15 +188,20 @@ def poincare_disk(sp, dat1, dat2):
     distance : ndarray
         Array of the difference or distances between the two data sets.
     """
-    d1 = dat1.get_flattened(sp)
-    d2 = dat2.get_flattened(sp)
+    d = _poincare_disk(sp, dat1.get_flattened(sp), dat2.get_flattened(sp))
+    return reshape_diff(d, dat1.sh)
+
+
+def _poincare_disk(sp, d1, d2, out=None):
+    """
+    Compute the Poincare Disk metric from colour data, see poincare_disk.
+    """
     diff = d1 - d2
-    delta = 2 * ((diff[:, 1]**2 + diff[:, 2]**2) /
-                 ((1 - d1[:, 1]**2 - d1[:, 2]**2) *
-                  (1 - d2[:, 1]**2 - d2[:, 2]**2)))
+    delta = 2 * ((diff[..., 1]**2 + diff[..., 2]**2) /
+                 ((1 - d1[..., 1]**2 - d1[..., 2]**2) *
+                  (1 - d2[..., 1]**2 - d2[..., 2]**2)))
     duv = sp.R * np.arccosh(1 + delta)
-    d = np.sqrt(diff[:, 0]**2 + duv**2)
-    return reshape_diff(d, dat1.sh)
+    return np.sqrt(diff[..., 0]**2 + duv**2, out=out)
 
 
 def dE_ab(dat1, dat2):
@@ -283,7 +337,7 @@ def dE_DIN99d(dat1, dat2):
     return euclidean(space.din99d, dat1, dat2)
 
 
-def dE_00(dat1, dat2, k_L=1, k_C=1, k_h=1):
+def dE_00(dat1, dat2, k_L=1, k_C=1, k_h=1, executor=None):
     """
     Compute the CIEDE00 metric.
 
@@ -299,33 +353,245 @@ def dE_00(dat1, dat2, k_L=1, k_C=1, k_h=1):
         Parameter of the CIEDE00 metric
     k_h : float
         Parameter of the CIEDE00 metric
+    executor : concurrent.futures.Executor, int or None
+        Optional executor for this call, see colourlab.parallel.
 
     Returns
     -------
     distance : ndarray
         Array of the difference or distances between the two data sets.
     """
-    lch1 = dat1.get_flattened(space.ciede00lch)
-    lch2 = dat2.get_flattened(space.ciede00lch)
+    with parallel.using(executor):
+        lch1 = dat1.get_flattened(space.ciede00lch)
+        lch2 = dat2.get_flattened(space.ciede00lch)
+        d = np.empty(np.shape(lch1)[0], space.float_type(lch1))
+        parallel.map_chunks(
+            lambda l1, l2, out: _dE_00(l1, l2, k_L, k_C, k_h, out),
+            (lch1, lch2), d)
+    return reshape_diff(d, dat1.sh)
+
+
+def _dE_00(lch1, lch2, k_L, k_C, k_h, out):
+    """
+    Compute the CIEDE00 metric from CIEDE00 LCh data, see dE_00.
+    """
     avg_lch = .5 * (lch1 + lch2)
     d_lch = lch1 - lch2
 
-    h_deg = np.rad2deg(avg_lch[:, 2])
+    h_deg = np.rad2deg(avg_lch[..., 2])
     h_deg[h_deg < 0] = h_deg[h_deg < 0] + 360
-    S_L = 1 + ((0.015 * (avg_lch[:, 0] - 50)**2) /
-               np.sqrt(20 + (avg_lch[:, 0] - 50)**2))
-    S_C = 1 + 0.045 * avg_lch[:, 1]
+    S_L = 1 + ((0.015 * (avg_lch[..., 0] - 50)**2) /
+               np.sqrt(20 + (avg_lch[..., 0] - 50)**2))
+    S_C = 1 + 0.045 * avg_lch[..., 1]
     T = 1 - 0.17 * np.cos(np.deg2rad(h_deg - 30)) + \
-        .24 * np.cos(2*avg_lch[:, 2]) + \
+        .24 * np.cos(2*avg_lch[..., 2]) + \
         .32 * np.cos(np.deg2rad(3 * h_deg + 6)) - \
         .2 * np.cos(np.deg2rad(4 * h_deg - 63))
-    S_h = 1 + 0.015 * avg_lch[:, 1] * T
-    R_C = 2 * np.sqrt(avg_lch[:, 1]**7 / (avg_lch[:, 1]**7 + 25**7))
+    S_h = 1 + 0.015 * avg_lch[..., 1] * T
+    R_C = 2 * np.sqrt(avg_lch[..., 1]**7 / (avg_lch[..., 1]**7 + 25**7))
     d_theta = 30 * np.exp(-((h_deg - 275) / 25)**2)
     R_T = - R_C * np.sin(np.deg2rad(2 * d_theta))
-    dH = 2 * np.sqrt(lch1[:, 1] * lch2[:, 1]) * np.sin(d_lch[:, 2] / 2)
-    d = np.sqrt((d_lch[:, 0] / (k_L * S_L))**2 +
-                (d_lch[:, 1] / (k_C * S_C))**2 +
-                (dH / (k_h * S_h))**2 +
-                R_T * d_lch[:, 1] * dH / (k_C * S_C * k_h * S_h))
-    return reshape_diff(d, dat1.sh)
+    dH = 2 * np.sqrt(lch1[..., 1] * lch2[..., 1]) * \
+        np.sin(d_lch[..., 2] / 2)
+    return np.sqrt((d_lch[..., 0] / (k_L * S_L))**2 +
+                   (d_lch[..., 1] / (k_C * S_C))**2 +
+                   (dH / (k_h * S_h))**2 +
+                   R_T * d_lch[..., 1] * dH / (k_C * S_C * k_h * S_h),
+                   out=out)
+
+
+# =============================================================================
+# All-pairs colour differences
+# =============================================================================
+
+
+def _pairwise_kernel(met, sp, k_L, k_C, k_h):
+    """
+    Return the colour space and the kernel of a metric, see pairwise.
+    """
+    euclidean_spaces = {dE_ab: space.cielab, dE_uv: space.cieluv,
+                        dE_E: space.lgj_e, dE_DIN99: space.din99,
+                        dE_DIN99b: space.din99b, dE_DIN99c: space.din99c,
+                        dE_DIN99d: space.din99d}
+    if met is euclidean or met is poincare_disk:
+        if sp is None:
+            raise RuntimeError('Colour space required for ' + met.__name__)
+        if met is euclidean:
+            return sp, _euclidean
+        return sp, lambda d1, d2, out: _poincare_disk(sp, d1, d2, out)
+    if met is dE_00:
+        return space.ciede00lch, lambda d1, d2, out: _dE_00(
+            d1, d2, k_L, k_C, k_h, out)
+    if met in euclidean_spaces:
+        return euclidean_spaces[met], _euclidean
+    raise RuntimeError('Metric not available for pairwise: ' + str(met))
+
+
+def _pairwise_blocks(rows, n, block_size, min_cols=1):
+    """
+    Generate the row and column slices of the blocks of the given rows.
+    """
+    if block_size is None:
+        block_size = max(parallel.cache_size() // 64, 2**14)
+    n_cols = max(min(n, block_size), min_cols, 1)
+    n_rows = max(block_size // n_cols, 1)
+    for start in range(rows.start, rows.stop, n_rows):
+        block_rows = slice(start, min(start + n_rows, rows.stop))
+        for col in range(0, n, n_cols):
+            yield block_rows, slice(col, min(col + n_cols, n))
+
+
+def _pairwise_data(dat1, dat2, met, sp, dtype, k_L, k_C, k_h):
+    """
+    Return the data and the kernel for pairwise, see pairwise.
+    """
+    sp, kernel = _pairwise_kernel(met, sp, k_L, k_C, k_h)
+    d1 = dat1.get_flattened(sp)
+    d2 = dat2.get_flattened(sp)
+    if dtype is None:       # floating point also for integer data
+        dtype = np.result_type(d1, d2, np.float32)
+    dtype = np.dtype(dtype)
+    return d1.astype(dtype, copy=False), d2.astype(dtype, copy=False), kernel
+
+
+def pairwise_blocks(dat1, dat2, met=dE_ab, sp=None, dtype=None,
+                    block_size=None, k_L=1, k_C=1, k_h=1):
+    """
+    Generate the colour differences between all pairs, block by block.
+
+    Each data set is converted once to the colour space of the metric,
+    and the differences are computed for one block of pairs at a time,
+    so that only one block is held in memory, see pairwise.
+
+    Parameters
+    ----------
+    dat1 : Points
+        The colour data of the first data set, N colours.
+    dat2 : Points
+        The colour data of the second data set, M colours.
+    met : function
+        The metric, see pairwise.
+    sp : Space
+        The colour space for euclidean and poincare_disk.
+    dtype : dtype
+        The floating point type of the computations, numpy.float32 or
+        numpy.float64. Defaults to that of the converted data, or
+        numpy.float32 for integer data.
+    block_size : int
+        The number of pairs per block. Sized to the cache by default.
+    k_L : float
+        Parameter of the CIEDE00 metric
+    k_C : float
+        Parameter of the CIEDE00 metric
+    k_h : float
+        Parameter of the CIEDE00 metric
+
+    Returns
+    -------
+    blocks : generator
+        Triples of the slices of the rows (colours of dat1) and columns
+        (colours of dat2) of the block, and the block of differences.
+    """
+    d1, d2, kernel = _pairwise_data(dat1, dat2, met, sp, dtype,
+                                    k_L, k_C, k_h)
+    for rows, cols in _pairwise_blocks(slice(0, len(d1)), len(d2),
+                                       block_size):
+        yield rows, cols, kernel(d1[rows, np.newaxis], d2[np.newaxis, cols],
+                                 None)
+
+
+def pairwise(dat1, dat2, met=dE_ab, sp=None, dtype=None, nearest=None,
+             out=None, block_size=None, executor=None, k_L=1, k_C=1, k_h=1):
+    """
+    Compute the colour differences between all pairs of the two data sets.
+
+    The colour differences are computed by the given metric between each
+    of the N colours of the first data set and each of the M colours of
+    the second, in blocks sized to fit in the cache. Each data set is
+    converted once to the colour space of the metric, and the blocks of
+    rows are computed in parallel on the executor in effect, see
+    colourlab.parallel. Either the full N x M matrix is returned, or,
+    if nearest is given, only the nearest colours of the second data set
+    for each colour of the first, without holding the full matrix. See
+    also pairwise_blocks.
+
+    Parameters
+    ----------
+    dat1 : Points
+        The colour data of the first data set, N colours.
+    dat2 : Points
+        The colour data of the second data set, M colours.
+    met : function
+        The metric: dE_ab, dE_uv, dE_E, dE_00, dE_DIN99, dE_DIN99b,
+        dE_DIN99c, dE_DIN99d, euclidean or poincare_disk.
+    sp : Space
+        The colour space for euclidean and poincare_disk.
+    dtype : dtype
+        The floating point type of the computations and the result,
+        numpy.float32 or numpy.float64. Defaults to that of the
+        converted data, or numpy.float32 for integer data.
+    nearest : int
+        If given, the number of nearest colours to return for each row.
+    out : ndarray
+        Optional N x M array for the result, e.g., a numpy.memmap.
+    block_size : int
+        The number of pairs per block. Sized to the cache by default.
+    executor : concurrent.futures.Executor, int or None
+        Optional executor for this call, see colourlab.parallel.
+    k_L : float
+        Parameter of the CIEDE00 metric
+    k_C : float
+        Parameter of the CIEDE00 metric
+    k_h : float
+        Parameter of the CIEDE00 metric
+
+    Returns
+    -------
+    distance : ndarray
+        N x M array of the colour differences. If nearest is given,
+        the tuple (index, distance) of N x nearest arrays of the indices
+        in the second data set and the colour differences of the nearest
+        colours in increasing order.
+    """
+    with parallel.using(executor):
+        d1, d2, kernel = _pairwise_data(dat1, dat2, met, sp, dtype,
+                                        k_L, k_C, k_h)
+        n1, n2 = len(d1), len(d2)
+        if nearest is None:
+            if out is None:
+                out = np.empty((n1, n2), d1.dtype)
+
+            def pairwise_chunk(chunk):
+                for rows, cols in _pairwise_blocks(
+                        slice(*chunk.indices(n1)[:2]), n2, block_size):
+                    kernel(d1[rows, np.newaxis], d2[np.newaxis, cols],
+                           out[rows, cols])
+
+            parallel.run_chunks(pairwise_chunk, n1, n2 * d1.itemsize)
+            return out
+        nearest = min(int(nearest), n2)
+        index = np.empty((n1, nearest), np.intp)
+        distance = np.empty((n1, nearest), d1.dtype)
+
+        def nearest_chunk(chunk):
+            best_d = best_i = None
+            for rows, cols in _pairwise_blocks(
+                    slice(*chunk.indices(n1)[:2]), n2, block_size, nearest):
+                block = kernel(d1[rows, np.newaxis], d2[np.newaxis, cols],
+                               None)
+                cand_i = np.broadcast_to(np.arange(cols.start, cols.stop),
+                                         block.shape)
+                if cols.start > 0:
+                    block = np.concatenate((best_d, block), axis=1)
+                    cand_i = np.concatenate((best_i, cand_i), axis=1)
+                sel = np.argpartition(block, nearest - 1,
+                                      axis=1)[:, :nearest]
+                best_d = np.take_along_axis(block, sel, axis=1)
+                best_i = np.take_along_axis(cand_i, sel, axis=1)
+                if cols.stop == n2:
+                    order = np.argsort(best_d, axis=1)
+                    distance[rows] = np.take_along_axis(best_d, order, 1)
+                    index[rows] = np.take_along_axis(best_i, order, 1)
+
+        parallel.run_chunks(nearest_chunk, n1, nearest * 16)
+    return index, distance
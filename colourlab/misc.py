@@ -19,7 +19,6 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 
@@ -47,6 +46,7 @@ def plot_ellipses(ellipses, axis=None, alpha=1,
     fill : bool
         Fill the ellipses or not.
     """
+    import matplotlib.pyplot as plt
     if axis is None:
         axis = plt.gca()
     for e in ellipses:
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+parallel: Chunked execution on thread pools, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import time
+import threading
+import contextlib
+from concurrent import futures
+import numpy as np
+from . import instrument
+
+
+# =============================================================================
+# Executor settings
+# =============================================================================
+
+_executor = None                # serial execution by default
+_chunk_size = None              # see chunk_size by default
+_tuned = dict()                 # calibrated chunk size factors by kernel
+_pools = dict()                 # thread pools by number of threads
+_local = threading.local()      # per thread overrides and worker flag
+
+# Smallest number of colours worth a chunk of its own
+MIN_CHUNK = 1024
+
+
+def _resolve(executor):
+    """
+    Return the executor given by an executor setting.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, int or None
+        An executor, the number of threads of a pool shared by all
+        callers asking for the same number (0 for one thread per core), or
+        None for serial execution.
+
+    Returns
+    -------
+    executor : concurrent.futures.Executor
+        The executor, or None for serial execution.
+    """
+    if executor is None or isinstance(executor, futures.Executor):
+        return executor
+    threads = int(executor) if int(executor) > 0 else os.cpu_count()
+    if threads <= 1:
+        return None
+    if threads not in _pools:
+        _pools[threads] = futures.ThreadPoolExecutor(
+            threads, thread_name_prefix='colourlab')
+    return _pools[threads]
+
+
+def set_executor(executor, chunk_size=None):
+    """
+    Set the executor used for chunked execution.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, int or None
+        An executor, the number of threads (0 for one per core), or None
+        for serial execution.
+    chunk_size : int
+        Number of colours per chunk, see chunk_size if None.
+    """
+    global _executor, _chunk_size
+    _executor = _resolve(executor)
+    _chunk_size = chunk_size
+
+
+def get_executor():
+    """
+    Return the executor used for chunked execution.
+
+    Returns
+    -------
+    executor : concurrent.futures.Executor
+        The executor, or None for serial execution.
+    """
+    return _executor
+
+
+@contextlib.contextmanager
+def using(executor, chunk_size=None):
+    """
+    Use the given executor in the current thread within a with block.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, int or None
+        An executor, or the number of threads (0 for one per core, 1 for
+        serial execution). If None, the executor in effect is kept.
+    chunk_size : int
+        Number of colours per chunk, see chunk_size if None.
+    """
+    if executor is None and chunk_size is None:
+        yield
+        return
+    if executor is None:
+        executor = current()[0]
+    previous = getattr(_local, 'setting', None)
+    _local.setting = (_resolve(executor), chunk_size)
+    try:
+        yield
+    finally:
+        _local.setting = previous
+
+
+def current(executor=None):
+    """
+    Return the executor and chunk size in effect in the current thread.
+
+    A given executor takes precedence over the one set by using, which
+    takes precedence over the one set by set_executor. Within the chunks
+    of a chunked execution, the execution is always serial.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor, int or None
+        Executor given for the call, if any.
+
+    Returns
+    -------
+    executor : concurrent.futures.Executor
+        The executor, or None for serial execution.
+    chunk_size : int
+        Number of colours per chunk, or None for chunk_size.
+    """
+    if getattr(_local, 'worker', False):
+        return None, None
+    if executor is not None:
+        return _resolve(executor), None
+    setting = getattr(_local, 'setting', None)
+    if setting is not None:
+        return setting
+    return _executor, _chunk_size
+
+
+# =============================================================================
+# Chunk size
+# =============================================================================
+
+def cache_size():
+    """
+    Return the size of the per core (level 2) cache in bytes.
+
+    Read from sysfs on Linux, 1 MiB if not available.
+
+    Returns
+    -------
+    size : int
+        The cache size in bytes.
+    """
+    if not hasattr(cache_size, 'size'):
+        cache_size.size = 2**20
+        try:
+            with open('/sys/devices/system/cpu/cpu0/cache/index2/size') as f:
+                size = f.read().strip()
+            scale = {'K': 2**10, 'M': 2**20}.get(size[-1], 1)
+            cache_size.size = int(size.rstrip('KM')) * scale
+        except (OSError, ValueError, IndexError):
+            pass
+    return cache_size.size
+
+
+def workers(executor):
+    """
+    Return the number of workers of the executor.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor
+        The executor.
+
+    Returns
+    -------
+    workers : int
+        The number of workers, the number of cores if unknown.
+    """
+    return getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+
+
+def chunk_size(n, row_bytes, executor):
+    """
+    Return the number of rows per chunk.
+
+    The chunks are sized so that the data of one chunk, including
+    temporary arrays, fit in the cache of one core, but no larger than
+    needed for giving all the workers the same number of chunks. The
+    chunked executions scale this size by a factor calibrated by timing
+    on first use, see calibrate.
+
+    Parameters
+    ----------
+    n : int
+        The number of rows.
+    row_bytes : int
+        Bytes per row of the input and output data.
+    executor : concurrent.futures.Executor
+        The executor.
+
+    Returns
+    -------
+    chunk_size : int
+        The number of rows per chunk.
+    """
+    size = cache_size() // (4 * max(row_bytes, 1))
+    size = min(size, -(-n // workers(executor)))
+    return max(size, MIN_CHUNK)
+
+
+def kernel_key(func, row_bytes, executor):
+    """
+    Return the key of the calibrated chunk size of a function.
+
+    Parameters
+    ----------
+    func : function
+        The function run on the chunks.
+    row_bytes : int
+        Bytes per row of the input and output data.
+    executor : concurrent.futures.Executor
+        The executor.
+
+    Returns
+    -------
+    key : tuple
+        The qualified name of the function, the class of the instance of
+        a method, the bytes per row and the number of workers.
+    """
+    return (getattr(func, '__qualname__', None),
+            type(getattr(func, '__self__', None)), row_bytes,
+            workers(executor))
+
+
+def calibrate(func, n, size, key):
+    """
+    Calibrate the chunk size of a function by timing the first chunks.
+
+    On first use for the key, the first rows are processed serially in
+    chunks of 1/4, 1/2, 1 and 2 times the given size, and the factor of
+    the size with the shortest time per row is stored for later calls.
+    Too few rows for the calibration are processed without it.
+
+    Parameters
+    ----------
+    func : function
+        Function of a slice.
+    n : int
+        The number of rows.
+    size : int
+        The chunk size given by chunk_size.
+    key : tuple
+        The key of the function, see kernel_key.
+
+    Returns
+    -------
+    size : int
+        The calibrated chunk size.
+    start : int
+        The number of rows processed by the calibration.
+    """
+    if key in _tuned:
+        return max(int(size * _tuned[key]), MIN_CHUNK), 0
+    factors = [.25, .5, 1., 2.]
+    sizes = [max(int(size * factor), MIN_CHUNK) for factor in factors]
+    if 2 * sum(sizes) > n:
+        return size, 0
+    start = 0
+    best = None
+    for factor, chunk in zip(factors, sizes):
+        tic = time.perf_counter()
+        _work(func, slice(start, start + chunk))
+        seconds = (time.perf_counter() - tic) / chunk
+        start += chunk
+        if best is None or seconds < best[0]:
+            best = (seconds, factor)
+    _tuned[key] = best[1]
+    return max(int(size * best[1]), MIN_CHUNK), start
+
+
+# =============================================================================
+# Chunked execution
+# =============================================================================
+
+def _work(func, chunk, reports=None):
+    """
+    Run func on a chunk, with nested chunked executions run serially.
+
+    The operations are recorded in the given instrumentation reports, if
+    any, see instrument.adopt.
+    """
+    previous = getattr(_local, 'worker', False)
+    _local.worker = True
+    try:
+        if reports is None:
+            return func(chunk)
+        with instrument.adopt(reports):
+            return func(chunk)
+    finally:
+        _local.worker = previous
+
+
+def run_chunks(func, n, row_bytes=48, executor=None, kernel=None):
+    """
+    Run func on the chunks of the rows 0, ..., n - 1.
+
+    The function is called once with the slice of each chunk, on the
+    executor in effect, see current. With serial execution, or when the
+    data fit in one chunk, it is called once with slice(None). Chunked
+    executions started by func are run serially. Unless given, the
+    chunk size is calibrated for the kernel, see calibrate.
+
+    Parameters
+    ----------
+    func : function
+        Function of a slice.
+    n : int
+        The number of rows.
+    row_bytes : int
+        Bytes per row of the input and output data.
+    executor : concurrent.futures.Executor, int or None
+        Executor given for the call, if any.
+    kernel : function
+        The function identifying the computation for the calibration of
+        the chunk size, func by default.
+    """
+    executor, size = current(executor)
+    start = 0
+    if executor is not None and size is None:
+        size = chunk_size(n, row_bytes, executor)
+        if n > size:
+            key = kernel_key(func if kernel is None else kernel, row_bytes,
+                             executor)
+            size, start = calibrate(func, n, size, key)
+            size = min(size, max(-(-n // workers(executor)), MIN_CHUNK))
+    if executor is None or n - start <= size:
+        _work(func, slice(start, n) if start else slice(None))
+        return
+    reports = instrument.thread_reports() if instrument.enabled else None
+    jobs = [executor.submit(_work, func, slice(i, min(i + size, n)),
+                            reports)
+            for i in range(start, n, size)]
+    for job in jobs:
+        job.result()
+
+
+def map_chunks(func, arrays, out, executor=None):
+    """
+    Apply func to the chunks of the arrays, storing the results in out.
+
+    Parameters
+    ----------
+    func : function
+        Function taking the chunks of the arrays as positional arguments
+        and the chunk of out as the keyword argument out. The result is
+        copied to out unless it is the given chunk itself.
+    arrays : tuple
+        Input arrays with the same length of the first axis.
+    out : ndarray
+        Output array with the same length of the first axis.
+    executor : concurrent.futures.Executor, int or None
+        Executor given for the call, if any.
+
+    Returns
+    -------
+    out : ndarray
+        The output array.
+    """
+    row_bytes = sum(a[:1].nbytes for a in arrays + (out,))
+
+    def chunk_func(chunk):
+        res = func(*[a[chunk] for a in arrays], out=out[chunk])
+        if not np.may_share_memory(res, out):
+            out[chunk] = res
+
+    run_chunks(chunk_func, len(out), row_bytes, executor, func)
+    return out
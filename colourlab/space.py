@@ -19,8 +19,241 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import inspect
+import weakref
+import threading
 import numpy as np
-from . import misc
+from . import misc, linalg, instrument, parallel
+
+
+# =============================================================================
+# Auxiliary functions
+# =============================================================================
+
+
+def float_type(ndata):
+    """
+    Return the floating point type for results computed from ndata.
+
+    Results computed from single precision data are returned in single
+    precision, whereas everything else gives double precision. Numerically
+    sensitive intermediate steps are carried out in double precision
+    regardless.
+
+    Parameters
+    ----------
+    ndata : ndarray
+        Colour data.
+
+    Returns
+    -------
+    dtype : type
+        numpy.float32 or numpy.float64.
+    """
+    if getattr(ndata, 'dtype', None) == np.float32:
+        return np.float32
+    return np.float64
+
+
+def _dot(ndata, M, out=None):
+    """
+    Apply the matrix M to all the colours in the list ndata.
+
+    Parameters
+    ----------
+    ndata : ndarray
+        N x 3 list of colour data.
+    M : ndarray
+        3 x 3 matrix.
+    out : ndarray
+        Optional array for the result, possibly ndata itself.
+
+    Returns
+    -------
+    col : ndarray
+        N x 3 list of transformed colour data.
+    """
+    if out is None:
+        return np.dot(ndata, M.T).astype(float_type(ndata), copy=False)
+    if (np.may_share_memory(out, ndata) or not out.flags.c_contiguous or
+            out.dtype != np.result_type(ndata, M)):
+        out[...] = np.dot(ndata, M.T)
+    else:
+        np.dot(ndata, M.T, out=out)
+    return out
+
+
+def _is_int_encoded(ndata):
+    """
+    Return True for 8 and 16 bit integer encoded colour data.
+
+    Parameters
+    ----------
+    ndata : ndarray
+        Colour data.
+
+    Returns
+    -------
+    int_encoded : bool
+        True if the data type is numpy.uint8 or numpy.uint16.
+    """
+    return getattr(ndata, 'dtype', None) in (np.uint8, np.uint16)
+
+
+def _lookup(table, ndata, out=None):
+    """
+    Look up integer encoded colour data in a table.
+
+    Parameters
+    ----------
+    table : ndarray
+        Table with one entry for every value of the integer type.
+    ndata : ndarray
+        Integer encoded colour data.
+    out : ndarray
+        Optional array for the result.
+
+    Returns
+    -------
+    col : ndarray
+        The table entries for the colour data.
+    """
+    if out is None:
+        return np.take(table, ndata)
+    if out.dtype == table.dtype:
+        return np.take(table, ndata, out=out)
+    out[...] = np.take(table, ndata)
+    return out
+
+
+def _store(res, out=None):
+    """
+    Return the result, copied to the output array if one is given.
+
+    Parameters
+    ----------
+    res : ndarray
+        The computed result.
+    out : ndarray
+        Optional array for the result.
+
+    Returns
+    -------
+    res : ndarray
+        The result, in out if given.
+    """
+    if out is None or out is res:
+        return res
+    out[...] = res
+    return out
+
+
+def _chunked(method, ndata, out=None, executor=None):
+    """
+    Run a conversion method on chunks of the data in parallel.
+
+    Only P x C data are split into chunks, and only when an executor is
+    in effect, see parallel.current.
+
+    Parameters
+    ----------
+    method : function
+        The conversion method, taking the data and the keyword argument out.
+    ndata : ndarray
+        Colour data.
+    out : ndarray
+        Optional array for the result, possibly ndata itself.
+    executor : concurrent.futures.Executor, int or None
+        Executor given for the call, if any.
+
+    Returns
+    -------
+    col : ndarray
+        The converted colour data, or None if they are to be converted
+        in one go.
+    """
+    if np.ndim(ndata) != 2 or parallel.current(executor)[0] is None:
+        return None
+    ndata = np.asarray(ndata)
+    if out is None:
+        out = np.empty(np.shape(ndata), float_type(ndata))
+    return parallel.map_chunks(method, (ndata,), out, executor)
+
+
+# =============================================================================
+# Workspace for reusing arrays
+# =============================================================================
+
+
+class Workspace(object):
+    """
+    Arena of preallocated arrays to be reused between conversions.
+
+    Intended for running the same conversions over and over again on
+    data of a fixed size, such as video frames or image tiles. Arrays
+    are handed out by key, typically a colour space, and shape, and the
+    same array is handed out again the next time the same key and shape
+    are requested. The contents of an array are thus only valid until
+    it is requested again, e.g., for the next frame:
+
+    .. code:: python
+
+        ws = colourlab.space.Workspace()
+        for frame in frames:
+            lab = colourlab.space.cielab.from_XYZ(
+                frame, out=ws.array('lab', frame.shape))
+
+    Workspaces are not thread safe.
+    """
+
+    def __init__(self):
+        """
+        Construct an empty workspace.
+        """
+        self.arrays = dict()
+
+    def array(self, key, shape, dtype=float):
+        """
+        Return an (uninitialised) array for the given key and shape.
+
+        Parameters
+        ----------
+        key : hashable
+            The key of the array, e.g., the colour space.
+        shape : tuple
+            The shape of the array.
+        dtype : dtype
+            The data type of the array.
+
+        Returns
+        -------
+        arr : ndarray
+            The array, reused if the key has been used with the same
+            shape and data type before.
+        """
+        shape = tuple(shape)
+        arr = self.arrays.get(key)
+        if arr is None or arr.shape != shape or arr.dtype != dtype:
+            arr = np.empty(shape, dtype)
+            self.arrays[key] = arr
+        return arr
+
+    def nbytes(self):
+        """
+        Return the total size of the arrays in the workspace.
+
+        Returns
+        -------
+        nbytes : int
+            The number of bytes held by the workspace.
+        """
+        return sum(arr.nbytes for arr in self.arrays.values())
+
+    def clear(self):
+        """
+        Release all the arrays of the workspace.
+        """
+        self.arrays.clear()
 
 
 # =============================================================================
@@ -31,10 +264,250 @@ from . import misc
 # =============================================================================
 
 
+# =============================================================================
+# Backend for the built-in transforms
+# =============================================================================
+
+
+_backend = 'numpy'
+space_core = None               # imported when the numba backend is set
+
+
+def set_backend(backend):
+    """
+    Select the implementation of the built-in colour space transforms.
+
+    With 'numpy' (the default), the transforms are computed by array
+    operations. With 'numba', the element-wise transforms and their
+    Jacobians are computed by the compiled parallel kernels of the
+    space_core module, one colour per iteration without temporary
+    arrays. The kernels, and numba, are imported when the backend is
+    first set, and compiled on first use. Linear transforms and the
+    LGJOSA transform are computed by NumPy with both backends.
+
+    Parameters
+    ----------
+    backend : str
+        'numpy' or 'numba'.
+    """
+    global _backend, space_core
+    if backend not in ('numpy', 'numba'):
+        raise ValueError('Unknown backend: ' + str(backend))
+    if backend == 'numba':
+        from . import space_core
+        if not space_core.HAVE_NUMBA:
+            raise ValueError('The numba backend requires numba.')
+    _backend = backend
+
+
+def get_backend():
+    """
+    Return the implementation of the built-in colour space transforms.
+
+    Returns
+    -------
+    backend : str
+        'numpy' or 'numba', see set_backend.
+    """
+    return _backend
+
+
+def _use_core(ndata):
+    """
+    Return True if ndata are to be converted by the space_core kernels.
+
+    Parameters
+    ----------
+    ndata : ndarray
+        List of colour data.
+
+    Returns
+    -------
+    use_core : bool
+        True for N x 3 floating point data with the numba backend.
+    """
+    return (_backend == 'numba' and np.ndim(ndata) == 2 and
+            np.shape(ndata)[1] == 3 and ndata.dtype.kind == 'f')
+
+
+# =============================================================================
+# Tape of colour data along a chain of transforms
+# =============================================================================
+
+
+class Tape(object):
+    """
+    Colour data recorded along a chain of transforms, see Space.tape_XYZ.
+
+    Stands in for the Points in the Jacobian methods of the transforms.
+    The data in XYZ and in the colour spaces currently recorded are taken
+    from the tape, the data in other colour spaces from the points.
+    """
+
+    def __init__(self, points_data):
+        """
+        Construct instance for the given colour data points.
+
+        Parameters
+        ----------
+        points_data : data.Points
+            The colour data points.
+        """
+        self.points = points_data
+        self.flattened_XYZ = points_data.flattened_XYZ
+        self.levels = dict()
+
+    def record(self, sp, ndata):
+        """
+        Record the data in a colour space.
+
+        Parameters
+        ----------
+        sp : Space
+            The colour space of the data.
+        ndata : ndarray
+            P x C colour data.
+        """
+        self.levels[sp] = ndata
+
+    def get_flattened(self, sp):
+        """
+        Return colour data in required colour space in PxC format.
+
+        Parameters
+        ----------
+        sp : Space
+            The colour space for the returned data.
+
+        Returns
+        -------
+        ndata : ndarray
+            The flattend colour data in the given colour space.
+        """
+        if sp in self.levels:
+            return self.levels[sp]
+        if sp == xyz:
+            return self.flattened_XYZ
+        return self.points.get_flattened(sp)
+
+
+# =============================================================================
+# Interning of colour spaces
+# =============================================================================
+
+_interned = dict()      # weak references to the instances by hash
+
+
+def _uninterned(key, ref):
+    """
+    Remove the weak reference to a freed canonical instance.
+    """
+    refs = _interned.get(key, [])
+    if ref in refs:
+        refs.remove(ref)
+    if not refs:
+        _interned.pop(key, None)
+
+
+def intern(sp):
+    """
+    Return the canonical instance of a colour space.
+
+    Colour spaces with equal structure share one instance, so that, e.g.,
+    colour spaces built on the fly can be compared by identity and share
+    cached data. The first instance seen becomes the canonical one, and is
+    kept for as long as it is referenced elsewhere.
+
+    Parameters
+    ----------
+    sp : Space
+        The colour space.
+
+    Returns
+    -------
+    sp : Space
+        The canonical instance equal to sp.
+    """
+    key = hash(sp)
+    for ref in _interned.get(key, []):
+        canonical = ref()
+        if canonical is not None and canonical == sp:
+            return canonical
+    _interned.setdefault(key, []).append(
+        weakref.ref(sp, lambda ref: _uninterned(key, ref)))
+    return sp
+
+
+# =============================================================================
+# Registry of named colour spaces
+# =============================================================================
+
+_registry = dict()
+_registry_names = dict()        # names by id of the colour spaces
+
+
+def register(name, sp):
+    """
+    Register a colour space under the given name.
+
+    Registered colour spaces are pickled by name, and unpickled to the
+    registered instance, so that, e.g., cached colour data sent to other
+    processes are found under the same colour spaces there. The built-in
+    colour spaces are registered under their names in this module. The
+    colour spaces must be registered in the same way in all processes.
+
+    Parameters
+    ----------
+    name : str
+        The name of the colour space.
+    sp : Space
+        The colour space.
+
+    Returns
+    -------
+    sp : Space
+        The colour space.
+    """
+    _registry[name] = sp
+    _registry_names[id(sp)] = name
+    return sp
+
+
+def registered(name):
+    """
+    Return the colour space registered under the given name.
+
+    Parameters
+    ----------
+    name : str
+        The name of the colour space, see register.
+
+    Returns
+    -------
+    sp : Space
+        The registered colour space.
+    """
+    return _registry[name]
+
+
 class Space(object):
     """
     Base class for the colour space classes.
     """
+    # True for intermediate colour spaces, which need not be cached
+    private = False
+
+    # True for classes whose instances are identified by the type, the
+    # base and the parameters, see structure. Not inherited: defaults to
+    # whether the class itself defines parameters, so that instances of
+    # other classes compare by identity.
+    structural = False
+
+    def __init_subclass__(cls, **kwargs):
+        super(Space, cls).__init_subclass__(**kwargs)
+        cls.structural = cls.__dict__.get('structural',
+                                          'parameters' in cls.__dict__)
+
     # White points in XYZ
     white_A = np.array([1.0985, 1., 0.35585])
     white_B = np.array([.990720, 1., .852230])
@@ -48,7 +521,68 @@ class Space(object):
     white_F7 = np.array([.950410, 1., 1.087470])
     white_F11 = np.array([1.009620, 1., .643500])
 
-    def empty_matrix(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space.
+
+        Together with the type and the base, the parameters identify the
+        colour space, see structure. Subclasses with parameters define
+        this method in order to compare structurally.
+
+        Returns
+        -------
+        parameters : tuple
+            Hashable tuple of the parameters, empty by default.
+        """
+        return ()
+
+    def structure(self):
+        """
+        Return the structure of the colour space.
+
+        Two colour spaces of a structural class with equal structure give
+        the same coordinates, and compare equal. Colour spaces of other
+        classes compare equal only to themselves. The structure is computed
+        once, so colour spaces should not be modified after being compared
+        or hashed.
+
+        Returns
+        -------
+        structure : tuple
+            The type and the parameters of the colour space.
+        """
+        if '_structure' not in self.__dict__:
+            self._structure = (type(self), self.parameters())
+        return self._structure
+
+    def __eq__(self, other):
+        return self is other or (self.structural and
+                                 isinstance(other, Space) and
+                                 other.structural and
+                                 self.structure() == other.structure())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        if not self.structural:
+            return object.__hash__(self)
+        if '_hash' not in self.__dict__:
+            self._hash = hash(self.structure())
+        return self._hash
+
+    def __reduce_ex__(self, protocol):
+        if _registry_names.get(id(self)) is not None:
+            return (registered, (_registry_names[id(self)],))
+        return super(Space, self).__reduce_ex__(protocol)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_structure', None)   # the hash differs between processes
+        state.pop('_hash', None)
+        return state
+
+    def empty_matrix(self, ndata, out=None):
         """
         Return list of emtpy (zero) matrixes suitable for jacobians etc.
 
@@ -56,15 +590,44 @@ class Space(object):
         ----------
         ndata : ndarray
             List of colour data.
+        out : ndarray
+            Optional preallocated array, zeroed and returned.
 
         Returns
         -------
         empty_matrix : ndarray
             List of empty matrices of dimensions corresponding to ndata.
         """
-        return np.zeros((np.shape(ndata)[0], 3, 3))
+        if out is None:
+            return np.zeros((np.shape(ndata)[0], 3, 3), float_type(ndata))
+        out[...] = 0
+        return out
 
-    def jacobian_XYZ(self, data):
+    def empty_data(self, ndata, out=None):
+        """
+        Return array suitable for holding the result of a conversion.
+
+        If an output array is given, it is returned as it is, and all
+        its entries have to be set by the caller. Otherwise, the data
+        type follows that of ndata, see float_type.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            List of colour data.
+        out : ndarray
+            Optional preallocated array for the result.
+
+        Returns
+        -------
+        empty_data : ndarray
+            Array of the same shape as ndata.
+        """
+        if out is None:
+            return np.zeros(np.shape(ndata), float_type(ndata))
+        return out
+
+    def jacobian_XYZ(self, data, out=None):
         """
         Return the Jacobian to XYZ, dx^i/dXYZ^j.
 
@@ -75,15 +638,17 @@ class Space(object):
         ----------
         data : Points
             Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
 
         Returns
         -------
         jacobian : ndarray
             The list of Jacobians to XYZ.
         """
-        return np.linalg.inv(self.inv_jacobian_XYZ(data))
+        return _store(linalg.inv3(self.inv_jacobian_XYZ(data)), out)
 
-    def inv_jacobian_XYZ(self, data):
+    def inv_jacobian_XYZ(self, data, out=None):
         """
         Return the inverse Jacobian to XYZ, dXYZ^i/dx^j.
 
@@ -94,13 +659,72 @@ class Space(object):
         ----------
         data : Points
             Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
 
         Returns
         -------
         jacobian : ndarray
             The list of Jacobians from XYZ.
         """
-        return np.linalg.inv(self.jacobian_XYZ(data))
+        return _store(linalg.inv3(self.jacobian_XYZ(data)), out)
+
+    def tape_XYZ(self, data):
+        """
+        Return the colour data and the Jacobians in one forward pass.
+
+        The chain of transforms is walked once from XYZ. At each level,
+        the data are converted from the base, and the Jacobian to the
+        base and its inverse are accumulated, with only the data of the
+        current level and its base kept on the tape, see Tape. Neither
+        the intermediate data nor the result are stored in data.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x C colour data in the current colour space.
+        jacobian : ndarray
+            The list of Jacobians to XYZ, see jacobian_XYZ.
+        inv_jacobian : ndarray
+            The list of Jacobians from XYZ, see inv_jacobian_XYZ.
+        """
+        chain = []
+        sp = self
+        while isinstance(sp, Transform):
+            chain.append(sp)
+            sp = sp.base
+        tape = Tape(data)
+        col = tape.flattened_XYZ
+        if sp != xyz:
+            col = sp.from_XYZ(col)
+            tape.record(sp, col)
+        jac = sp.jacobian_XYZ(tape)
+        inv_jac = sp.inv_jacobian_XYZ(tape)
+        for tr in reversed(chain):
+            basedata = col
+            col = tr.from_base(basedata)
+            tape.levels.clear()
+            tape.record(tr.base, basedata)
+            tape.record(tr, col)
+            if type(tr).jacobian_base is Transform.jacobian_base:
+                dbasedx = tr.inv_jacobian_base(tape)
+                dxdbase = linalg.inv3(dbasedx)
+            else:
+                dxdbase = tr.jacobian_base(tape)
+                if type(tr).inv_jacobian_base is Transform.inv_jacobian_base:
+                    dbasedx = linalg.inv3(dxdbase)
+                else:
+                    dbasedx = tr.inv_jacobian_base(tape)
+            jac = np.matmul(dxdbase, jac, out=jac)
+            inv_jac = np.matmul(inv_jac, dbasedx, out=inv_jac)
+        if col is tape.flattened_XYZ:
+            col = col.copy()
+        return col, jac, inv_jac
 
     def vectors_to_XYZ(self, points_data, vectors_ndata):
         """
@@ -119,7 +743,13 @@ class Space(object):
             Array of colour vectors in XYZ.
         """
         jacobian = self.inv_jacobian_XYZ(points_data)
-        return np.einsum('...ij,...j->...i', jacobian, vectors_ndata)
+        vectors_ndata = np.asarray(vectors_ndata)
+        vectors = np.empty(np.shape(vectors_ndata),
+                           np.result_type(jacobian, vectors_ndata))
+        return parallel.map_chunks(
+            lambda jac, vec, out: np.einsum('...ij,...j->...i', jac, vec,
+                                            out=out),
+            (jacobian, vectors_ndata), vectors)
 
     def vectors_from_XYZ(self, points_data, vectors_ndata):
         """
@@ -138,7 +768,13 @@ class Space(object):
             Array of colour vectors in the current colour space.
         """
         jacobian = self.jacobian_XYZ(points_data)
-        return np.einsum('...ij,...j->...i', jacobian, vectors_ndata)
+        vectors_ndata = np.asarray(vectors_ndata)
+        vectors = np.empty(np.shape(vectors_ndata),
+                           np.result_type(jacobian, vectors_ndata))
+        return parallel.map_chunks(
+            lambda jac, vec, out: np.einsum('...ij,...j->...i', jac, vec,
+                                            out=out),
+            (jacobian, vectors_ndata), vectors)
 
     def metrics_to_XYZ(self, points_data, metrics_ndata):
         """
@@ -157,7 +793,13 @@ class Space(object):
             Array of colour metric tensors in XYZ.
         """
         jacobian = self.jacobian_XYZ(points_data)
-        return np.einsum('...ij,...jk,...lk->...ik', jacobian, metrics_ndata, jacobian)
+        metrics_ndata = np.asarray(metrics_ndata)
+        metrics = np.empty(np.shape(metrics_ndata),
+                           np.result_type(jacobian, metrics_ndata))
+        return parallel.map_chunks(
+            lambda jac, g, out: np.einsum('...ij,...jk,...lk->...ik', jac, g,
+                                          jac, out=out),
+            (jacobian, metrics_ndata), metrics)
 
     def metrics_from_XYZ(self, points_data, metrics_ndata):
         """
@@ -176,7 +818,13 @@ class Space(object):
             Array of colour metric tensors in the current colour space.
         """
         jacobian = self.inv_jacobian_XYZ(points_data)
-        return np.einsum('...ij,...jk,...lk->...ik', jacobian, metrics_ndata, jacobian)
+        metrics_ndata = np.asarray(metrics_ndata)
+        metrics = np.empty(np.shape(metrics_ndata),
+                           np.result_type(jacobian, metrics_ndata))
+        return parallel.map_chunks(
+            lambda jac, g, out: np.einsum('...ij,...jk,...lk->...ik', jac, g,
+                                          jac, out=out),
+            (jacobian, metrics_ndata), metrics)
 
 
 class XYZ(Space):
@@ -188,7 +836,9 @@ class XYZ(Space):
     it serves as a common reference point.
     """
 
-    def to_XYZ(self, ndata):
+    structural = True
+
+    def to_XYZ(self, ndata, out=None, executor=None):
         """
         Convert from current colour space to XYZ.
 
@@ -196,15 +846,21 @@ class XYZ(Space):
         ----------
         ndata : ndarray
             Colour data in the current colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
+        executor : concurrent.futures.Executor, int or None
+            Not used, the data are only copied.
 
         Returns
         -------
         xyz : ndarray
             Colour data in the XYZ colour space.
         """
-        return ndata.copy()      # identity transform
+        if out is None:
+            return np.array(ndata, float_type(ndata))   # identity transform
+        return _store(ndata, out)
 
-    def from_XYZ(self, ndata):
+    def from_XYZ(self, ndata, out=None, executor=None):
         """
         Convert from XYZ to current colour space.
 
@@ -212,15 +868,21 @@ class XYZ(Space):
         ----------
         ndata : ndarray
             Colour data in the XYZ colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
+        executor : concurrent.futures.Executor, int or None
+            Not used, the data are only copied.
 
         Returns
         -------
         xyz : ndarray
             Colour data in the current colour space.
         """
-        return ndata.copy()      # identity transform
+        if out is None:
+            return np.array(ndata, float_type(ndata))   # identity transform
+        return _store(ndata, out)
 
-    def jacobian_XYZ(self, data):
+    def jacobian_XYZ(self, data, out=None):
         """
         Return the Jacobian to XYZ, dx^i/dXYZ^j.
 
@@ -231,17 +893,19 @@ class XYZ(Space):
         ----------
         data : Points
             Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
 
         Returns
         -------
         jacobian : ndarray
             The list of Jacobians to XYZ.
         """
-        jac = self.empty_matrix(data.flattened_XYZ)
+        jac = self.empty_matrix(data.flattened_XYZ, out)
         jac[:] = np.eye(3)
         return jac
 
-    def inv_jacobian_XYZ(self, data):
+    def inv_jacobian_XYZ(self, data, out=None):
         """
         Return the inverse Jacobian to XYZ, dXYZ^i/dx^j.
 
@@ -252,13 +916,15 @@ class XYZ(Space):
         ----------
         data : Points
             Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
 
         Returns
         -------
         jacobian : ndarray
             The list of Jacobians from XYZ.
         """
-        ijac = self.empty_matrix(data.flattened_XYZ)
+        ijac = self.empty_matrix(data.flattened_XYZ, out)
         ijac[:] = np.eye(3)
         return ijac
 
@@ -268,9 +934,22 @@ class Transform(Space):
     Base class for colour space transforms.
 
     Real transforms (children) must implement to_base, from_base and either
-    jacobian_base or inv_jacobian_base.
+    jacobian_base or inv_jacobian_base. The to_base and from_base methods
+    take an optional output array, out, which may be the input array
+    itself, so that chains of transforms can be run in place. Methods
+    without the out argument are supported as well, see call_base.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super(Transform, cls).__init_subclass__(**kwargs)
+        cls.takes_out = dict()
+        for method in ('to_base', 'from_base'):
+            try:
+                parameters = inspect.signature(getattr(cls, method)).parameters
+                cls.takes_out[method] = 'out' in parameters
+            except (AttributeError, TypeError, ValueError):
+                cls.takes_out[method] = False
+
     def __init__(self, base):
         """
         Construct instance and set base space for transformation.
@@ -282,37 +961,112 @@ class Transform(Space):
         """
         self.base = base
 
-    def to_XYZ(self, ndata):
+    def structure(self):
+        """
+        Return the structure of the colour space.
+
+        Returns
+        -------
+        structure : tuple
+            The type, the base and the parameters of the colour space.
+        """
+        if '_structure' not in self.__dict__:
+            self._structure = (type(self), self.base, self.parameters())
+        return self._structure
+
+    def call_base(self, method, ndata, out=None):
+        """
+        Call to_base or from_base with the given output array.
+
+        Methods without the out argument are called without it, and the
+        result is copied to the output array.
+
+        Parameters
+        ----------
+        method : str
+            'to_base' or 'from_base'.
+        ndata : ndarray
+            Colour data.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
+
+        Returns
+        -------
+        col : ndarray
+            The converted colour data.
+        """
+        if self.takes_out[method]:
+            return getattr(self, method)(ndata, out)
+        col = getattr(self, method)(ndata)
+        if out is None or col is out:
+            return col
+        out[...] = col
+        return out
+
+    def to_XYZ(self, ndata, out=None, executor=None):
         """
         Transform data to XYZ by using the transformation to the base.
 
+        Only the first step of the chain allocates a new array (unless
+        out is given), the remaining steps are run in place. With an
+        executor in effect, see colourlab.parallel, P x C data are
+        converted in chunks in parallel.
+
         Parameters
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
+        executor : concurrent.futures.Executor, int or None
+            Optional executor for this call, see colourlab.parallel.
 
         Returns
         -------
         xyz : ndarray
             Colour data in the XYZ colour space
         """
-        return self.base.to_XYZ(self.to_base(ndata))
+        col = _chunked(self.to_XYZ, ndata, out, executor)
+        if col is not None:
+            return col
+        if instrument.enabled:
+            col = instrument.timed(self, 'to_base', 1, self.call_base,
+                                   'to_base', ndata, out)
+        else:
+            col = self.call_base('to_base', ndata, out)
+        return self.base.to_XYZ(col, col)
 
-    def from_XYZ(self, ndata):
+    def from_XYZ(self, ndata, out=None, executor=None):
         """
         Transform data from XYZ using the transformation to the base.
 
+        Only the first step of the chain allocates a new array (unless
+        out is given), the remaining steps are run in place. With an
+        executor in effect, see colourlab.parallel, P x C data are
+        converted in chunks in parallel.
+
         Parameters
         ----------
         ndata : ndarray
             Colour data in the XYZ colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
+        executor : concurrent.futures.Executor, int or None
+            Optional executor for this call, see colourlab.parallel.
 
         Returns
         -------
         xyz : ndarray
             Colour data in the current colour space.
         """
-        return self.from_base(self.base.from_XYZ(ndata))
+        col = _chunked(self.from_XYZ, ndata, out, executor)
+        if col is not None:
+            return col
+        col = self.base.from_XYZ(ndata, out)
+        if instrument.enabled:
+            return instrument.timed(self, 'from_base', 1, self.call_base,
+                                    'from_base', col, col)
+        return self.call_base('from_base', col, col)
 
     def jacobian_base(self, data):
         """
@@ -331,7 +1085,7 @@ class Transform(Space):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
-        return np.linalg.inv(self.inv_jacobian_base(data))
+        return linalg.inv3(self.inv_jacobian_base(data))
 
     def inv_jacobian_base(self, data):
         """
@@ -350,20 +1104,23 @@ class Transform(Space):
         jacobian : ndarray
             The list of Jacobians from the base colour space.
         """
-        return np.linalg.inv(self.jacobian_base(data))
+        return linalg.inv3(self.jacobian_base(data))
 
-    def jacobian_XYZ(self, data):
+    def jacobian_XYZ(self, data, out=None):
         """
         Return the Jacobian to XYZ, dx^i/dXYZ^j.
 
         The Jacobian is calculated at the given data points (of the
         Points class) using the jacobian to the base and the Jacobian
-        of the base space.
+        of the base space. The products along the chain are
+        accumulated in one array.
 
         Parameters
         ----------
         data : Points
             Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
 
         Returns
         -------
@@ -371,31 +1128,42 @@ class Transform(Space):
             The list of Jacobians to XYZ.
 
         """
-        dxdbase = self.jacobian_base(data)
-        dbasedXYZ = self.base.jacobian_XYZ(data)
-        return np.einsum('...ij,...jk->...ik', dxdbase, dbasedXYZ)
+        if instrument.enabled:
+            dxdbase = instrument.timed(self, 'jacobian_base', 2,
+                                       self.jacobian_base, data)
+        else:
+            dxdbase = self.jacobian_base(data)
+        dbasedXYZ = self.base.jacobian_XYZ(data, out)
+        return np.matmul(dxdbase, dbasedXYZ, out=dbasedXYZ)
 
-    def inv_jacobian_XYZ(self, data):
+    def inv_jacobian_XYZ(self, data, out=None):
         """
         Return the inverse Jacobian to XYZ, dXYZ^i/dx^j.
 
         The Jacobian is calculated at the given data points (of the
         Points class) using the inverse jacobian to the base and the
-        inverse Jacobian of the base space.
+        inverse Jacobian of the base space. The products along the
+        chain are accumulated in one array.
 
         Parameters
         ----------
         data : Points
             Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
 
         Returns
         -------
         jacobian : ndarray
             The list of Jacobians from XYZ.
         """
-        dXYZdbase = self.base.inv_jacobian_XYZ(data)
-        dbasedx = self.inv_jacobian_base(data)
-        return np.einsum('...ij,...jk->...ik', dXYZdbase, dbasedx)
+        dXYZdbase = self.base.inv_jacobian_XYZ(data, out)
+        if instrument.enabled:
+            dbasedx = instrument.timed(self, 'inv_jacobian_base', 2,
+                                       self.inv_jacobian_base, data)
+        else:
+            dbasedx = self.inv_jacobian_base(data)
+        return np.matmul(dXYZdbase, dbasedx, out=dXYZdbase)
 
 
 class TransformxyY(Transform):
@@ -403,6 +1171,8 @@ class TransformxyY(Transform):
     The XYZ to xyY projective transform.
     """
 
+    structural = True
+
     def __init__(self, base):
         """
         Construct instance.
@@ -414,7 +1184,7 @@ class TransformxyY(Transform):
         """
         super(TransformxyY, self).__init__(base)
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Convert from xyY to XYZ.
 
@@ -422,19 +1192,25 @@ class TransformxyY(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        xyz = np.zeros(np.shape(ndata))
-        xyz[:, 0] = ndata[:, 0]*ndata[:, 2] / ndata[:, 1]
+        if _use_core(ndata):
+            return space_core.xyy_to_base(ndata, self.empty_data(ndata, out))
+        X = ndata[:, 0] * ndata[:, 2] / ndata[:, 1]
+        Z = (1 - ndata[:, 0] - ndata[:, 1]) * ndata[:, 2] / ndata[:, 1]
+        xyz = self.empty_data(ndata, out)
         xyz[:, 1] = ndata[:, 2]
-        xyz[:, 2] = (1 - ndata[:, 0] - ndata[:, 1]) * ndata[:, 2] / ndata[:, 1]
+        xyz[:, 0] = X
+        xyz[:, 2] = Z
         return xyz
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from XYZ to xyY.
 
@@ -442,18 +1218,24 @@ class TransformxyY(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
+        if _use_core(ndata):
+            return space_core.xyy_from_base(ndata, self.empty_data(ndata, out))
         xyz = ndata
-        xyY = np.zeros(np.shape(xyz))
         xyz_sum = np.sum(xyz, axis=1)
-        xyY[:, 0] = xyz[:, 0] / xyz_sum  # x
-        xyY[:, 1] = xyz[:, 1] / xyz_sum  # y
+        x = xyz[:, 0] / xyz_sum
+        y = xyz[:, 1] / xyz_sum
+        xyY = self.empty_data(xyz, out)
         xyY[:, 2] = xyz[:, 1]            # Y
+        xyY[:, 0] = x
+        xyY[:, 1] = y
         return xyY
 
     def jacobian_base(self, data):
@@ -474,21 +1256,20 @@ class TransformxyY(Transform):
             The list of Jacobians to the base colour space.
         """
         xyzdata = data.get_flattened(self.base)
+        if _use_core(xyzdata):
+            return space_core.xyy_jacobian(xyzdata, self.empty_matrix(xyzdata))
+        X = xyzdata[:, 0]
+        Y = xyzdata[:, 1]
+        Z = xyzdata[:, 2]
+        s2 = (X + Y + Z) ** 2
         jac = self.empty_matrix(xyzdata)
-        for i in range(np.shape(jac)[0]):
-            jac[i, 0, 0] = (xyzdata[i, 1] + xyzdata[i, 2]) / \
-                (xyzdata[i, 0] + xyzdata[i, 1] + xyzdata[i, 2]) ** 2
-            jac[i, 0, 1] = -xyzdata[i, 0] / \
-                (xyzdata[i, 0] + xyzdata[i, 1] + xyzdata[i, 2]) ** 2
-            jac[i, 0, 2] = -xyzdata[i, 0] / \
-                (xyzdata[i, 0] + xyzdata[i, 1] + xyzdata[i, 2]) ** 2
-            jac[i, 1, 0] = -xyzdata[i, 1] / \
-                (xyzdata[i, 0] + xyzdata[i, 1] + xyzdata[i, 2]) ** 2
-            jac[i, 1, 1] = (xyzdata[i, 0] + xyzdata[i, 2]) / \
-                (xyzdata[i, 0] + xyzdata[i, 1] + xyzdata[i, 2]) ** 2
-            jac[i, 1, 2] = -xyzdata[i, 1] / \
-                (xyzdata[i, 0] + xyzdata[i, 1] + xyzdata[i, 2]) ** 2
-            jac[i, 2, 1] = 1
+        jac[:, 0, 0] = (Y + Z) / s2
+        jac[:, 0, 1] = -X / s2
+        jac[:, 0, 2] = -X / s2
+        jac[:, 1, 0] = -Y / s2
+        jac[:, 1, 1] = (X + Z) / s2
+        jac[:, 1, 2] = -Y / s2
+        jac[:, 2, 1] = 1
         return jac
 
     def inv_jacobian_base(self, data):
@@ -509,16 +1290,20 @@ class TransformxyY(Transform):
             The list of Jacobians to the base colour space.
         """
         xyYdata = data.get_flattened(self)
+        if _use_core(xyYdata):
+            return space_core.xyy_inv_jacobian(
+                xyYdata, self.empty_matrix(xyYdata))
+        x = xyYdata[:, 0]
+        y = xyYdata[:, 1]
+        Y = xyYdata[:, 2]
         jac = self.empty_matrix(xyYdata)
-        for i in range(np.shape(jac)[0]):
-            jac[i, 0, 0] = xyYdata[i, 2] / xyYdata[i, 1]
-            jac[i, 0, 1] = - xyYdata[i, 0] * xyYdata[i, 2] / xyYdata[i, 1] ** 2
-            jac[i, 0, 2] = xyYdata[i, 0] / xyYdata[i, 1]
-            jac[i, 1, 2] = 1
-            jac[i, 2, 0] = - xyYdata[i, 2] / xyYdata[i, 1]
-            jac[i, 2, 1] = xyYdata[i, 2] * (xyYdata[i, 0] - 1) / \
-                xyYdata[i, 1] ** 2
-            jac[i, 2, 2] = (1 - xyYdata[i, 0] - xyYdata[i, 1]) / xyYdata[i, 1]
+        jac[:, 0, 0] = Y / y
+        jac[:, 0, 1] = - x * Y / y ** 2
+        jac[:, 0, 2] = x / y
+        jac[:, 1, 2] = 1
+        jac[:, 2, 0] = - Y / y
+        jac[:, 2, 1] = Y * (x - 1) / y ** 2
+        jac[:, 2, 2] = (1 - x - y) / y
         return jac
 
 
@@ -548,10 +1333,25 @@ class TransformCIELAB(Transform):
         else:
             self.white_point = white_point
 
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The white point.
+        """
+        return tuple(float(w) for w in np.ravel(self.white_point))
+
     def f(self, ndata):
         """
         Auxiliary function for the conversion.
+
+        Computed in double precision, since the cube root is sensitive
+        to rounding errors close to the threshold.
         """
+        ndata = np.asarray(ndata, dtype=float)
         fx = (self.kappa * ndata + 16.) / 116.
         fx[ndata > self.epsilon] = ndata[ndata > self.epsilon] ** (1. / 3)
         return fx
@@ -562,12 +1362,26 @@ class TransformCIELAB(Transform):
 
         Returns the derivative of the function f above. Works for arrays.
         """
+        ndata = np.asarray(ndata, dtype=float)
         df = self.kappa / 116. * np.ones(np.shape(ndata))
         df[ndata > self.epsilon] = \
             (ndata[ndata > self.epsilon] ** (-2. / 3)) / 3
         return df
 
-    def to_base(self, ndata):
+    def dfinvdx(self, ndata):
+        """
+        Auxiliary function for the inverse Jacobian.
+
+        Returns the derivative of the inverse of the function f above.
+        Works for arrays.
+        """
+        ndata = np.asarray(ndata, dtype=float)
+        df = 116. / self.kappa * np.ones(np.shape(ndata))
+        df[ndata ** 3 > self.epsilon] = \
+            3 * ndata[ndata ** 3 > self.epsilon] ** 2
+        return df
+
+    def to_base(self, ndata, out=None):
         """
         Convert from CIELAB to XYZ (base).
 
@@ -575,32 +1389,37 @@ class TransformCIELAB(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        ndata
-        fy = (ndata[:, 0] + 16.) / 116.
-        fx = ndata[:, 1] / 500. + fy
-        fz = fy - ndata[:, 2] / 200.
+        if _use_core(ndata):
+            return space_core.cielab_to_base(
+                ndata, self.white_point, self.empty_data(ndata, out))
+        lab = np.asarray(ndata, dtype=float)
+        fy = (lab[:, 0] + 16.) / 116.
+        fx = lab[:, 1] / 500. + fy
+        fz = fy - lab[:, 2] / 200.
         xr = fx ** 3
         xr[xr <= self.epsilon] = ((116 * fx[xr <= self.epsilon] - 16) /
                                   self.kappa)
         yr = fy ** 3
-        yr[ndata[:, 0] <= self.kappa * self.epsilon] = \
-            ndata[ndata[:, 0] <= self.kappa * self.epsilon, 0] / self.kappa
+        yr[lab[:, 0] <= self.kappa * self.epsilon] = \
+            lab[lab[:, 0] <= self.kappa * self.epsilon, 0] / self.kappa
         zr = fz ** 3
         zr[zr <= self.epsilon] = ((116 * fz[zr <= self.epsilon] - 16) /
                                   self.kappa)
-        xyz = np.zeros(np.shape(ndata))
+        xyz = self.empty_data(ndata, out)
         xyz[:, 0] = xr * self.white_point[0]
         xyz[:, 1] = yr * self.white_point[1]
         xyz[:, 2] = zr * self.white_point[2]
         return xyz
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from XYZ (base) to CIELAB.
 
@@ -608,16 +1427,21 @@ class TransformCIELAB(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
-        lab = np.zeros(np.shape(ndata))
+        if _use_core(ndata):
+            return space_core.cielab_from_base(
+                ndata, self.white_point, self.empty_data(ndata, out))
         fx = self.f(ndata[:, 0] / self.white_point[0])
         fy = self.f(ndata[:, 1] / self.white_point[1])
         fz = self.f(ndata[:, 2] / self.white_point[2])
+        lab = self.empty_data(ndata, out)
         lab[:, 0] = 116. * fy - 16.
         lab[:, 1] = 500. * (fx - fy)
         lab[:, 2] = 200. * (fy - fz)
@@ -641,6 +1465,9 @@ class TransformCIELAB(Transform):
             The list of Jacobians to the base colour space.
         """
         d = data.get_flattened(self.base)
+        if _use_core(d):
+            return space_core.cielab_jacobian(
+                d, self.white_point, self.empty_matrix(d))
         dr = d.copy()
         for i in range(3):
             dr[:, i] = dr[:, i] / self.white_point[i]
@@ -653,6 +1480,41 @@ class TransformCIELAB(Transform):
         jac[:, 2, 2] = -200 * df[:, 2] / self.white_point[2]  # db/dZ
         return jac
 
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian from XYZ (base), dXYZ^i/dCIELAB^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        lab = data.get_flattened(self)
+        if _use_core(lab):
+            return space_core.cielab_inv_jacobian(
+                lab, self.white_point, self.empty_matrix(lab))
+        fy = (lab[:, 0] + 16.) / 116.
+        fx = lab[:, 1] / 500. + fy
+        fz = fy - lab[:, 2] / 200.
+        dfx = self.dfinvdx(fx) * self.white_point[0]
+        dfy = self.dfinvdx(fy) * self.white_point[1]
+        dfz = self.dfinvdx(fz) * self.white_point[2]
+        jac = self.empty_matrix(lab)
+        jac[:, 0, 0] = dfx / 116.    # dX/dL
+        jac[:, 0, 1] = dfx / 500.    # dX/da
+        jac[:, 1, 0] = dfy / 116.    # dY/dL
+        jac[:, 2, 0] = dfz / 116.    # dZ/dL
+        jac[:, 2, 2] = -dfz / 200.   # dZ/db
+        return jac
+
 
 class TransformCIELUV(Transform):
     """
@@ -680,10 +1542,25 @@ class TransformCIELUV(Transform):
         else:
             self.white_point = white_point
 
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The white point.
+        """
+        return tuple(float(w) for w in np.ravel(self.white_point))
+
     def f(self, ndata):
         """
         Auxiliary function for the conversion.
+
+        Computed in double precision, since the cube root is sensitive
+        to rounding errors close to the threshold.
         """
+        ndata = np.asarray(ndata, dtype=float)
         fx = (self.kappa * ndata + 16.) / 116.
         fx[ndata > self.epsilon] = ndata[ndata > self.epsilon] ** (1. / 3)
         return fx
@@ -694,12 +1571,13 @@ class TransformCIELUV(Transform):
 
         Returns the derivative of the function f above. Works for arrays.
         """
+        ndata = np.asarray(ndata, dtype=float)
         df = self.kappa / 116. * np.ones(np.shape(ndata))
         df[ndata > self.epsilon] = \
             (ndata[ndata > self.epsilon] ** (-2. / 3)) / 3
         return df
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Convert from CIELUV to XYZ (base).
 
@@ -707,17 +1585,23 @@ class TransformCIELUV(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        luv = ndata
+        if _use_core(ndata):
+            return space_core.cieluv_to_base(
+                ndata, self.white_point, self.empty_data(ndata, out))
+        luv = np.asarray(ndata, dtype=float)
         fy = (luv[:, 0] + 16.) / 116.
         y = fy ** 3
         y[luv[:, 0] <= self.kappa * self.epsilon] = \
             luv[luv[:, 0] <= self.kappa * self.epsilon, 0] / self.kappa
+        y = y * self.white_point[1]
         upr = 4 * self.white_point[0] / (self.white_point[0] +
                                          15*self.white_point[1] +
                                          3*self.white_point[2])
@@ -731,13 +1615,13 @@ class TransformCIELUV(Transform):
         x = (d - b) / (a - c)
         z = x * a + b
         # Combine into matrix
-        xyz = np.zeros(np.shape(luv))
+        xyz = self.empty_data(ndata, out)
         xyz[:, 0] = x
         xyz[:, 1] = y
         xyz[:, 2] = z
         return xyz
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from XYZ (base) to CIELUV.
 
@@ -745,14 +1629,18 @@ class TransformCIELUV(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
+        if _use_core(ndata):
+            return space_core.cieluv_from_base(
+                ndata, self.white_point, self.empty_data(ndata, out))
         d = ndata
-        luv = np.zeros(np.shape(d))
         fy = self.f(d[:, 1] / self.white_point[1])
         up = 4 * d[:, 0] / (d[:, 0] + 15*d[:, 1] + 3*d[:, 2])
         upr = 4 * self.white_point[0] / (self.white_point[0] +
@@ -762,6 +1650,7 @@ class TransformCIELUV(Transform):
         vpr = 9 * self.white_point[1] / (self.white_point[0] +
                                          15*self.white_point[1] +
                                          3*self.white_point[2])
+        luv = self.empty_data(d, out)
         luv[:, 0] = 116. * fy - 16.
         luv[:, 1] = 13 * luv[:, 0] * (up - upr)
         luv[:, 2] = 13 * luv[:, 0] * (vp - vpr)
@@ -784,6 +1673,10 @@ class TransformCIELUV(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
+        basedata = data.get_flattened(self.base)
+        if _use_core(basedata):
+            return space_core.cieluv_jacobian(
+                basedata, self.white_point, self.empty_matrix(basedata))
         xyz_ = data.get_flattened(xyz)
         luv = data.get_flattened(cieluv)
         df = self.dfdx(xyz_)
@@ -827,11 +1720,71 @@ class TransformCIELUV(Transform):
             (xyz_[:, 0] + 15 * xyz_[:, 1] + 3 * xyz_[:, 2]) ** 2
         return jac
 
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian from XYZ (base), dXYZ^i/dCIELUV^j.
 
-class TransformCIEDE00(Transform):
-    """
-    The CIELAB to CIEDE00 L'a'b' colour space transform.
-    """
+        The Jacobian is calculated at the given data points (of the
+        Points class) by the chain rule via Y, u' and v'.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        luv = data.get_flattened(self)
+        if _use_core(luv):
+            return space_core.cieluv_inv_jacobian(
+                luv, self.white_point, self.empty_matrix(luv))
+        L = luv[:, 0]
+        u = luv[:, 1]
+        v = luv[:, 2]
+        fy = (L + 16.) / 116.
+        Y = fy ** 3
+        dY_dL = 3 * fy ** 2 / 116.
+        Y[L <= self.kappa * self.epsilon] = \
+            L[L <= self.kappa * self.epsilon] / self.kappa
+        dY_dL[L <= self.kappa * self.epsilon] = 1. / self.kappa
+        Y = Y * self.white_point[1]
+        dY_dL = dY_dL * self.white_point[1]
+        upr = 4 * self.white_point[0] / (self.white_point[0] +
+                                         15*self.white_point[1] +
+                                         3*self.white_point[2])
+        vpr = 9 * self.white_point[1] / (self.white_point[0] +
+                                         15*self.white_point[1] +
+                                         3*self.white_point[2])
+        up = u / (13 * L) + upr
+        vp = v / (13 * L) + vpr
+        # d(Y, u', v') / d(L, u, v):
+        dYupvp = self.empty_matrix(luv)
+        dYupvp[:, 0, 0] = dY_dL
+        dYupvp[:, 1, 0] = - u / (13 * L ** 2)
+        dYupvp[:, 1, 1] = 1 / (13 * L)
+        dYupvp[:, 2, 0] = - v / (13 * L ** 2)
+        dYupvp[:, 2, 2] = 1 / (13 * L)
+        # dXYZ / d(Y, u', v'):
+        dXYZ = self.empty_matrix(luv)
+        dXYZ[:, 0, 0] = 9 * up / (4 * vp)
+        dXYZ[:, 0, 1] = 9 * Y / (4 * vp)
+        dXYZ[:, 0, 2] = - 9 * Y * up / (4 * vp ** 2)
+        dXYZ[:, 1, 0] = 1
+        dXYZ[:, 2, 0] = (12 - 3 * up - 20 * vp) / (4 * vp)
+        dXYZ[:, 2, 1] = - 3 * Y / (4 * vp)
+        dXYZ[:, 2, 2] = - Y * (12 - 3 * up) / (4 * vp ** 2)
+        return np.einsum('...ij,...jk->...ik', dXYZ, dYupvp)
+
+
+class TransformCIEDE00(Transform):
+    """
+    The CIELAB to CIEDE00 L'a'b' colour space transform.
+    """
+
+    structural = True
 
     def __init__(self, base):
         """
@@ -844,7 +1797,7 @@ class TransformCIEDE00(Transform):
         """
         super(TransformCIEDE00, self).__init__(base)
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Convert from CIEDE00 to CIELAB (base).
 
@@ -852,6 +1805,8 @@ class TransformCIEDE00(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
@@ -860,7 +1815,7 @@ class TransformCIEDE00(Transform):
         """
         raise RuntimeError('No conversion of CIEDE00 Lab to CIELAB implemented (yet).')
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from CIELAB (base) to CIEDE00.
 
@@ -868,17 +1823,25 @@ class TransformCIEDE00(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         labp : ndarray
             Colour data in the CIEDE00 L'a'b' colour space.
         """
+        if _use_core(ndata):
+            return space_core.ciede00_from_base(
+                ndata, self.empty_data(ndata, out))
         lab = ndata
-        labp = lab.copy()
         Cab = np.sqrt(lab[:, 1]**2 + lab[:, 2]**2)
         G = .5 * (1 - np.sqrt(Cab**7 / (Cab**7 + 25**7)))
-        labp[:, 1] = lab[:, 1] * (1 + G)
+        ap = lab[:, 1] * (1 + G)
+        labp = self.empty_data(lab, out)
+        labp[:, 0] = lab[:, 0]
+        labp[:, 2] = lab[:, 2]
+        labp[:, 1] = ap
         return labp
 
     def jacobian_base(self, data):
@@ -898,6 +1861,10 @@ class TransformCIEDE00(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
+        basedata = data.get_flattened(self.base)
+        if _use_core(basedata):
+            return space_core.ciede00_jacobian(
+                basedata, False, self.empty_matrix(basedata))
         lab = data.get_flattened(cielab)
         lch = data.get_flattened(cielch)
         a = lab[:, 1]
@@ -907,26 +1874,49 @@ class TransformCIEDE00(Transform):
         jac = self.empty_matrix(lab)
         jac[:, 0, 0] = 1        # dLp/dL
         jac[:, 2, 2] = 1        # dbp/db
-        # jac[:, 1, 1] = 1 + G - misc.safe_div(a**2, C) * \
-        #     (7 * 25**7 * C**(5/2.) /
-        #      (4 * (C**7 + 25**7)**(3/2.)))  # dap/da
         jac[:, 1, 1] = 1 + G - misc.safe_div(a**2, C) * \
             (7 * 25**7 * C**(5/2.) /
-             (8 * (C**7 + 25**7)**(3/2.)))  # dap/da
+             (4 * (C**7 + 25**7)**(3/2.)))  # dap/da
         jac[C == 0, 1, 1] = 1
-        # jac[:, 1, 2] = - a * misc.safe_div(b, C) * \
-        #     (7 * 25**7 * C**(5/2.) / (4 * (C**7 + 25**7)**(3/2.)))
         jac[:, 1, 2] = - a * misc.safe_div(b, C) * \
-            (7 * 25**7 * C**(5/2.) / (8 * (C**7 + 25**7)**(3/2.)))
+            (7 * 25**7 * C**(5/2.) / (4 * (C**7 + 25**7)**(3/2.)))
         jac[C == 0, 1, 2] = 0
         return jac
 
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian from CIELAB (base), dCIELAB^i/dCIEDE00^j.
+
+        Only a' depends on more than one variable, so the inverse is
+        given directly by the entries of the Jacobian.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        basedata = data.get_flattened(self.base)
+        if _use_core(basedata):
+            return space_core.ciede00_jacobian(
+                basedata, True, self.empty_matrix(basedata))
+        jac = self.jacobian_base(data)
+        jac[:, 1, 2] = - jac[:, 1, 2] / jac[:, 1, 1]   # da/db'
+        jac[:, 1, 1] = 1 / jac[:, 1, 1]                # da/da'
+        return jac
+
 
 class TransformSRGB(Transform):
     """
     Transform linear RGB with sRGB primaries to sRGB.
     """
 
+    structural = True
+
     def __init__(self, base):
         """
         Construct sRGB space instance, setting the base (linear RGB).
@@ -937,25 +1927,60 @@ class TransformSRGB(Transform):
             The base colour space.
         """
         super(TransformSRGB, self).__init__(base)
+        self.int_tables = dict()
+
+    def int_table(self, dtype, float_dtype=np.float64):
+        """
+        Return the linearisation table for integer encoded sRGB data.
 
-    def to_base(self, ndata):
+        The table is computed on first use and kept for later calls.
+
+        Parameters
+        ----------
+        dtype : dtype
+            numpy.uint8 or numpy.uint16. The maximum value represents 1.
+        float_dtype : dtype
+            The floating point type of the table, numpy.float32 or
+            numpy.float64. Computed in double precision regardless.
+
+        Returns
+        -------
+        table : ndarray
+            The linear values for all the values of the integer type.
+        """
+        key = (np.dtype(dtype), np.dtype(float_dtype))
+        if key not in self.int_tables:
+            self.int_tables[key] = self.to_base(
+                np.linspace(0, 1, np.iinfo(key[0]).max + 1)).astype(key[1])
+        return self.int_tables[key]
+
+    def to_base(self, ndata, out=None):
         """
         Convert from sRGB to linear RGB. Performs gamut clipping if necessary.
 
+        8 and 16 bit integer encoded data (numpy.uint8 and numpy.uint16)
+        are linearised by table lookup.
+
         Parameters
         ----------
         ndata : ndarray
             Colour data in the sRGB colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the linear RGB colour space
         """
-        nd = ndata.copy()
-        nd[nd < 0] = 0
-        nd[nd > 1] = 1
-        rgb = ((nd + 0.055) / 1.055)**2.4
+        if _is_int_encoded(ndata):
+            col = self.empty_data(ndata, out)
+            return _lookup(self.int_table(ndata.dtype, col.dtype), ndata, col)
+        if _use_core(ndata):
+            return space_core.srgb_to_base(ndata, self.empty_data(ndata, out))
+        nd = np.clip(ndata, 0, 1)
+        rgb = self.empty_data(nd, out)
+        rgb[...] = ((nd + 0.055) / 1.055)**2.4
         rgb[nd <= 0.04045] = nd[nd <= 0.04045] / 12.92
         return rgb
 
@@ -977,6 +2002,8 @@ class TransformSRGB(Transform):
             The list of Jacobians to the base colour space.
         """
         rgb = data.get_flattened(self.base)
+        if _use_core(rgb):
+            return space_core.srgb_jacobian(rgb, False, self.empty_matrix(rgb))
         r = rgb[:, 0]
         g = rgb[:, 1]
         b = rgb[:, 2]
@@ -989,7 +2016,34 @@ class TransformSRGB(Transform):
         jac[b < 0.0031308, 2, 2] = 12.92
         return jac
 
-    def from_base(self, ndata):
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian from linear RGB (base), dRGB^i/dsRGB^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        rgb = data.get_flattened(self.base)
+        if _use_core(rgb):
+            return space_core.srgb_jacobian(rgb, True, self.empty_matrix(rgb))
+        drgb = 2.4 / 1.055 * np.abs(rgb)**(1 - 1 / 2.4)
+        drgb[rgb < 0.0031308] = 1 / 12.92
+        jac = self.empty_matrix(rgb)
+        diag = np.arange(3)
+        jac[:, diag, diag] = drgb
+        return jac
+
+    def from_base(self, ndata, out=None):
         """
         Convert from linear RGB to sRGB. Performs gamut clipping if necessary.
 
@@ -997,16 +2051,20 @@ class TransformSRGB(Transform):
         ----------
         ndata : ndarray
             Colour data in the linear colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the sRGB colour space
         """
-        nd = ndata.copy()
-        nd[nd < 0] = 0
-        nd[nd > 1] = 1
-        srgb = 1.055 * nd**(1 / 2.4) - 0.055
+        if _use_core(ndata):
+            return space_core.srgb_from_base(
+                ndata, self.empty_data(ndata, out))
+        nd = np.clip(ndata, 0, 1)
+        srgb = self.empty_data(nd, out)
+        srgb[...] = 1.055 * nd**(1 / 2.4) - 0.055
         srgb[nd <= 0.0031308] = 12.92 * nd[nd <= 0.0031308]
         return srgb
 
@@ -1029,7 +2087,18 @@ class TransformLinear(Transform):
         self.M = M.copy()
         self.M_inv = np.linalg.inv(M)
 
-    def to_base(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The entries of the matrix.
+        """
+        return tuple(float(m) for m in np.ravel(self.M))
+
+    def to_base(self, ndata, out=None):
         """
         Convert from linear to the base.
 
@@ -1037,18 +2106,17 @@ class TransformLinear(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        xyz = np.zeros(np.shape(ndata))
-        for i in range(np.shape(ndata)[0]):
-            xyz[i] = np.dot(self.M_inv, ndata[i])
-        return xyz
+        return _dot(ndata, self.M_inv, out)
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from the base to linear.
 
@@ -1056,17 +2124,15 @@ class TransformLinear(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
-        xyz = ndata
-        lins = np.zeros(np.shape(xyz))
-        for i in range(np.shape(xyz)[0]):
-            lins[i] = np.dot(self.M, xyz[i])
-        return lins
+        return _dot(ndata, self.M, out)
 
     def jacobian_base(self, data):
         """
@@ -1135,24 +2201,72 @@ class TransformGamma(Transform):
         super(TransformGamma, self).__init__(base)
         self.gamma = float(gamma)
         self.gamma_inv = 1. / gamma
+        self.int_tables = dict()
 
-    def to_base(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The gamma.
+        """
+        return (self.gamma,)
+
+    def int_table(self, dtype, float_dtype=np.float64):
+        """
+        Return the linearisation table for integer encoded data.
+
+        The table is computed on first use and kept for later calls.
+
+        Parameters
+        ----------
+        dtype : dtype
+            numpy.uint8 or numpy.uint16. The maximum value represents 1.
+        float_dtype : dtype
+            The floating point type of the table, numpy.float32 or
+            numpy.float64. Computed in double precision regardless.
+
+        Returns
+        -------
+        table : ndarray
+            The base values for all the values of the integer type.
+        """
+        key = (np.dtype(dtype), np.dtype(float_dtype))
+        if key not in self.int_tables:
+            self.int_tables[key] = self.to_base(
+                np.linspace(0, 1, np.iinfo(key[0]).max + 1)).astype(key[1])
+        return self.int_tables[key]
+
+    def to_base(self, ndata, out=None):
         """
         Convert from gamma corrected to XYZ (base).
 
+        8 and 16 bit integer encoded data (numpy.uint8 and numpy.uint16),
+        e.g., Adobe RGB images, are converted by table lookup.
+
         Parameters
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        return np.sign(ndata) * np.abs(ndata)**self.gamma_inv
+        col = self.empty_data(ndata, out)
+        if _is_int_encoded(ndata):
+            return _lookup(self.int_table(ndata.dtype, col.dtype), ndata, col)
+        if _use_core(ndata):
+            return space_core.gamma(ndata, self.gamma_inv, col)
+        return np.multiply(np.sign(ndata), np.abs(ndata)**self.gamma_inv,
+                           out=col)
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from XYZ to gamma corrected.
 
@@ -1160,13 +2274,19 @@ class TransformGamma(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
-        return np.sign(ndata) * np.abs(ndata)**self.gamma
+        col = self.empty_data(ndata, out)
+        if _use_core(ndata):
+            return space_core.gamma(ndata, self.gamma, col)
+        return np.multiply(np.sign(ndata), np.abs(ndata)**self.gamma,
+                           out=col)
 
     def jacobian_base(self, data):
         """
@@ -1186,14 +2306,40 @@ class TransformGamma(Transform):
             The list of Jacobians to the base colour space.
         """
         basedata = data.get_flattened(self.base)
+        if _use_core(basedata):
+            return space_core.gamma_jacobian(
+                basedata, self.gamma, self.empty_matrix(basedata))
         jac = self.empty_matrix(basedata)
-        for i in range(np.shape(basedata)[0]):
-            jac[i, 0, 0] = self.gamma * \
-                np.abs(basedata[i, 0])**(self.gamma - 1)
-            jac[i, 1, 1] = self.gamma * \
-                np.abs(basedata[i, 1])**(self.gamma - 1)
-            jac[i, 2, 2] = self.gamma * \
-                np.abs(basedata[i, 2])**(self.gamma - 1)
+        diag = np.arange(3)
+        jac[:, diag, diag] = self.gamma * \
+            np.abs(basedata)**(self.gamma - 1)
+        return jac
+
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian from XYZ (base), dXYZ^i/dgamma^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        ndata = data.get_flattened(self)
+        if _use_core(ndata):
+            return space_core.gamma_jacobian(
+                ndata, self.gamma_inv, self.empty_matrix(ndata))
+        jac = self.empty_matrix(ndata)
+        diag = np.arange(3)
+        jac[:, diag, diag] = self.gamma_inv * \
+            np.abs(ndata)**(self.gamma_inv - 1)
         return jac
 
 
@@ -1204,6 +2350,8 @@ class TransformPolar(Transform):
     For example CIELAB to CIELCH.
     """
 
+    structural = True
+
     def __init__(self, base):
         """
         Construct instance, setting base space.
@@ -1215,7 +2363,7 @@ class TransformPolar(Transform):
         """
         super(TransformPolar, self).__init__(base)
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Convert from polar to Cartesian.
 
@@ -1223,21 +2371,27 @@ class TransformPolar(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        Lab = np.zeros(np.shape(ndata))
-        Lab[:, 0] = ndata[:, 0]
+        if _use_core(ndata):
+            return space_core.cartesian(ndata, self.empty_data(ndata, out))
         C = ndata[:, 1]
         h = ndata[:, 2]
-        Lab[:, 1] = C * np.cos(h)
-        Lab[:, 2] = C * np.sin(h)
+        a = C * np.cos(h)
+        b = C * np.sin(h)
+        Lab = self.empty_data(ndata, out)
+        Lab[:, 0] = ndata[:, 0]
+        Lab[:, 1] = a
+        Lab[:, 2] = b
         return Lab
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from Cartesian (base) to polar.
 
@@ -1245,18 +2399,24 @@ class TransformPolar(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
-        LCh = np.zeros(np.shape(ndata))
-        LCh[:, 0] = ndata[:, 0]
+        if _use_core(ndata):
+            return space_core.polar(ndata, self.empty_data(ndata, out))
         x = ndata[:, 1]
         y = ndata[:, 2]
-        LCh[:, 1] = np.sqrt(x**2 + y**2)
-        LCh[:, 2] = np.arctan2(y, x)
+        C = np.sqrt(x**2 + y**2)
+        h = np.arctan2(y, x)
+        LCh = self.empty_data(ndata, out)
+        LCh[:, 0] = ndata[:, 0]
+        LCh[:, 1] = C
+        LCh[:, 2] = h
         return LCh
 
     def inv_jacobian_base(self, data):
@@ -1277,18 +2437,52 @@ class TransformPolar(Transform):
             The list of Jacobians to the base colour space.
         """
         LCh = data.get_flattened(self)
+        if _use_core(LCh):
+            return space_core.cartesian_jacobian_polar(
+                LCh, True, self.empty_matrix(LCh))
         C = LCh[:, 1]
         h = LCh[:, 2]
         jac = self.empty_matrix(LCh)
-        for i in range(np.shape(jac)[0]):
-            jac[i, 0, 0] = 1                     # dL/dL
-            jac[i, 1, 1] = np.cos(h[i])          # da/dC
-            jac[i, 1, 2] = -C[i] * np.sin(h[i])  # da/dh
-            jac[i, 2, 1] = np.sin(h[i])          # db/dC
-            jac[i, 2, 2] = C[i] * np.cos(h[i])   # db/dh
-            if C[i] == 0:
-                jac[i, 2, 2] = 1
-                jac[i, 1, 1] = 1
+        jac[:, 0, 0] = 1                # dL/dL
+        jac[:, 1, 1] = np.cos(h)        # da/dC
+        jac[:, 1, 2] = -C * np.sin(h)   # da/dh
+        jac[:, 2, 1] = np.sin(h)        # db/dC
+        jac[:, 2, 2] = C * np.cos(h)    # db/dh
+        jac[C == 0, 2, 2] = 1
+        jac[C == 0, 1, 1] = 1
+        return jac
+
+    def jacobian_base(self, data):
+        """
+        Return the Jacobian to CIELAB (base), dCIELCH^i/dCIELAB^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians to the base colour space.
+        """
+        Lab = data.get_flattened(self.base)
+        if _use_core(Lab):
+            return space_core.polar_jacobian_cartesian(
+                Lab, self.empty_matrix(Lab))
+        a = Lab[:, 1]
+        b = Lab[:, 2]
+        C2 = a**2 + b**2
+        C = np.sqrt(C2)
+        jac = self.empty_matrix(Lab)
+        jac[:, 0, 0] = 1                            # dL/dL
+        jac[:, 1, 1] = misc.safe_div(a, C)          # dC/da
+        jac[:, 1, 2] = misc.safe_div(b, C, 0)       # dC/db
+        jac[:, 2, 1] = -misc.safe_div(b, C2, 0)     # dh/da
+        jac[:, 2, 2] = misc.safe_div(a, C2)         # dh/db
         return jac
 
 
@@ -1299,6 +2493,8 @@ class TransformCartesian(Transform):
     For example CIELCH to CIELAB.
     """
 
+    structural = True
+
     def __init__(self, base):
         """
         Construct instance, setting base space.
@@ -1310,7 +2506,7 @@ class TransformCartesian(Transform):
         """
         super(TransformCartesian, self).__init__(base)
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Convert from polar to Cartesian.
 
@@ -1318,21 +2514,27 @@ class TransformCartesian(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
-        Lab = np.zeros(np.shape(ndata))
-        Lab[:, 0] = ndata[:, 0]
+        if _use_core(ndata):
+            return space_core.cartesian(ndata, self.empty_data(ndata, out))
         C = ndata[:, 1]
         h = ndata[:, 2]
-        Lab[:, 1] = C * np.cos(h)
-        Lab[:, 2] = C * np.sin(h)
+        a = C * np.cos(h)
+        b = C * np.sin(h)
+        Lab = self.empty_data(ndata, out)
+        Lab[:, 0] = ndata[:, 0]
+        Lab[:, 1] = a
+        Lab[:, 2] = b
         return Lab
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Convert from Cartesian (base) to polar.
 
@@ -1340,18 +2542,24 @@ class TransformCartesian(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        LCh = np.zeros(np.shape(ndata))
-        LCh[:, 0] = ndata[:, 0]
+        if _use_core(ndata):
+            return space_core.polar(ndata, self.empty_data(ndata, out))
         x = ndata[:, 1]
         y = ndata[:, 2]
-        LCh[:, 1] = np.sqrt(x**2 + y**2)
-        LCh[:, 2] = np.arctan2(y, x)
+        C = np.sqrt(x**2 + y**2)
+        h = np.arctan2(y, x)
+        LCh = self.empty_data(ndata, out)
+        LCh[:, 0] = ndata[:, 0]
+        LCh[:, 1] = C
+        LCh[:, 2] = h
         return LCh
 
     def jacobian_base(self, data):
@@ -1372,15 +2580,47 @@ class TransformCartesian(Transform):
             The list of Jacobians to the base colour space.
         """
         LCh = data.get_flattened(self.base)
+        if _use_core(LCh):
+            return space_core.cartesian_jacobian_polar(
+                LCh, False, self.empty_matrix(LCh))
+        C = LCh[:, 1]
+        h = LCh[:, 2]
+        jac = self.empty_matrix(LCh)
+        jac[:, 0, 0] = 1                # dL/dL
+        jac[:, 1, 1] = np.cos(h)        # da/dC
+        jac[:, 1, 2] = -C * np.sin(h)   # da/dh
+        jac[:, 2, 1] = np.sin(h)        # db/dC
+        jac[:, 2, 2] = C * np.cos(h)    # db/dh
+        return jac
+
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian to CIELCh (base), dCIELCH^i/dCIELAB^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        LCh = data.get_flattened(self.base)
+        if _use_core(LCh):
+            return space_core.polar_jacobian_polar(LCh, self.empty_matrix(LCh))
         C = LCh[:, 1]
         h = LCh[:, 2]
         jac = self.empty_matrix(LCh)
-        for i in range(np.shape(jac)[0]):
-            jac[i, 0, 0] = 1                     # dL/dL
-            jac[i, 1, 1] = np.cos(h[i])          # da/dC
-            jac[i, 1, 2] = -C[i] * np.sin(h[i])  # da/dh
-            jac[i, 2, 1] = np.sin(h[i])          # db/dC
-            jac[i, 2, 2] = C[i] * np.cos(h[i])   # db/dh
+        jac[:, 0, 0] = 1                                # dL/dL
+        jac[:, 1, 1] = np.cos(h)                        # dC/da
+        jac[:, 1, 2] = np.sin(h)                        # dC/db
+        jac[:, 2, 1] = -misc.safe_div(np.sin(h), C, 0)  # dh/da
+        jac[:, 2, 2] = misc.safe_div(np.cos(h), C)      # dh/db
         return jac
 
 
@@ -1388,7 +2628,7 @@ class TransformLGJOSA(Transform):
     """
     Transform from XYZ type coordinates to L_osa G J.
     """
-    def __init__(self, base):
+    def __init__(self, base, inversion='newton', tol=1e-10, max_iter=50):
         """
         Construct instance, setting base space.
 
@@ -1396,47 +2636,162 @@ class TransformLGJOSA(Transform):
         ----------
         base : Space
             The base colour space.
+        inversion : str
+            Method for the numerical inversion in to_base, either
+            'newton' (batched damped Newton iterations for all the data
+            points at once) or 'fmin' (Nelder-Mead for every point).
+        tol : float
+            Tolerance of the residual for the Newton iterations.
+        max_iter : int
+            Maximum number of Newton iterations.
         """
         super(TransformLGJOSA, self).__init__(base)
+        self.inversion = inversion
+        self.tol = tol
+        self.max_iter = max_iter
         self.space_ABC = TransformLinear(self.base,
                                          np.array([[0.6597, 0.4492, -0.1089],
                                                    [-0.3053, 1.2126, 0.0927],
                                                    [-0.0374, 0.4795, 0.5579]]))
         self.space_xyY = TransformxyY(self.base)
 
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The inversion method, tolerance and iterations.
+        """
+        return (self.inversion, float(self.tol), self.max_iter)
+
     def err_func(self, xyz, lgj):
         clgj = self.from_base(np.reshape(xyz, (1, 3)))
         diff = clgj - np.reshape(lgj, (1, 3))
         n = np.linalg.norm(diff)
         return n
 
-    def to_base(self, ndata):
+    def to_base_fmin(self, ndata, out=None):
+        """
+        Convert from LGJOSA to XYZ (base) by Nelder-Mead for every point.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
+
+        Returns
+        -------
+        col : ndarray
+            Colour data in the base colour space
+        """
+        import scipy.optimize
+        xyz = self.empty_data(ndata, out)
+        for i in range(np.shape(xyz)[0]):
+            xyz_guess = .5 * np.ones(3)
+            lgj = ndata[i].copy()
+            xyz[i] = scipy.optimize.fmin(self.err_func, xyz_guess, (lgj,),
+                                         disp=False)
+        return xyz
+
+    def to_base_newton(self, ndata):
+        """
+        Convert from LGJOSA to XYZ (base) by batched Newton iterations.
+
+        All the points are iterated at once using the analytic Jacobian,
+        with step halving for the points where a full step does not
+        reduce the residual. Points that have converged are taken out of
+        the iterations.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            Colour data in the current colour space
+
+        Returns
+        -------
+        col : ndarray
+            Colour data in the base colour space
+        converged : ndarray
+            Boolean array, True for the points that converged.
+        """
+        xyz = .5 * np.ones(np.shape(ndata))
+        converged = np.zeros(np.shape(ndata)[0], dtype=bool)
+        failed = np.zeros(np.shape(ndata)[0], dtype=bool)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            res = self.from_base(xyz) - ndata
+            err = np.sqrt(np.sum(res**2, axis=1))
+            for it in range(self.max_iter):
+                converged[err < self.tol] = True
+                active = np.where(~converged & ~failed)[0]
+                if len(active) == 0:
+                    break
+                x = xyz[active]
+                jac_inv = linalg.inv3(self.jacobian_from_base(x))
+                step = np.einsum('...ij,...j->...i', jac_inv, res[active])
+                t = np.ones(len(active))
+                x_new = x - step
+                res_new = self.from_base(x_new) - ndata[active]
+                err_new = np.sqrt(np.sum(res_new**2, axis=1))
+                bad = ~(err_new < err[active])
+                for halving in range(20):
+                    if not bad.any():
+                        break
+                    t[bad] = t[bad] / 2
+                    x_new[bad] = x[bad] - t[bad, np.newaxis] * step[bad]
+                    res_new[bad] = self.from_base(x_new[bad]) - \
+                        ndata[active[bad]]
+                    err_new[bad] = np.sqrt(np.sum(res_new[bad]**2, axis=1))
+                    bad = ~(err_new < err[active])
+                failed[active[bad]] = True
+                good = active[~bad]
+                xyz[good] = x_new[~bad]
+                res[good] = res_new[~bad]
+                err[good] = err_new[~bad]
+            converged[err < self.tol] = True
+        return xyz, converged
+
+    def to_base(self, ndata, out=None):
         """
         Convert from LGJOSA to XYZ (base).
 
         Implemented as numerical inversion of the from_base method,
         since the functions unfortunately are not analytically
-        invertible.
+        invertible. Depending on the inversion attribute, either batched
+        Newton iterations with Nelder-Mead as the fallback for the points
+        that do not converge, or Nelder-Mead for all points, is used.
 
         Parameters
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        import scipy.optimize
-        xyz = .5 * np.ones(np.shape(ndata))
-        for i in range(np.shape(xyz)[0]):
-            xyz_guess = xyz[i].copy()
-            lgj = ndata[i].copy()
-            xyz[i] = scipy.optimize.fmin(self.err_func, xyz_guess, (lgj,))
+        if self.inversion == 'fmin':
+            return self.to_base_fmin(ndata, out)
+        elif self.inversion != 'newton':
+            raise RuntimeError('Unknown inversion method: ' +
+                               str(self.inversion))
+        lgj = np.asarray(ndata, dtype=float)
+        xyz_newton, converged = self.to_base_newton(lgj)
+        retry = ~converged & np.all(np.isfinite(lgj), axis=1)
+        xyz_newton[~converged] = np.nan
+        if retry.any():
+            xyz_newton[retry] = self.to_base_fmin(lgj[retry])
+        xyz = self.empty_data(ndata, out)
+        xyz[...] = xyz_newton
         return xyz
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Transform from base to LGJ OSA.
 
@@ -1444,6 +2799,8 @@ class TransformLGJOSA(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space (XYZ).
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
@@ -1469,7 +2826,7 @@ class TransformLGJOSA(Transform):
         J = 2 * (0.5735 * L_osa + 7.0892) * (
             0.1792 * (np.log(A) - np.log(0.9366 * B)) +
             0.9237 * (np.log(B) - np.log(0.9807 * C)))
-        col = np.zeros(np.shape(ndata))
+        col = self.empty_data(ndata, out)
         col[:, 0] = L_osa
         col[:, 1] = G
         col[:, 2] = J
@@ -1492,15 +2849,62 @@ class TransformLGJOSA(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
-        ABC = data.get_flattened(self.space_ABC)
-        xyY = data.get_flattened(self.space_xyY)
+        return self.jacobian_from_base(data.get_flattened(self.base))
+
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian to XYZ (base), dXYZ^i/dLGJOSA^j.
+
+        There is no closed form inverse transform, so the inverse
+        Jacobian is computed by the explicit 3x3 inversion of the
+        analytic Jacobian.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        return linalg.inv3(self.jacobian_base(data))
+
+    def jacobian_from_base(self, ndata):
+        """
+        Return the Jacobian from XYZ (base), dLGJOSA^i/dXYZ^j.
+
+        The Jacobian is calculated at the given numerical colour data in
+        the base colour space.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            Colour data in the base colour space (XYZ).
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians to the base colour space.
+        """
+        ABC = self.space_ABC.from_base(ndata)
+        xyY = self.space_xyY.from_base(ndata)
         x = xyY[:, 0]
         y = xyY[:, 1]
         Y = xyY[:, 2]
         A = ABC[:, 0]
         B = ABC[:, 1]
         C = ABC[:, 2]
-        dxyY_dXYZ = self.space_xyY.jacobian_base(data)
+        xyz_sum2 = np.sum(ndata, axis=1)**2
+        dxyY_dXYZ = self.empty_matrix(ndata)
+        dxyY_dXYZ[:, 0, 0] = (ndata[:, 1] + ndata[:, 2]) / xyz_sum2
+        dxyY_dXYZ[:, 0, 1] = -ndata[:, 0] / xyz_sum2
+        dxyY_dXYZ[:, 0, 2] = -ndata[:, 0] / xyz_sum2
+        dxyY_dXYZ[:, 1, 0] = -ndata[:, 1] / xyz_sum2
+        dxyY_dXYZ[:, 1, 1] = (ndata[:, 0] + ndata[:, 2]) / xyz_sum2
+        dxyY_dXYZ[:, 1, 2] = -ndata[:, 1] / xyz_sum2
+        dxyY_dXYZ[:, 2, 1] = 1
         dx_dX = dxyY_dXYZ[:, 0, 0]
         dx_dY = dxyY_dXYZ[:, 0, 1]
         dx_dZ = dxyY_dXYZ[:, 0, 2]
@@ -1510,23 +2914,24 @@ class TransformLGJOSA(Transform):
         dY_dX = dxyY_dXYZ[:, 2, 0]
         dY_dY = dxyY_dXYZ[:, 2, 1]
         dY_dZ = dxyY_dXYZ[:, 2, 2]
-        dABC_dXYZ = self.space_ABC.jacobian_base(data)
-        dA_dX = dABC_dXYZ[:, 0, 0]
-        dA_dY = dABC_dXYZ[:, 0, 1]
-        dA_dZ = dABC_dXYZ[:, 0, 2]
-        dB_dX = dABC_dXYZ[:, 1, 0]
-        dB_dY = dABC_dXYZ[:, 1, 1]
-        dB_dZ = dABC_dXYZ[:, 1, 2]
-        dC_dX = dABC_dXYZ[:, 2, 0]
-        dC_dY = dABC_dXYZ[:, 2, 1]
-        dC_dZ = dABC_dXYZ[:, 2, 2]
+        dABC_dXYZ = self.space_ABC.M
+        dA_dX = dABC_dXYZ[0, 0]
+        dA_dY = dABC_dXYZ[0, 1]
+        dA_dZ = dABC_dXYZ[0, 2]
+        dB_dX = dABC_dXYZ[1, 0]
+        dB_dY = dABC_dXYZ[1, 1]
+        dB_dZ = dABC_dXYZ[1, 2]
+        dC_dX = dABC_dXYZ[2, 0]
+        dC_dY = dABC_dXYZ[2, 1]
+        dC_dZ = dABC_dXYZ[2, 2]
         Y_0 = 100 * Y * (4.4934 * x**2 + 4.3034 * y**2 - 4.2760 * x * y -
                          1.3744 * x - 2.5643 * y + 1.8103)
         L = (5.9 * ((Y_0**(1/3.) - (2/3.)) +
                     0.0042 * np.sign(Y_0 - 30) *
                     np.abs(Y_0 - 30)**(1/3.)) - 14.4) / np.sqrt(2)
-        dL_dY0 = 5.9 * (Y_0**(-2./3) + 0.042 * np.sign(Y_0 - 30) *
-                        np.abs(Y_0 - 30)**(-2./3) / 3) / np.sqrt(2)
+        dL_dY0 = 5.9 * (Y_0**(-2./3) +
+                        0.0042 * np.abs(Y_0 - 30)**(-2./3)) / \
+            (3 * np.sqrt(2))
         dY0_dx = 100 * Y * (4.4934 * 2 * x - 4.2760 * y - 1.3744)
         dY0_dy = 100 * Y * (4.3034 * 2 * y - 4.2760 * x - 2.5643)
         dY0_dY = 100 * (4.4934 * x**2 + 4.3034 * y**2 - 4.2760 * x * y -
@@ -1541,20 +2946,20 @@ class TransformLGJOSA(Transform):
         SG = - 2 * (0.764 * L + 9.2521)
         SJ = 2 * (0.5735 * L + 7.0892)
         dG_dL = - 2 * 0.764 * TG
-        dJ_dL = 2 * 0.57354 * TJ
+        dJ_dL = 2 * 0.5735 * TJ
         dG_dA = misc.safe_div(SG * 0.9482, A)
         dG_dB = misc.safe_div(SG * (-0.9482 - 0.3175), B)
         dG_dC = misc.safe_div(SG * 0.3175, C)
         dJ_dA = misc.safe_div(SJ * 0.1792, A)
-        dJ_dB = misc.safe_div(SJ * (-0.1792 + 0.9837), B)
-        dJ_dC = misc.safe_div(SJ * (-0.9837), C)
+        dJ_dB = misc.safe_div(SJ * (-0.1792 + 0.9237), B)
+        dJ_dC = misc.safe_div(SJ * (-0.9237), C)
         dG_dX = dG_dL * dL_dX + dG_dA * dA_dX + dG_dB * dB_dX + dG_dC * dC_dX
         dG_dY = dG_dL * dL_dY + dG_dA * dA_dY + dG_dB * dB_dY + dG_dC * dC_dY
         dG_dZ = dG_dL * dL_dZ + dG_dA * dA_dZ + dG_dB * dB_dZ + dG_dC * dC_dZ
         dJ_dX = dJ_dL * dL_dX + dJ_dA * dA_dX + dJ_dB * dB_dX + dJ_dC * dC_dX
         dJ_dY = dJ_dL * dL_dY + dJ_dA * dA_dY + dJ_dB * dB_dY + dJ_dC * dC_dY
         dJ_dZ = dJ_dL * dL_dZ + dJ_dA * dA_dZ + dJ_dB * dB_dZ + dJ_dC * dC_dZ
-        jac = self.empty_matrix(ABC)
+        jac = self.empty_matrix(ndata)
         jac[:, 0, 0] = dL_dX
         jac[:, 0, 1] = dL_dY
         jac[:, 0, 2] = dL_dZ
@@ -1586,7 +2991,18 @@ class TransformLGJE(Transform):
         self.ac = 1.256
         self.bc = 0.050
 
-    def to_base(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The compression parameters.
+        """
+        return (self.aL, self.bL, self.ac, self.bc)
+
+    def to_base(self, ndata, out=None):
         """
         Convert from LGJE to LGJOSA (base).
 
@@ -1594,12 +3010,18 @@ class TransformLGJE(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
+        if _use_core(ndata):
+            return space_core.lgje_to_base(
+                ndata, self.aL, self.bL, self.ac, self.bc,
+                self.empty_data(ndata, out))
         LE = ndata[:, 0]
         GE = ndata[:, 1]
         JE = ndata[:, 2]
@@ -1609,13 +3031,13 @@ class TransformLGJE(Transform):
         scale = misc.safe_div(C, CE)
         G = - scale * GE
         J = - scale * JE
-        col = ndata.copy()
+        col = self.empty_data(ndata, out)
         col[:, 0] = L
         col[:, 1] = G
         col[:, 2] = J
         return col
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Transform from LGJOSA (base) to LGJE.
 
@@ -1623,12 +3045,18 @@ class TransformLGJE(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space (LGJOSA).
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the LGJOSA colour space.
         """
+        if _use_core(ndata):
+            return space_core.lgje_from_base(
+                ndata, self.aL, self.bL, self.ac, self.bc,
+                self.empty_data(ndata, out))
         L = ndata[:, 0]
         G = ndata[:, 1]
         J = ndata[:, 2]
@@ -1638,7 +3066,7 @@ class TransformLGJE(Transform):
         scale = misc.safe_div(C_E, C)
         G_E = - scale * G
         J_E = - scale * J
-        col = ndata.copy()
+        col = self.empty_data(ndata, out)
         col[:, 0] = L_E
         col[:, 1] = G_E
         col[:, 2] = J_E
@@ -1661,12 +3089,16 @@ class TransformLGJE(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
-        lgj = data.get(self.base)
+        lgj = data.get_flattened(self.base)
+        if _use_core(lgj):
+            return space_core.lgje_jacobian(
+                lgj, self.aL, self.bL, self.ac, self.bc,
+                self.empty_matrix(lgj))
         L = lgj[:, 0]
         G = lgj[:, 1]
         J = lgj[:, 2]
         C = np.sqrt(G**2 + J**2)
-        lgj_e = data.get(self)
+        lgj_e = data.get_flattened(self)
         C_E = np.sqrt(lgj_e[:, 1]**2 + lgj_e[:, 2]**2)
         dLE_dL = 10 / (self.aL + 10 * self.bL * L)
         dCE_dC = 10 / (self.ac + 10 * self.bc * C)
@@ -1675,10 +3107,10 @@ class TransformLGJE(Transform):
         dC_dJ = misc.safe_div(J, C)
         dCEC_dG = dCEC_dC * dC_dG
         dCEC_dJ = dCEC_dC * dC_dJ
-        dGE_dG = - misc.safe_div(C_E, C) - G * dCEC_dG
+        dGE_dG = - misc.safe_div(C_E, C, 10 / self.ac) - G * dCEC_dG
         dGE_dJ = - G * dCEC_dJ
         dJE_dG = - J * dCEC_dG
-        dJE_dJ = - misc.safe_div(C_E, C) - J * dCEC_dJ
+        dJE_dJ = - misc.safe_div(C_E, C, 10 / self.ac) - J * dCEC_dJ
         jac = self.empty_matrix(lgj)
         jac[:, 0, 0] = dLE_dL
         jac[:, 1, 1] = dGE_dG
@@ -1687,6 +3119,44 @@ class TransformLGJE(Transform):
         jac[:, 2, 2] = dJE_dJ
         return jac
 
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian to LGJOSA (base), dLGJOSA^i/dLGJE^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        lgj_e = data.get_flattened(self)
+        if _use_core(lgj_e):
+            return space_core.lgje_inv_jacobian(
+                lgj_e, self.aL, self.bL, self.ac, self.bc,
+                self.empty_matrix(lgj_e))
+        LE = lgj_e[:, 0]
+        GE = lgj_e[:, 1]
+        JE = lgj_e[:, 2]
+        CE = np.sqrt(GE**2 + JE**2)
+        C = self.ac * (np.exp(self.bc * CE) - 1) / (10 * self.bc)
+        dC_dCE = self.ac * np.exp(self.bc * CE) / 10
+        scale = misc.safe_div(C, CE, self.ac / 10)
+        dscale = misc.safe_div(dC_dCE * CE - C, CE**3, 0)
+        jac = self.empty_matrix(lgj_e)
+        jac[:, 0, 0] = self.aL * np.exp(self.bL * LE) / 10   # dL/dLE
+        jac[:, 1, 1] = - scale - dscale * GE**2             # dG/dGE
+        jac[:, 1, 2] = - dscale * GE * JE                   # dG/dJE
+        jac[:, 2, 1] = - dscale * GE * JE                   # dJ/dGE
+        jac[:, 2, 2] = - scale - dscale * JE**2             # dJ/dJE
+        return jac
+
 
 class TransformLogCompressL(Transform):
     """
@@ -1707,7 +3177,18 @@ class TransformLogCompressL(Transform):
         self.aL = aL
         self.bL = bL
 
-    def from_base(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The compression parameters.
+        """
+        return (float(self.aL), float(self.bL))
+
+    def from_base(self, ndata, out=None):
         """
         Transform from Lab (base) to L'ab.
 
@@ -1715,17 +3196,24 @@ class TransformLogCompressL(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space (Lab).
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the La'b' colour space.
         """
-        Lpab = ndata.copy()
-        Lpab[:, 0] = self.aL * np.log(1 + self.bL * ndata[:, 0])
+        if _use_core(ndata):
+            return space_core.log_compress_l(
+                ndata, self.aL, self.bL, False, self.empty_data(ndata, out))
+        Lp = self.aL * np.log(1 + self.bL * ndata[:, 0])
+        Lpab = self.empty_data(ndata, out)
+        Lpab[:, 1:] = ndata[:, 1:]
+        Lpab[:, 0] = Lp
         return Lpab
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Transform from L'ab to Lab (base).
 
@@ -1733,14 +3221,21 @@ class TransformLogCompressL(Transform):
         ----------
         ndata : ndarray
             Colour data in L'ab colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the Lab colour space.
         """
-        Lab = ndata.copy()
-        Lab[:, 0] = (np.exp(ndata[:, 0] / self.aL) - 1) / self.bL
+        if _use_core(ndata):
+            return space_core.log_compress_l(
+                ndata, self.aL, self.bL, True, self.empty_data(ndata, out))
+        L = (np.exp(ndata[:, 0] / self.aL) - 1) / self.bL
+        Lab = self.empty_data(ndata, out)
+        Lab[:, 1:] = ndata[:, 1:]
+        Lab[:, 0] = L
         return Lab
 
     def jacobian_base(self, data):
@@ -1760,7 +3255,10 @@ class TransformLogCompressL(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
-        lab = data.get(self.base)
+        lab = data.get_flattened(self.base)
+        if _use_core(lab):
+            return space_core.log_compress_l_jacobian(
+                lab, self.aL, self.bL, False, self.empty_matrix(lab))
         L = lab[:, 0]
         dLp_dL = self.aL * self.bL / (1 + self.bL * L)
         jac = self.empty_matrix(lab)
@@ -1769,6 +3267,34 @@ class TransformLogCompressL(Transform):
         jac[:, 2, 2] = 1
         return jac
 
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian to Lab (base), dLab^i/dL'ab^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        lpab = data.get_flattened(self)
+        if _use_core(lpab):
+            return space_core.log_compress_l_jacobian(
+                lpab, self.aL, self.bL, True, self.empty_matrix(lpab))
+        Lp = lpab[:, 0]
+        jac = self.empty_matrix(lpab)
+        jac[:, 0, 0] = np.exp(Lp / self.aL) / (self.aL * self.bL)
+        jac[:, 1, 1] = 1
+        jac[:, 2, 2] = 1
+        return jac
+
 
 class TransformLogCompressC(Transform):
     """
@@ -1789,7 +3315,18 @@ class TransformLogCompressC(Transform):
         self.aC = aC
         self.bC = bC
 
-    def from_base(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The compression parameters.
+        """
+        return (float(self.aC), float(self.bC))
+
+    def from_base(self, ndata, out=None):
         """
         Transform from Lab (base) to La'b'.
 
@@ -1797,23 +3334,29 @@ class TransformLogCompressC(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space (Lab).
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the La'b' colour space.
         """
-        Lapbp = ndata.copy()
+        if _use_core(ndata):
+            return space_core.log_compress_c_from_base(
+                ndata, self.aC, self.bC, self.empty_data(ndata, out))
         C = np.sqrt(ndata[:, 1]**2 + ndata[:, 2]**2)
         Cp = self.aC * np.log(1 + self.bC * C)
         scale = misc.safe_div(Cp, C)
         ap = scale * ndata[:, 1]
         bp = scale * ndata[:, 2]
+        Lapbp = self.empty_data(ndata, out)
+        Lapbp[:, 0] = ndata[:, 0]
         Lapbp[:, 1] = ap
         Lapbp[:, 2] = bp
         return Lapbp
 
-    def to_base(self, ndata):
+    def to_base(self, ndata, out=None):
         """
         Transform from La'b' to Lab (base).
 
@@ -1821,20 +3364,26 @@ class TransformLogCompressC(Transform):
         ----------
         ndata : ndarray
             Colour data in L'ab colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the Lab colour space.
         """
-        Lab = ndata.copy()
+        if _use_core(ndata):
+            return space_core.log_compress_c_to_base(
+                ndata, self.aC, self.bC, self.empty_data(ndata, out))
         ap = ndata[:, 1]
         bp = ndata[:, 2]
         Cp = np.sqrt(ap**2 + bp**2)
         C = (np.exp(Cp / self.aC) - 1) / self.bC
-        scale = misc.safe_div(Cp, C)
+        scale = misc.safe_div(C, Cp, 1 / (self.aC * self.bC))
         a = scale * ap
         b = scale * bp
+        Lab = self.empty_data(ndata, out)
+        Lab[:, 0] = ndata[:, 0]
         Lab[:, 1] = a
         Lab[:, 2] = b
         return Lab
@@ -1856,8 +3405,11 @@ class TransformLogCompressC(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
-        lab = data.get(self.base)
-        lapbp = data.get(self)
+        lab = data.get_flattened(self.base)
+        if _use_core(lab):
+            return space_core.log_compress_c_jacobian(
+                lab, self.aC, self.bC, self.empty_matrix(lab))
+        lapbp = data.get_flattened(self)
         a = lab[:, 1]
         b = lab[:, 2]
         C = np.sqrt(a**2 + b**2)
@@ -1866,8 +3418,9 @@ class TransformLogCompressC(Transform):
         dC_db = misc.safe_div(b, C)
         dCp_dC = self.aC * self.bC / (1 + self.bC * C)
         dCpC_dC = misc.safe_div(dCp_dC * C - Cp, C**2)
-        dap_da = misc.safe_div(Cp, C) + a * (dCpC_dC * dC_da)
-        dbp_db = misc.safe_div(Cp, C) + b * (dCpC_dC * dC_db)
+        CpC = misc.safe_div(Cp, C, self.aC * self.bC)
+        dap_da = CpC + a * (dCpC_dC * dC_da)
+        dbp_db = CpC + b * (dCpC_dC * dC_db)
         dap_db = a * dCpC_dC * dC_db
         dbp_da = b * dCpC_dC * dC_da
         jac = self.empty_matrix(lab)
@@ -1878,6 +3431,42 @@ class TransformLogCompressC(Transform):
         jac[:, 2, 2] = dbp_db
         return jac
 
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian to Lab (base), dLab^i/dLa'b'^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        lapbp = data.get_flattened(self)
+        if _use_core(lapbp):
+            return space_core.log_compress_c_inv_jacobian(
+                lapbp, self.aC, self.bC, self.empty_matrix(lapbp))
+        ap = lapbp[:, 1]
+        bp = lapbp[:, 2]
+        Cp = np.sqrt(ap**2 + bp**2)
+        C = (np.exp(Cp / self.aC) - 1) / self.bC
+        dC_dCp = np.exp(Cp / self.aC) / (self.aC * self.bC)
+        scale = misc.safe_div(C, Cp, 1 / (self.aC * self.bC))
+        dscale = misc.safe_div(dC_dCp * Cp - C, Cp**3, 0)
+        jac = self.empty_matrix(lapbp)
+        jac[:, 0, 0] = 1
+        jac[:, 1, 1] = scale + dscale * ap**2   # da/da'
+        jac[:, 1, 2] = dscale * ap * bp         # da/db'
+        jac[:, 2, 1] = dscale * ap * bp         # db/da'
+        jac[:, 2, 2] = scale + dscale * bp**2   # db/db'
+        return jac
+
 
 class TransformPoincareDisk(Transform):
     """
@@ -1903,7 +3492,18 @@ class TransformPoincareDisk(Transform):
         super(TransformPoincareDisk, self).__init__(base)
         self.R = R
 
-    def to_base(self, ndata):
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The radius of curvature.
+        """
+        return (float(self.R),)
+
+    def to_base(self, ndata, out=None):
         """
         Transform from Poincare disk to base.
 
@@ -1911,24 +3511,30 @@ class TransformPoincareDisk(Transform):
         ----------
         ndata : ndarray
             Colour data in the current colour space
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the base colour space
         """
-        Lab = ndata.copy()
-        Lab[:, 1:] = 0
+        if _use_core(ndata):
+            return space_core.poincare_disk_to_base(
+                ndata, self.R, self.empty_data(ndata, out))
         x = ndata[:, 1]
         y = ndata[:, 2]
         r = np.sqrt(x**2 + y**2)
-        for i in range(np.shape(Lab)[0]):
-            if r[i] > 0:
-                Lab[i, 1:] = ndata[i, 1:] * 2 * \
-                    self.R * np.arctanh(r[i]) / r[i]
+        scale = misc.safe_div(2 * self.R * np.arctanh(r), r, 2 * self.R)
+        a = scale * x
+        b = scale * y
+        Lab = self.empty_data(ndata, out)
+        Lab[:, 0] = ndata[:, 0]
+        Lab[:, 1] = a
+        Lab[:, 2] = b
         return Lab
 
-    def from_base(self, ndata):
+    def from_base(self, ndata, out=None):
         """
         Transform from base to Poincare disk
 
@@ -1936,20 +3542,27 @@ class TransformPoincareDisk(Transform):
         ----------
         ndata : ndarray
             Colour data in the base colour space.
+        out : ndarray
+            Optional array for the result, possibly ndata itself.
 
         Returns
         -------
         col : ndarray
             Colour data in the current colour space.
         """
-        Lxy = ndata.copy()
-        Lxy[:, 1:] = 0
+        if _use_core(ndata):
+            return space_core.poincare_disk_from_base(
+                ndata, self.R, self.empty_data(ndata, out))
         a = ndata[:, 1]
         b = ndata[:, 2]
         C = np.sqrt(a**2 + b**2)
-        for i in range(np.shape(Lxy)[0]):
-            if C[i] > 0:
-                Lxy[i, 1:] = ndata[i, 1:] * np.tanh(C[i] / (2 * self.R)) / C[i]
+        scale = misc.safe_div(np.tanh(C / (2 * self.R)), C, 1 / (2 * self.R))
+        x = scale * a
+        y = scale * b
+        Lxy = self.empty_data(ndata, out)
+        Lxy[:, 0] = ndata[:, 0]
+        Lxy[:, 1] = x
+        Lxy[:, 2] = y
         return Lxy
 
     def jacobian_base(self, data):
@@ -1969,32 +3582,305 @@ class TransformPoincareDisk(Transform):
         jacobian : ndarray
             The list of Jacobians to the base colour space.
         """
-        # TODO: bugfix!!!
         Lab = data.get_flattened(self.base)
+        if _use_core(Lab):
+            return space_core.poincare_disk_jacobian(
+                Lab, self.R, self.empty_matrix(Lab))
         a = Lab[:, 1]
         b = Lab[:, 2]
         C = np.sqrt(a**2 + b**2)
         tanhC2R = np.tanh(C / (2. * self.R))
-        tanhC2C = misc.safe_div(tanhC2R, C)
-        dCda = misc.safe_div(a, C)
-        dCdb = misc.safe_div(b, C)
+        tanhC2C = misc.safe_div(tanhC2R, C, 1 / (2. * self.R))
+        dCda = misc.safe_div(a, C, 0)
+        dCdb = misc.safe_div(b, C, 0)
         dtanhdC = misc.safe_div(C / (2. * self.R) *
-                                (1 - tanhC2R**2) - tanhC2R, C**2)
+                                (1 - tanhC2R**2) - tanhC2R, C**2, 0)
         jac = self.empty_matrix(Lab)
-        for i in range(np.shape(jac)[0]):
-            jac[i, 0, 0] = 1        # dL/dL
-            if C[i] == 0:
-                jac[i, 1, 1] = .5   # dx/da
-                jac[i, 2, 2] = .5   # dy/db
-            else:
-                jac[i, 1, 1] = tanhC2C[i] + \
-                    a[i] * dtanhdC[i] * dCda[i]  # dx/da
-                jac[i, 1, 2] = a[i] * dtanhdC[i] * dCdb[i]  # dx/db
-                jac[i, 2, 1] = b[i] * dtanhdC[i] * dCda[i]  # dy/da
-                jac[i, 2, 2] = tanhC2C[i] + \
-                    b[i] * dtanhdC[i] * dCdb[i]  # dy/db
+        jac[:, 0, 0] = 1                                # dL/dL
+        jac[:, 1, 1] = tanhC2C + a * dtanhdC * dCda     # dx/da
+        jac[:, 1, 2] = a * dtanhdC * dCdb               # dx/db
+        jac[:, 2, 1] = b * dtanhdC * dCda               # dy/da
+        jac[:, 2, 2] = tanhC2C + b * dtanhdC * dCdb     # dy/db
+        return jac
+
+    def inv_jacobian_base(self, data):
+        """
+        Return the Jacobian to CIELAB (base), dCIELAB^i/dLxy^j.
+
+        The Jacobian is calculated at the given data points (of the
+        Points class).
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from the base colour space.
+        """
+        Lxy = data.get_flattened(self)
+        if _use_core(Lxy):
+            return space_core.poincare_disk_inv_jacobian(
+                Lxy, self.R, self.empty_matrix(Lxy))
+        x = Lxy[:, 1]
+        y = Lxy[:, 2]
+        r = np.sqrt(x**2 + y**2)
+        atanh = 2 * self.R * np.arctanh(r)
+        scale = misc.safe_div(atanh, r, 2 * self.R)
+        dscale = misc.safe_div(2 * self.R * r / (1 - r**2) - atanh, r**3, 0)
+        jac = self.empty_matrix(Lxy)
+        jac[:, 0, 0] = 1                        # dL/dL
+        jac[:, 1, 1] = scale + dscale * x**2    # da/dx
+        jac[:, 1, 2] = dscale * x * y           # da/dy
+        jac[:, 2, 1] = dscale * x * y           # db/dx
+        jac[:, 2, 2] = scale + dscale * y**2    # db/dy
         return jac
 
+
+class FusedChain(Space):
+    """
+    The chain of transforms of a colour space compiled into one kernel.
+
+    The chain from XYZ to the given colour space is flattened once, and
+    consecutive linear transforms are folded into a single matrix. The
+    conversions are then run stage by stage in the output array and one
+    scratch buffer, which is kept between calls of the same size, instead
+    of allocating a new array for every level of the chain. Gives the same
+    coordinates as the original colour space, and can be used in its place,
+    e.g., for converting large images:
+
+    .. code:: python
+
+        din99d_fused = colourlab.space.FusedChain(colourlab.space.din99d)
+        im_din99d = din99d_fused.from_XYZ(im_xyz)
+
+    Each thread has its own scratch buffer, so the instances can be
+    shared between threads, and the conversions can be run in chunks in
+    parallel, see colourlab.parallel.
+    """
+
+    def __init__(self, sp):
+        """
+        Construct instance by compiling the chain of the given colour space.
+
+        Parameters
+        ----------
+        sp : Space
+            The colour space to compile.
+        """
+        self.space = sp
+        chain = []
+        while isinstance(sp, Transform):
+            chain.append(sp)
+            sp = sp.base
+        self.root = sp
+        self.stages = []        # from the root and upwards
+        for tr in reversed(chain):
+            if (isinstance(tr, TransformLinear) and len(self.stages) > 0 and
+                    isinstance(self.stages[-1], TransformLinear)):
+                prev = self.stages[-1]
+                fused = TransformLinear(prev.base, np.dot(tr.M, prev.M))
+                fused.M_inv = np.dot(prev.M_inv, tr.M_inv)
+                self.stages[-1] = fused
+            else:
+                self.stages.append(tr)
+        self._local = threading.local()
+
+    def parameters(self):
+        """
+        Return the parameters of the colour space, see Space.parameters.
+
+        Returns
+        -------
+        parameters : tuple
+            The compiled colour space.
+        """
+        return (self.space,)
+
+    def __getstate__(self):
+        state = super(FusedChain, self).__getstate__()
+        del state['_local']             # the scratch buffers are not kept
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def scratch(self, ndata):
+        """
+        Return the scratch buffer for data of the same shape as ndata.
+
+        The buffer is kept per thread.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            List of colour data.
+
+        Returns
+        -------
+        scratch : ndarray
+            Scratch array of the same shape as ndata.
+        """
+        scratch = getattr(self._local, 'scratch', None)
+        if (scratch is None or scratch.shape != np.shape(ndata) or
+                scratch.dtype != float_type(ndata)):
+            scratch = np.empty(np.shape(ndata), float_type(ndata))
+            self._local.scratch = scratch
+        return scratch
+
+    def run(self, stages, method, ndata, out=None):
+        """
+        Run the given stages on the colour data.
+
+        Nonlinear stages are run in place, whereas the linear stages
+        alternate between the output array and the scratch buffer.
+
+        Parameters
+        ----------
+        stages : list
+            The transforms to apply, in order.
+        method : str
+            The method of the transforms to apply, from_base or to_base.
+        ndata : ndarray
+            List of colour data.
+        out : ndarray
+            Optional array for the result.
+
+        Returns
+        -------
+        col : ndarray
+            The converted colour data.
+        """
+        if out is None:
+            out = np.empty(np.shape(ndata), float_type(ndata))
+        src = ndata
+        for stage in stages:
+            if src is ndata or isinstance(stage, TransformLinear):
+                dst = out if src is not out else self.scratch(ndata)
+            else:
+                dst = src
+            stage.call_base(method, src, dst)
+            src = dst
+        if src is not out:
+            out[...] = src
+        return out
+
+    def to_XYZ(self, ndata, out=None, executor=None):
+        """
+        Convert from current colour space to XYZ.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            Colour data in the current colour space.
+        out : ndarray
+            Optional array for the result.
+        executor : concurrent.futures.Executor, int or None
+            Optional executor for this call, see colourlab.parallel.
+
+        Returns
+        -------
+        xyz : ndarray
+            Colour data in the XYZ colour space.
+        """
+        col = _chunked(self.to_XYZ, ndata, out, executor)
+        if col is not None:
+            return col
+        col = self.run(self.stages[::-1], 'to_base', ndata, out)
+        if isinstance(self.root, XYZ):
+            return col
+        return self.root.to_XYZ(col, col)
+
+    def from_XYZ(self, ndata, out=None, executor=None):
+        """
+        Convert from XYZ to current colour space.
+
+        Parameters
+        ----------
+        ndata : ndarray
+            Colour data in the XYZ colour space.
+        out : ndarray
+            Optional array for the result.
+        executor : concurrent.futures.Executor, int or None
+            Optional executor for this call, see colourlab.parallel.
+
+        Returns
+        -------
+        col : ndarray
+            Colour data in the current colour space.
+        """
+        col = _chunked(self.from_XYZ, ndata, out, executor)
+        if col is not None:
+            return col
+        if not isinstance(self.root, XYZ):
+            ndata = self.root.from_XYZ(ndata)
+        return self.run(self.stages, 'from_base', ndata, out)
+
+    def jacobian_XYZ(self, data, out=None):
+        """
+        Return the Jacobian to XYZ, dx^i/dXYZ^j.
+
+        Computed by the original colour space.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians to XYZ.
+        """
+        return self.space.jacobian_XYZ(data, out)
+
+    def inv_jacobian_XYZ(self, data, out=None):
+        """
+        Return the inverse Jacobian to XYZ, dXYZ^i/dx^j.
+
+        Computed by the original colour space.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points for the jacobians to be computed.
+        out : ndarray
+            Optional array for the result.
+
+        Returns
+        -------
+        jacobian : ndarray
+            The list of Jacobians from XYZ.
+        """
+        return self.space.inv_jacobian_XYZ(data, out)
+
+    def tape_XYZ(self, data):
+        """
+        Return the colour data and the Jacobians in one forward pass.
+
+        Computed by the original colour space, see Space.tape_XYZ.
+
+        Parameters
+        ----------
+        data : Points
+            Colour data points.
+
+        Returns
+        -------
+        ndata : ndarray
+            P x C colour data in the current colour space.
+        jacobian : ndarray
+            The list of Jacobians to XYZ.
+        inv_jacobian : ndarray
+            The list of Jacobians from XYZ.
+        """
+        return self.space.tape_XYZ(data)
+
 # =============================================================================
 # Colour space instances
 # =============================================================================
@@ -2119,3 +4005,14 @@ din99d = TransformLinear(
     np.array([[1, 0, 0],
               [0, np.cos(np.deg2rad(-50.)), np.sin(np.deg2rad(-50.))],
               [0, - np.sin(np.deg2rad(-50.)), np.cos(np.deg2rad(-50.))]]))
+
+# Mark the intermediate spaces of the built-in colour spaces as private,
+# make the built-in colour spaces canonical, and register them by name
+
+for _name, _sp in list(globals().items()):
+    if isinstance(_sp, Space):
+        if _name.startswith('_'):
+            _sp.private = True
+        intern(_sp)
+        register(_name, _sp)
+del _name, _sp
@@ -0,0 +1,882 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+space_core: Colour space transform kernels, part of the colourlab package
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+import sys
+
+try:                            # Use numba only when installed. The
+    from numba import jit       # kernels are only used if it is, since
+    from numba import prange    # the loops are too slow in pure Python.
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+if not HAVE_NUMBA or 'sphinx' in sys.modules:
+    HAVE_NUMBA = False
+    prange = range
+
+    def jit(*args, **kwargs):
+        return lambda func: func
+
+# The kernels loop over N x 3 colour data, one point per iteration, and
+# write the results to the given output array, which may be the input
+# array itself. Jacobian kernels only set the non-zero entries of the
+# N x 3 x 3 output, which must be zeroed beforehand.
+
+KAPPA = 24389. / 27.
+EPSILON = 216. / 24389.
+
+
+# =============================================================================
+# xyY
+# =============================================================================
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def xyy_from_base(ndata, out):
+    """
+    Convert from XYZ to xyY.
+    """
+    for n in prange(ndata.shape[0]):
+        X = ndata[n, 0]
+        Y = ndata[n, 1]
+        s = X + Y + ndata[n, 2]
+        out[n, 0] = X / s
+        out[n, 1] = Y / s
+        out[n, 2] = Y
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def xyy_to_base(ndata, out):
+    """
+    Convert from xyY to XYZ.
+    """
+    for n in prange(ndata.shape[0]):
+        x = ndata[n, 0]
+        y = ndata[n, 1]
+        Y = ndata[n, 2]
+        out[n, 0] = x * Y / y
+        out[n, 1] = Y
+        out[n, 2] = (1 - x - y) * Y / y
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def xyy_jacobian(xyz, jac):
+    """
+    Return the Jacobians dxyY^i/dXYZ^j computed from XYZ data.
+    """
+    for n in prange(xyz.shape[0]):
+        X = xyz[n, 0]
+        Y = xyz[n, 1]
+        Z = xyz[n, 2]
+        s2 = (X + Y + Z) ** 2
+        jac[n, 0, 0] = (Y + Z) / s2
+        jac[n, 0, 1] = -X / s2
+        jac[n, 0, 2] = -X / s2
+        jac[n, 1, 0] = -Y / s2
+        jac[n, 1, 1] = (X + Z) / s2
+        jac[n, 1, 2] = -Y / s2
+        jac[n, 2, 1] = 1
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def xyy_inv_jacobian(xyy, jac):
+    """
+    Return the Jacobians dXYZ^i/dxyY^j computed from xyY data.
+    """
+    for n in prange(xyy.shape[0]):
+        x = xyy[n, 0]
+        y = xyy[n, 1]
+        Y = xyy[n, 2]
+        jac[n, 0, 0] = Y / y
+        jac[n, 0, 1] = - x * Y / y ** 2
+        jac[n, 0, 2] = x / y
+        jac[n, 1, 2] = 1
+        jac[n, 2, 0] = - Y / y
+        jac[n, 2, 1] = Y * (x - 1) / y ** 2
+        jac[n, 2, 2] = (1 - x - y) / y
+    return jac
+
+
+# =============================================================================
+# CIELAB and CIELUV
+# =============================================================================
+
+
+@jit(nopython=True, error_model='numpy', cache=True)
+def _f(t):
+    """
+    The CIELAB lightness function of relative luminance.
+    """
+    if t > EPSILON:
+        return t ** (1. / 3)
+    return (KAPPA * t + 16.) / 116.
+
+
+@jit(nopython=True, error_model='numpy', cache=True)
+def _dfdx(t):
+    """
+    The derivative of the function _f.
+    """
+    if t > EPSILON:
+        return t ** (-2. / 3) / 3
+    return KAPPA / 116.
+
+
+@jit(nopython=True, error_model='numpy', cache=True)
+def _finv(f):
+    """
+    The inverse of the function _f.
+    """
+    if f ** 3 > EPSILON:
+        return f ** 3
+    return (116 * f - 16) / KAPPA
+
+
+@jit(nopython=True, error_model='numpy', cache=True)
+def _dfinvdx(f):
+    """
+    The derivative of the inverse of the function _f.
+    """
+    if f ** 3 > EPSILON:
+        return 3 * f ** 2
+    return 116. / KAPPA
+
+
+@jit(nopython=True, error_model='numpy', cache=True)
+def _y_from_l(L):
+    """
+    Relative luminance from lightness.
+    """
+    if L <= KAPPA * EPSILON:
+        return L / KAPPA
+    return ((L + 16.) / 116.) ** 3
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cielab_from_base(ndata, white, out):
+    """
+    Convert from XYZ to CIELAB.
+    """
+    for n in prange(ndata.shape[0]):
+        fx = _f(ndata[n, 0] / white[0])
+        fy = _f(ndata[n, 1] / white[1])
+        fz = _f(ndata[n, 2] / white[2])
+        out[n, 0] = 116. * fy - 16.
+        out[n, 1] = 500. * (fx - fy)
+        out[n, 2] = 200. * (fy - fz)
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cielab_to_base(ndata, white, out):
+    """
+    Convert from CIELAB to XYZ.
+    """
+    for n in prange(ndata.shape[0]):
+        L = ndata[n, 0]
+        fy = (L + 16.) / 116.
+        fx = ndata[n, 1] / 500. + fy
+        fz = fy - ndata[n, 2] / 200.
+        out[n, 0] = _finv(fx) * white[0]
+        out[n, 1] = _y_from_l(L) * white[1]
+        out[n, 2] = _finv(fz) * white[2]
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cielab_jacobian(xyz, white, jac):
+    """
+    Return the Jacobians dCIELAB^i/dXYZ^j computed from XYZ data.
+    """
+    for n in prange(xyz.shape[0]):
+        dfx = _dfdx(xyz[n, 0] / white[0]) / white[0]
+        dfy = _dfdx(xyz[n, 1] / white[1]) / white[1]
+        dfz = _dfdx(xyz[n, 2] / white[2]) / white[2]
+        jac[n, 0, 1] = 116 * dfy
+        jac[n, 1, 0] = 500 * dfx
+        jac[n, 1, 1] = -500 * dfy
+        jac[n, 2, 1] = 200 * dfy
+        jac[n, 2, 2] = -200 * dfz
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cielab_inv_jacobian(lab, white, jac):
+    """
+    Return the Jacobians dXYZ^i/dCIELAB^j computed from CIELAB data.
+    """
+    for n in prange(lab.shape[0]):
+        fy = (lab[n, 0] + 16.) / 116.
+        fx = lab[n, 1] / 500. + fy
+        fz = fy - lab[n, 2] / 200.
+        dfx = _dfinvdx(fx) * white[0]
+        dfy = _dfinvdx(fy) * white[1]
+        dfz = _dfinvdx(fz) * white[2]
+        jac[n, 0, 0] = dfx / 116.
+        jac[n, 0, 1] = dfx / 500.
+        jac[n, 1, 0] = dfy / 116.
+        jac[n, 2, 0] = dfz / 116.
+        jac[n, 2, 2] = -dfz / 200.
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cieluv_from_base(ndata, white, out):
+    """
+    Convert from XYZ to CIELUV.
+    """
+    den_r = white[0] + 15 * white[1] + 3 * white[2]
+    upr = 4 * white[0] / den_r
+    vpr = 9 * white[1] / den_r
+    for n in prange(ndata.shape[0]):
+        X = ndata[n, 0]
+        Y = ndata[n, 1]
+        den = X + 15 * Y + 3 * ndata[n, 2]
+        L = 116. * _f(Y / white[1]) - 16.
+        out[n, 0] = L
+        out[n, 1] = 13 * L * (4 * X / den - upr)
+        out[n, 2] = 13 * L * (9 * Y / den - vpr)
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cieluv_to_base(ndata, white, out):
+    """
+    Convert from CIELUV to XYZ.
+    """
+    den_r = white[0] + 15 * white[1] + 3 * white[2]
+    upr = 4 * white[0] / den_r
+    vpr = 9 * white[1] / den_r
+    for n in prange(ndata.shape[0]):
+        L = ndata[n, 0]
+        y = _y_from_l(L) * white[1]
+        a = (52 * L / (ndata[n, 1] + 13 * L * upr) - 1) / 3
+        b = -5 * y
+        d = y * (39 * L / (ndata[n, 2] + 13 * L * vpr) - 5)
+        x = (d - b) / (a + 1 / 3.)
+        out[n, 0] = x
+        out[n, 1] = y
+        out[n, 2] = x * a + b
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cieluv_jacobian(xyz, white, jac):
+    """
+    Return the Jacobians dCIELUV^i/dXYZ^j computed from XYZ data.
+    """
+    den_r = white[0] + 15 * white[1] + 3 * white[2]
+    upr = 4 * white[0] / den_r
+    vpr = 9 * white[1] / den_r
+    for n in prange(xyz.shape[0]):
+        X = xyz[n, 0]
+        Y = xyz[n, 1]
+        Z = xyz[n, 2]
+        den = X + 15 * Y + 3 * Z
+        den2 = den ** 2
+        L13 = 13 * (116. * _f(Y / white[1]) - 16.)
+        dL_dY = 116 * _dfdx(Y / white[1]) / white[1]
+        jac[n, 0, 1] = dL_dY
+        jac[n, 1, 0] = L13 * (60 * Y + 12 * Z) / den2
+        jac[n, 1, 1] = L13 * -60 * X / den2 + \
+            13 * dL_dY * (4 * X / den - upr)
+        jac[n, 1, 2] = L13 * -12 * X / den2
+        jac[n, 2, 0] = L13 * -9 * Y / den2
+        jac[n, 2, 1] = L13 * (9 * X + 27 * Z) / den2 + \
+            13 * dL_dY * (9 * Y / den - vpr)
+        jac[n, 2, 2] = L13 * -27 * Y / den2
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cieluv_inv_jacobian(luv, white, jac):
+    """
+    Return the Jacobians dXYZ^i/dCIELUV^j computed from CIELUV data.
+
+    By the chain rule via Y, u' and v'.
+    """
+    den_r = white[0] + 15 * white[1] + 3 * white[2]
+    upr = 4 * white[0] / den_r
+    vpr = 9 * white[1] / den_r
+    for n in prange(luv.shape[0]):
+        L = luv[n, 0]
+        u = luv[n, 1]
+        v = luv[n, 2]
+        if L <= KAPPA * EPSILON:
+            dY_dL = white[1] / KAPPA
+        else:
+            dY_dL = white[1] * 3 * ((L + 16.) / 116.) ** 2 / 116.
+        Y = _y_from_l(L) * white[1]
+        up = u / (13 * L) + upr
+        vp = v / (13 * L) + vpr
+        # d(Y, u', v') / d(L, u, v):
+        dup_dL = - u / (13 * L ** 2)
+        dvp_dL = - v / (13 * L ** 2)
+        duv = 1 / (13 * L)
+        # dXYZ / d(Y, u', v'):
+        dX_dY = 9 * up / (4 * vp)
+        dX_dup = 9 * Y / (4 * vp)
+        dX_dvp = - 9 * Y * up / (4 * vp ** 2)
+        dZ_dY = (12 - 3 * up - 20 * vp) / (4 * vp)
+        dZ_dup = - 3 * Y / (4 * vp)
+        dZ_dvp = - Y * (12 - 3 * up) / (4 * vp ** 2)
+        jac[n, 0, 0] = dX_dY * dY_dL + dX_dup * dup_dL + dX_dvp * dvp_dL
+        jac[n, 0, 1] = dX_dup * duv
+        jac[n, 0, 2] = dX_dvp * duv
+        jac[n, 1, 0] = dY_dL
+        jac[n, 2, 0] = dZ_dY * dY_dL + dZ_dup * dup_dL + dZ_dvp * dvp_dL
+        jac[n, 2, 1] = dZ_dup * duv
+        jac[n, 2, 2] = dZ_dvp * duv
+    return jac
+
+
+# =============================================================================
+# CIEDE00
+# =============================================================================
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def ciede00_from_base(ndata, out):
+    """
+    Convert from CIELAB to CIEDE00 L'a'b'.
+    """
+    for n in prange(ndata.shape[0]):
+        a = ndata[n, 1]
+        b = ndata[n, 2]
+        C7 = math.sqrt(a ** 2 + b ** 2) ** 7
+        G = .5 * (1 - math.sqrt(C7 / (C7 + 25. ** 7)))
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = a * (1 + G)
+        out[n, 2] = b
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def ciede00_jacobian(lab, inverse, jac):
+    """
+    Return the Jacobians dCIEDE00^i/dCIELAB^j computed from CIELAB data.
+
+    The inverse Jacobians dCIELAB^i/dCIEDE00^j are returned if inverse
+    is True.
+    """
+    for n in prange(lab.shape[0]):
+        a = lab[n, 1]
+        b = lab[n, 2]
+        C = math.sqrt(a ** 2 + b ** 2)
+        C7 = C ** 7
+        G = .5 * (1 - math.sqrt(C7 / (C7 + 25. ** 7)))
+        if C == 0:
+            dap_da = 1.
+            dap_db = 0.
+        else:
+            K = 7 * 25. ** 7 * C ** 2.5 / (4 * (C7 + 25. ** 7) ** 1.5)
+            dap_da = 1 + G - a ** 2 / C * K
+            dap_db = - a * b / C * K
+        jac[n, 0, 0] = 1
+        jac[n, 2, 2] = 1
+        if inverse:
+            jac[n, 1, 1] = 1 / dap_da
+            jac[n, 1, 2] = - dap_db / dap_da
+        else:
+            jac[n, 1, 1] = dap_da
+            jac[n, 1, 2] = dap_db
+    return jac
+
+
+# =============================================================================
+# sRGB and gamma
+# =============================================================================
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def srgb_from_base(ndata, out):
+    """
+    Convert from linear RGB to sRGB with gamut clipping.
+    """
+    for n in prange(ndata.shape[0]):
+        for c in range(3):
+            v = min(max(ndata[n, c], 0.), 1.)
+            if v <= 0.0031308:
+                out[n, c] = 12.92 * v
+            else:
+                out[n, c] = 1.055 * v ** (1 / 2.4) - 0.055
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def srgb_to_base(ndata, out):
+    """
+    Convert from sRGB to linear RGB with gamut clipping.
+    """
+    for n in prange(ndata.shape[0]):
+        for c in range(3):
+            v = min(max(ndata[n, c], 0.), 1.)
+            if v <= 0.04045:
+                out[n, c] = v / 12.92
+            else:
+                out[n, c] = ((v + 0.055) / 1.055) ** 2.4
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def srgb_jacobian(rgb, inverse, jac):
+    """
+    Return the Jacobians dsRGB^i/dRGB^j computed from linear RGB data.
+
+    The inverse Jacobians dRGB^i/dsRGB^j are returned if inverse is True.
+    """
+    for n in prange(rgb.shape[0]):
+        for c in range(3):
+            v = rgb[n, c]
+            if inverse:
+                if v < 0.0031308:
+                    jac[n, c, c] = 1 / 12.92
+                else:
+                    jac[n, c, c] = 2.4 / 1.055 * abs(v) ** (1 - 1 / 2.4)
+            else:
+                if v < 0.0031308:
+                    jac[n, c, c] = 12.92
+                else:
+                    jac[n, c, c] = 1.055 / 2.4 * v ** (1 / 2.4 - 1)
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def gamma(ndata, gamma, out):
+    """
+    Apply the signed power function sign(x) * abs(x)**gamma.
+    """
+    for n in prange(ndata.shape[0]):
+        for c in range(3):
+            v = ndata[n, c]
+            if v > 0:
+                out[n, c] = v ** gamma
+            elif v < 0:
+                out[n, c] = - (-v) ** gamma
+            else:
+                out[n, c] = v
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def gamma_jacobian(ndata, gamma, jac):
+    """
+    Return the diagonal Jacobians of the function gamma.
+    """
+    for n in prange(ndata.shape[0]):
+        for c in range(3):
+            jac[n, c, c] = gamma * abs(ndata[n, c]) ** (gamma - 1)
+    return jac
+
+
+# =============================================================================
+# Polar and Cartesian coordinates
+# =============================================================================
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def polar(ndata, out):
+    """
+    Convert from Cartesian to polar coordinates, e.g., CIELAB to CIELCh.
+    """
+    for n in prange(ndata.shape[0]):
+        x = ndata[n, 1]
+        y = ndata[n, 2]
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = math.sqrt(x ** 2 + y ** 2)
+        out[n, 2] = math.atan2(y, x)
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cartesian(ndata, out):
+    """
+    Convert from polar to Cartesian coordinates, e.g., CIELCh to CIELAB.
+    """
+    for n in prange(ndata.shape[0]):
+        C = ndata[n, 1]
+        h = ndata[n, 2]
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = C * math.cos(h)
+        out[n, 2] = C * math.sin(h)
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def polar_jacobian_cartesian(lab, jac):
+    """
+    Return the Jacobians dLCh^i/dLab^j computed from Cartesian data.
+    """
+    for n in prange(lab.shape[0]):
+        a = lab[n, 1]
+        b = lab[n, 2]
+        C2 = a ** 2 + b ** 2
+        C = math.sqrt(C2)
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = a / C if C != 0 else 1.
+        jac[n, 1, 2] = b / C if C != 0 else 0.
+        jac[n, 2, 1] = -b / C2 if C2 != 0 else 0.
+        jac[n, 2, 2] = a / C2 if C2 != 0 else 1.
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def polar_jacobian_polar(lch, jac):
+    """
+    Return the Jacobians dLCh^i/dLab^j computed from polar data.
+    """
+    for n in prange(lch.shape[0]):
+        C = lch[n, 1]
+        cos_h = math.cos(lch[n, 2])
+        sin_h = math.sin(lch[n, 2])
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = cos_h
+        jac[n, 1, 2] = sin_h
+        jac[n, 2, 1] = -sin_h / C if C != 0 else 0.
+        jac[n, 2, 2] = cos_h / C if C != 0 else 1.
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def cartesian_jacobian_polar(lch, zero_fill, jac):
+    """
+    Return the Jacobians dLab^i/dLCh^j computed from polar data.
+
+    If zero_fill is True, the diagonal is set to one where C = 0.
+    """
+    for n in prange(lch.shape[0]):
+        C = lch[n, 1]
+        cos_h = math.cos(lch[n, 2])
+        sin_h = math.sin(lch[n, 2])
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = cos_h
+        jac[n, 1, 2] = -C * sin_h
+        jac[n, 2, 1] = sin_h
+        jac[n, 2, 2] = C * cos_h
+        if zero_fill and C == 0:
+            jac[n, 1, 1] = 1
+            jac[n, 2, 2] = 1
+    return jac
+
+
+# =============================================================================
+# Radial compression: LGJE, DIN99x and Poincare disk
+# =============================================================================
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def lgje_from_base(ndata, aL, bL, ac, bc, out):
+    """
+    Convert from LGJOSA to LGJE.
+    """
+    for n in prange(ndata.shape[0]):
+        L = ndata[n, 0]
+        G = ndata[n, 1]
+        J = ndata[n, 2]
+        C = math.sqrt(G ** 2 + J ** 2)
+        C_E = math.log(1 + 10 * C * bc / ac) / bc
+        scale = C_E / C if C != 0 else 1.
+        out[n, 0] = math.log(1 + 10 * L * bL / aL) / bL
+        out[n, 1] = - scale * G
+        out[n, 2] = - scale * J
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def lgje_to_base(ndata, aL, bL, ac, bc, out):
+    """
+    Convert from LGJE to LGJOSA.
+    """
+    for n in prange(ndata.shape[0]):
+        LE = ndata[n, 0]
+        GE = ndata[n, 1]
+        JE = ndata[n, 2]
+        CE = math.sqrt(GE ** 2 + JE ** 2)
+        C = ac * (math.exp(bc * CE) - 1) / (10 * bc)
+        scale = C / CE if CE != 0 else 1.
+        out[n, 0] = aL * (math.exp(bL * LE) - 1) / (10 * bL)
+        out[n, 1] = - scale * GE
+        out[n, 2] = - scale * JE
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def lgje_jacobian(lgj, aL, bL, ac, bc, jac):
+    """
+    Return the Jacobians dLGJE^i/dLGJOSA^j computed from LGJOSA data.
+    """
+    for n in prange(lgj.shape[0]):
+        L = lgj[n, 0]
+        G = lgj[n, 1]
+        J = lgj[n, 2]
+        C = math.sqrt(G ** 2 + J ** 2)
+        C_E = math.log(1 + 10 * C * bc / ac) / bc
+        dCE_dC = 10 / (ac + 10 * bc * C)
+        if C != 0:
+            dCEC_dC = (dCE_dC * C - C_E) / C ** 2
+            dC_dG = G / C
+            dC_dJ = J / C
+            scale = C_E / C
+        else:
+            dCEC_dC = 1.
+            dC_dG = 1.
+            dC_dJ = 1.
+            scale = 10 / ac
+        jac[n, 0, 0] = 10 / (aL + 10 * bL * L)
+        jac[n, 1, 1] = - scale - G * dCEC_dC * dC_dG
+        jac[n, 1, 2] = - G * dCEC_dC * dC_dJ
+        jac[n, 2, 1] = - J * dCEC_dC * dC_dG
+        jac[n, 2, 2] = - scale - J * dCEC_dC * dC_dJ
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def lgje_inv_jacobian(lgj_e, aL, bL, ac, bc, jac):
+    """
+    Return the Jacobians dLGJOSA^i/dLGJE^j computed from LGJE data.
+    """
+    for n in prange(lgj_e.shape[0]):
+        GE = lgj_e[n, 1]
+        JE = lgj_e[n, 2]
+        CE = math.sqrt(GE ** 2 + JE ** 2)
+        C = ac * (math.exp(bc * CE) - 1) / (10 * bc)
+        dC_dCE = ac * math.exp(bc * CE) / 10
+        if CE != 0:
+            scale = C / CE
+            dscale = (dC_dCE * CE - C) / CE ** 3
+        else:
+            scale = ac / 10
+            dscale = 0.
+        jac[n, 0, 0] = aL * math.exp(bL * lgj_e[n, 0]) / 10
+        jac[n, 1, 1] = - scale - dscale * GE ** 2
+        jac[n, 1, 2] = - dscale * GE * JE
+        jac[n, 2, 1] = - dscale * GE * JE
+        jac[n, 2, 2] = - scale - dscale * JE ** 2
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def log_compress_l(ndata, aL, bL, inverse, out):
+    """
+    Compress the lightness logarithmically, or expand it if inverse.
+    """
+    for n in prange(ndata.shape[0]):
+        if inverse:
+            out[n, 0] = (math.exp(ndata[n, 0] / aL) - 1) / bL
+        else:
+            out[n, 0] = aL * math.log(1 + bL * ndata[n, 0])
+        out[n, 1] = ndata[n, 1]
+        out[n, 2] = ndata[n, 2]
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def log_compress_l_jacobian(ndata, aL, bL, inverse, jac):
+    """
+    Return the Jacobians of the lightness compression.
+
+    Computed from uncompressed data, or from compressed data for the
+    inverse Jacobians if inverse.
+    """
+    for n in prange(ndata.shape[0]):
+        if inverse:
+            jac[n, 0, 0] = math.exp(ndata[n, 0] / aL) / (aL * bL)
+        else:
+            jac[n, 0, 0] = aL * bL / (1 + bL * ndata[n, 0])
+        jac[n, 1, 1] = 1
+        jac[n, 2, 2] = 1
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def log_compress_c_from_base(ndata, aC, bC, out):
+    """
+    Compress the chroma logarithmically.
+    """
+    for n in prange(ndata.shape[0]):
+        a = ndata[n, 1]
+        b = ndata[n, 2]
+        C = math.sqrt(a ** 2 + b ** 2)
+        scale = aC * math.log(1 + bC * C) / C if C != 0 else 1.
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = scale * a
+        out[n, 2] = scale * b
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def log_compress_c_to_base(ndata, aC, bC, out):
+    """
+    Expand the logarithmically compressed chroma.
+    """
+    for n in prange(ndata.shape[0]):
+        ap = ndata[n, 1]
+        bp = ndata[n, 2]
+        Cp = math.sqrt(ap ** 2 + bp ** 2)
+        if Cp != 0:
+            scale = (math.exp(Cp / aC) - 1) / bC / Cp
+        else:
+            scale = 1 / (aC * bC)
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = scale * ap
+        out[n, 2] = scale * bp
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def log_compress_c_jacobian(lab, aC, bC, jac):
+    """
+    Return the Jacobians dLa'b'^i/dLab^j computed from Lab data.
+    """
+    for n in prange(lab.shape[0]):
+        a = lab[n, 1]
+        b = lab[n, 2]
+        C = math.sqrt(a ** 2 + b ** 2)
+        Cp = aC * math.log(1 + bC * C)
+        if C != 0:
+            dC_da = a / C
+            dC_db = b / C
+            dCpC_dC = (aC * bC / (1 + bC * C) * C - Cp) / C ** 2
+            CpC = Cp / C
+        else:
+            dC_da = 1.
+            dC_db = 1.
+            dCpC_dC = 1.
+            CpC = aC * bC
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = CpC + a * dCpC_dC * dC_da
+        jac[n, 1, 2] = a * dCpC_dC * dC_db
+        jac[n, 2, 1] = b * dCpC_dC * dC_da
+        jac[n, 2, 2] = CpC + b * dCpC_dC * dC_db
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def log_compress_c_inv_jacobian(lapbp, aC, bC, jac):
+    """
+    Return the Jacobians dLab^i/dLa'b'^j computed from La'b' data.
+    """
+    for n in prange(lapbp.shape[0]):
+        ap = lapbp[n, 1]
+        bp = lapbp[n, 2]
+        Cp = math.sqrt(ap ** 2 + bp ** 2)
+        C = (math.exp(Cp / aC) - 1) / bC
+        dC_dCp = math.exp(Cp / aC) / (aC * bC)
+        if Cp != 0:
+            scale = C / Cp
+            dscale = (dC_dCp * Cp - C) / Cp ** 3
+        else:
+            scale = 1 / (aC * bC)
+            dscale = 0.
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = scale + dscale * ap ** 2
+        jac[n, 1, 2] = dscale * ap * bp
+        jac[n, 2, 1] = dscale * ap * bp
+        jac[n, 2, 2] = scale + dscale * bp ** 2
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def poincare_disk_from_base(ndata, R, out):
+    """
+    Convert from Cartesian to Poincare disk coordinates.
+    """
+    for n in prange(ndata.shape[0]):
+        a = ndata[n, 1]
+        b = ndata[n, 2]
+        C = math.sqrt(a ** 2 + b ** 2)
+        scale = math.tanh(C / (2 * R)) / C if C != 0 else 1 / (2 * R)
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = scale * a
+        out[n, 2] = scale * b
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def poincare_disk_to_base(ndata, R, out):
+    """
+    Convert from Poincare disk to Cartesian coordinates.
+    """
+    for n in prange(ndata.shape[0]):
+        x = ndata[n, 1]
+        y = ndata[n, 2]
+        r = math.sqrt(x ** 2 + y ** 2)
+        scale = 2 * R * math.atanh(r) / r if r != 0 else 2 * R
+        out[n, 0] = ndata[n, 0]
+        out[n, 1] = scale * x
+        out[n, 2] = scale * y
+    return out
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def poincare_disk_jacobian(lab, R, jac):
+    """
+    Return the Jacobians dLxy^i/dLab^j computed from Cartesian data.
+    """
+    for n in prange(lab.shape[0]):
+        a = lab[n, 1]
+        b = lab[n, 2]
+        C = math.sqrt(a ** 2 + b ** 2)
+        t = math.tanh(C / (2. * R))
+        if C != 0:
+            tC = t / C
+            dC_da = a / C
+            dC_db = b / C
+            dt_dC = (C / (2. * R) * (1 - t ** 2) - t) / C ** 2
+        else:
+            tC = 1 / (2. * R)
+            dC_da = 0.
+            dC_db = 0.
+            dt_dC = 0.
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = tC + a * dt_dC * dC_da
+        jac[n, 1, 2] = a * dt_dC * dC_db
+        jac[n, 2, 1] = b * dt_dC * dC_da
+        jac[n, 2, 2] = tC + b * dt_dC * dC_db
+    return jac
+
+
+@jit(nopython=True, parallel=True, error_model='numpy', cache=True)
+def poincare_disk_inv_jacobian(lxy, R, jac):
+    """
+    Return the Jacobians dLab^i/dLxy^j computed from Poincare disk data.
+    """
+    for n in prange(lxy.shape[0]):
+        x = lxy[n, 1]
+        y = lxy[n, 2]
+        r = math.sqrt(x ** 2 + y ** 2)
+        atanh = 2 * R * math.atanh(r)
+        if r != 0:
+            scale = atanh / r
+            dscale = (2 * R * r / (1 - r ** 2) - atanh) / r ** 3
+        else:
+            scale = 2 * R
+            dscale = 0.
+        jac[n, 0, 0] = 1
+        jac[n, 1, 1] = scale + dscale * x ** 2
+        jac[n, 1, 2] = dscale * x * y
+        jac[n, 2, 1] = dscale * x * y
+        jac[n, 2, 2] = scale + dscale * y ** 2
+    return jac
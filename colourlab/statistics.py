@@ -20,8 +20,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import numpy as np
-import scipy.integrate
-import scipy.optimize
 
 
 # =============================================================================
@@ -94,6 +92,7 @@ def _pant_R_value(ell1, ell2):
     """
     Compute single R value for the two given ellipses.
     """
+    import scipy.integrate
     area_intersection = scipy.integrate.quad(_ellipse_intersection,
                                              0, 2 * np.pi, (ell1, ell2))
     area_union = scipy.integrate.quad(_ellipse_union,
@@ -150,6 +149,7 @@ def pant_R_values(space, tdata1, tdata2, optimise=True, plane=None):
     r_values : ndarray
         Pant R values
     """
+    import scipy.optimize
     if plane is None:
         ell1a = tdata1.get_ellipse_parameters(space, tdata1.plane_01)
         ell1b = tdata1.get_ellipse_parameters(space, tdata1.plane_12)
@@ -263,6 +263,7 @@ def minimal_dataset_distance(dataset, ground_truth):
     angle : float
         The optimal angle.
     """
+    import scipy.optimize
     params = scipy.optimize.fmin(_cost_function_dataset, np.array([1, 1, 0]),
                                  (dataset, ground_truth))
     opt_data = _scale_rot_dataset(params, dataset)
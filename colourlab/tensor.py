@@ -20,7 +20,7 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
 import numpy as np
-from . import data, space
+from . import data, space, parallel
 
 
 # =============================================================================
@@ -64,7 +64,7 @@ def euclidean(sp, dat):
     Euclidean : Tensors
         The metric tensors.
     """
-    g = sp.empty_matrix(dat.flattened_XYZ)
+    g = sp.empty_matrix(dat.get_flattened(sp))
     for i in range(np.shape(g)[0]):
         g[i] = np.eye(3)
     return construct_tensor(sp, g, dat)
@@ -189,7 +189,7 @@ def dE_DIN99d(dat):
     return euclidean(space.din99d, dat)
 
 
-def dE_00(dat, k_L=1, k_C=1, k_h=1):
+def dE_00(dat, k_L=1, k_C=1, k_h=1, executor=None):
     """
     Compute the Riemannised CIEDE00 metric for the given data points.
 
@@ -205,13 +205,26 @@ def dE_00(dat, k_L=1, k_C=1, k_h=1):
         Parameter of the CIEDE00 metric
     k_h : float
         Parameter of the CIEDE00 metric
+    executor : concurrent.futures.Executor, int or None
+        Optional executor for this call, see colourlab.parallel.
 
     Returns
     -------
     DE00 : Tensors
         The metric tensors.
     """
-    lch = dat.get_flattened(space.ciede00lch)
+    with parallel.using(executor):
+        lch = dat.get_flattened(space.ciede00lch)
+        g = space.ciede00lch.empty_matrix(lch)
+        parallel.map_chunks(lambda l, out: _dE_00(l, k_L, k_C, k_h, out),
+                            (lch,), g)
+    return construct_tensor(space.ciede00lch, g, dat)
+
+
+def _dE_00(lch, k_L, k_C, k_h, g):
+    """
+    Compute the CIEDE00 metric tensors from CIEDE00 LCh data, see dE_00.
+    """
     L = lch[:, 0]
     C = lch[:, 1]
     h = lch[:, 2]
@@ -227,13 +240,12 @@ def dE_00(dat, k_L=1, k_C=1, k_h=1):
     R_C = 2 * np.sqrt(C**7 / (C**7 + 25**7))
     d_theta = 30 * np.exp(-((h_deg - 275) / 25)**2)
     R_T = - R_C * np.sin(np.deg2rad(2 * d_theta))
-    g = space.ciede00lch.empty_matrix(lch)
     g[:, 0, 0] = (k_L * S_L)**(-2)
     g[:, 1, 1] = (k_C * S_C)**(-2)
     g[:, 2, 2] = C**2 * (k_h * S_h)**(-2)
     g[:, 1, 2] = .5 * C * R_T / (k_C * S_C * k_h * S_h)
     g[:, 2, 1] = .5 * C * R_T / (k_C * S_C * k_h * S_h)
-    return construct_tensor(space.ciede00lch, g, dat)
+    return g
 
 
 def poincare_disk(sp, dat):
@@ -5,6 +5,7 @@ setup(
     version="0.0.3.dev",
     packages=['colourlab'],
     include_package_data=True,
+    python_requires='>=3.7',
     package_data={'colourlab': ['colour_data/*',
                                 'tensor_data/*',
                                 'metric_data/*']},
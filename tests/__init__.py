@@ -23,4 +23,6 @@ along with this program. If not, see <http://www.gnu.org/licenses/>.
 # Main file. Just import the other files.
 import os
 from tests import test_space, test_data, test_tensor, \
-    test_metric, test_statistics, test_misc, test_image, test_gamut
+    test_metric, test_statistics, test_misc, test_image, test_gamut, \
+    test_linalg, test_lut, test_parallel, test_adaptation, test_instrument, \
+    test_import
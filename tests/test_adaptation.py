@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_adaptation: Unittests for all functions in the adaptation module.
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import unittest
+import numpy as np
+from colourlab import adaptation, data, space
+
+col = data.Points(space.srgb, np.random.rand(4, 5, 3))
+
+
+class TestCAT(unittest.TestCase):
+
+    def test_adapt(self):
+        cat = adaptation.CAT(col)
+        whites = [data.white_A, data.white_D50, data.white_F11]
+        adapted = cat.adapt([(data.white_D65, w) for w in whites])
+        for w, dat in zip(whites, adapted):
+            ref = col.new_white_point(space.ciecat16, data.white_D65, w)
+            self.assertTrue(np.allclose(dat.get(space.xyz),
+                                        ref.get(space.xyz)))
+            self.assertTrue(cat.get(space.Space.white_D65,
+                                    w.get(space.xyz)) is dat)
+        self.assertEqual(len(cat.results), 3)
+        mat = cat.matrix(data.white_D65, data.white_A)
+        self.assertTrue(np.allclose(np.dot(mat, space.Space.white_D65),
+                                    space.Space.white_A))
+        cat02 = adaptation.CAT(col, space.ciecat02)
+        self.assertTrue(np.allclose(
+            cat02.get(data.white_D65, data.white_D65).get(space.xyz),
+            col.get(space.xyz)))
@@ -19,6 +19,8 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import os
+import tempfile
 import unittest
 import numpy as np
 import matplotlib
@@ -99,6 +101,107 @@ class TestPoints(unittest.TestCase):
         self.assertTrue(np.allclose(col3, dd3.get(space.xyz)))
         self.assertTrue(np.allclose(col4, dd4.get(space.xyz)))
 
+    def test_get_out(self):
+        out = np.zeros(col4.shape)
+        res = d4.get(space.din99, out=out)
+        self.assertTrue(res is out)
+        self.assertTrue(np.allclose(out, d4.get(space.din99)))
+        ws = space.Workspace()
+        f1 = data.Points(space.cielab, d4.get(space.cielab), workspace=ws)
+        ipt1 = f1.get(space.ipt)
+        self.assertTrue(np.allclose(ipt1, d4.get(space.ipt)))
+        f2 = data.Points(space.cielab, d4.get(space.cielab)[::-1],
+                         workspace=ws)
+        self.assertTrue(np.shares_memory(f2.get(space.ipt), ipt1))
+        f3 = data.Points(space.cielab, d3.get(space.cielab), workspace=ws)
+        self.assertTrue(np.allclose(f3.get(space.ipt), d3.get(space.ipt)))
+        self.assertTrue(np.allclose(f3.get(space.xyz), col3))
+
+    def test_plan(self):
+        d = data.Points(space.xyz, col4)
+        xyz_ = d.get_flattened(space.xyz)
+        self.assertEqual(d.plan(space.cielch),
+                         [space.xyz, space.cielab, space.cielch])
+        d.get(space.cielab)
+        self.assertEqual(d.plan(space.cielch), [space.cielab, space.cielch])
+        lch = d.get(space.cielch)
+        self.assertEqual(d.paths[space.cielch], [space.cielab, space.cielch])
+        self.assertTrue(np.allclose(d.flatten(lch),
+                                    space.cielch.from_XYZ(xyz_)))
+        order = list(d.data)
+        self.assertEqual(d.plan(space.ciede00lch)[0], space.cielab)
+        self.assertEqual(list(d.data), order)
+        self.assertTrue(np.allclose(d.get_flattened(space.ciede00lch),
+                                    space.ciede00lch.from_XYZ(xyz_)))
+        self.assertEqual(d.plan(space.FusedChain(space.ipt))[0], space.xyz)
+
+    def test_lazy_XYZ(self):
+        lab = space.cielab.from_XYZ(col3)
+        d1 = data.Points(space.cielab, lab)
+        d2 = data.Points(space.cielab, lab[::-1])
+        self.assertTrue(np.allclose(d1.get(space.cielch),
+                                    space.cielch.from_XYZ(col3)))
+        v = data.Vectors(space.cielab, d2.get(space.cielab) - lab, d1)
+        self.assertTrue(np.allclose(v.get(space.cielab), lab[::-1] - lab))
+        self.assertFalse(space.xyz in d1.data)
+        self.assertFalse(space.xyz in v.vectors)
+        self.assertTrue(np.allclose(d1.get(space.xyz), col3))
+        self.assertTrue(space.xyz in d1.data)
+
+    def test_cache_policy(self):
+        rgb = np.random.rand(10, 3)
+        policy = data.CachePolicy(budget=3 * rgb.nbytes, cache_private=False)
+        d = data.Points(space.srgb, rgb, cache_policy=policy)
+        lab = d.get(space.cielab)
+        d.get(space.cieluv)
+        self.assertFalse(space.cielab in d.data)
+        self.assertTrue(space.cieluv in d.data)
+        self.assertTrue(space.srgb in d.data and space.xyz in d.data)
+        self.assertTrue(d.data.nbytes <= policy.budget)
+        self.assertTrue(np.allclose(d.get(space.cielab), lab))
+        jac = space.din99d.jacobian_XYZ(d)
+        self.assertFalse(any(sp.private for sp in d.data))
+        self.assertTrue(np.allclose(
+            jac, space.din99d.jacobian_XYZ(data.Points(space.srgb, rgb))))
+        v = data.Vectors(space.cielab, np.random.rand(10, 3), d)
+        self.assertTrue(v.vectors.policy is policy)
+
+    def test_dtype(self):
+        xyz_ = space.srgb.to_XYZ(np.random.rand(100, 3))
+        d64 = data.Points(space.xyz, xyz_)
+        d32 = data.Points(space.xyz, xyz_, dtype=np.float32)
+        for sp in [space.cielab, space.cieluv, space.cielch, space.ipt,
+                   space.din99d, space.srgb, space.lgj_e]:
+            c32 = d32.get(sp)
+            c64 = d64.get(sp)
+            self.assertEqual(c32.dtype, np.float32)
+            scale = max(1, np.max(np.abs(c64)))
+            self.assertTrue(np.max(np.abs(c32 - c64)) < 1e-5 * scale)
+            back = data.Points(sp, c32, dtype=np.float32).get(space.xyz)
+            self.assertEqual(back.dtype, np.float32)
+            self.assertTrue(np.max(np.abs(back - xyz_)) < 1e-5)
+            jac32 = sp.jacobian_XYZ(d32)
+            jac64 = sp.jacobian_XYZ(d64)
+            self.assertEqual(jac32.dtype, np.float32)
+            self.assertTrue(np.max(np.abs(jac32 - jac64)) <
+                            1e-4 * np.max(np.abs(jac64)))
+        t32 = data.Tensors(space.xyz, np.array([np.eye(3)] * 100), d32)
+        self.assertEqual(t32.get(space.cielab).dtype, np.float32)
+        for sp in [space.srgb, space.rgb_adobe]:
+            im = (np.random.rand(10, 3) * 255).astype(np.uint8)
+            xyz32 = data.Points(sp, im, dtype=np.float32).get(space.xyz)
+            self.assertEqual(xyz32.dtype, np.float32)
+            self.assertTrue(np.allclose(xyz32, data.Points(sp, im).get(
+                space.xyz), atol=1e-6))
+            self.assertEqual(sp.to_XYZ(im).dtype, np.float64)
+        try:
+            data.set_default_dtype(np.float32)
+            self.assertEqual(data.Points(space.xyz, col3).dtype, np.float32)
+        finally:
+            data.set_default_dtype(np.float64)
+        self.assertEqual(data.Points(space.xyz, col3).dtype, np.float64)
+        self.assertRaises(ValueError, data.set_default_dtype, np.int32)
+
     def test_new_white_point(self):
         self.assertTrue(
             np.allclose(
@@ -109,6 +212,42 @@ class TestPoints(unittest.TestCase):
                     data.white_D50).get(space.cielab)))
 
 
+class TestMappedPoints(unittest.TestCase):
+
+    def test_get(self):
+        im = np.random.randint(0, 256, (20, 15, 3)).astype(np.uint8)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'im.npy')
+            np.save(filename, im)
+            mp = data.MappedPoints(space.srgb, filename, directory,
+                                   chunk_size=37)
+            p = data.Points(space.srgb, im)
+            lch = mp.get(space.cielch)
+            self.assertTrue(isinstance(lch, np.memmap))
+            self.assertTrue(os.path.exists(mp.files[space.cielch]))
+            self.assertTrue(np.allclose(lch, p.get(space.cielch)))
+            self.assertTrue(np.allclose(mp.get(space.xyz), p.get(space.xyz)))
+            out = np.zeros(im.shape)
+            self.assertTrue(mp.get(space.ipt, out=out) is out)
+            self.assertTrue(np.allclose(out, p.get(space.ipt)))
+            self.assertFalse(space.ipt in mp.data)
+            del lch, mp
+
+    def test_evicted(self):
+        im = np.random.rand(20, 3)
+        with tempfile.TemporaryDirectory() as directory:
+            mp = data.MappedPoints(space.srgb, im, directory,
+                                   cache_policy=data.CachePolicy(budget=1))
+            p = data.Points(space.srgb, im)
+            lab = mp.get(space.cielab)
+            mp.get(space.ipt)
+            lab2 = mp.get(space.cielab)
+            mp.get(space.ipt)
+            self.assertTrue(np.allclose(lab, p.get(space.cielab)))
+            self.assertTrue(np.allclose(lab2, p.get(space.cielab)))
+            del lab, lab2, mp
+
+
 class TestVectors(unittest.TestCase):
 
     def test_get(self):
@@ -206,6 +345,21 @@ class TestFunctions(unittest.TestCase):
         dd = d.get(space.xyz)
         self.assertEqual(dd.shape, (1000, 3))
 
+    def test_grid_points(self):
+        x, y, z = np.linspace(0, 1, 4), np.linspace(0, 1, 5), [0.2, 0.7]
+        grid = data.GridPoints(space.srgb, x, y, z, chunk_size=7)
+        self.assertEqual(len(grid), 40)
+        self.assertEqual(len(list(grid.chunks())), 6)
+        d = grid.points()
+        self.assertTrue(np.all(d.get(space.srgb)[5] == [0, 0.5, 0.7]))
+        self.assertTrue(np.all(grid.coordinates(np.array([5, 39])) ==
+                               d.get(space.srgb)[[5, 39]]))
+        lab = grid.get(space.cielab)
+        self.assertTrue(np.allclose(lab, d.get(space.cielab)))
+        out = np.zeros((4, 5, 2, 3))
+        grid.get(space.cielab, out)
+        self.assertTrue(np.allclose(out.reshape((-1, 3)), lab))
+
     def test_g_functions(self):
         for func in [data.g_MacAdam, data.g_three_observer,
                      data.g_Melgosa_Lab, data.g_Melgosa_xyY]:
@@ -220,3 +374,32 @@ class TestFunctions(unittest.TestCase):
         self.assertIsInstance(r, dict)
         r = data.m_rit_dupont_T50()
         self.assertIsInstance(r, dict)
+
+    def test_load_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data.set_dataset_cache_dir(os.path.join(tmp, 'cache'))
+            try:
+                fname = os.path.join(tmp, 'data.csv')
+                with open(fname, 'w') as f:
+                    f.write('1,2,3\n4,,6\n')
+                d = data.read_csv_file(fname, pad=0)
+                self.assertTrue(np.all(d == [[1, 2, 3], [4, 0, 6]]))
+                self.assertEqual(len(os.listdir(os.path.join(tmp, 'cache'))),
+                                 1)
+                d = data.load_dataset(fname, None)     # from the cache
+                self.assertTrue(np.isnan(d[1, 1]))
+                with open(fname, 'w') as f:
+                    f.write('7,8,9\n')
+                d = data.read_csv_file(fname)
+                self.assertTrue(np.all(d == [[7, 8, 9]]))
+                self.assertEqual(len(os.listdir(os.path.join(tmp, 'cache'))),
+                                 1)
+            finally:
+                data.set_dataset_cache_dir(None)
+        g = data.g_BFD('P')
+        self.assertIsNot(g, data.g_BFD('P'))
+        g.get(space.cielab)[...] = 0
+        self.assertTrue(np.all(data.g_BFD('P').get(space.cielab) != 0))
+        raw = data.load_dataset('tensor_data/BFD_P.txt', None)
+        self.assertIs(raw, data.load_dataset('tensor_data/BFD_P.txt', None))
+        self.assertFalse(raw.flags.writeable)
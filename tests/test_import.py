@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_import: Unittests for the lazy imports of the colourlab package.
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import os
+import sys
+import subprocess
+import unittest
+import colourlab
+
+# Import the conversion modules in a fresh interpreter, and list the heavy
+# dependencies that were imported
+_script = '''
+import sys
+import colourlab
+from colourlab import space, data, metric, tensor
+space.cielab.from_XYZ(space.srgb.to_XYZ([[.1, .2, .3]]))
+print(' '.join(m for m in ('matplotlib', 'scipy', 'numba')
+               if m in sys.modules))
+'''
+
+
+class TestImport(unittest.TestCase):
+
+    def test_lazy_dependencies(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [root] + [p for p in [env.get('PYTHONPATH')] if p])
+        res = subprocess.run([sys.executable, '-c', _script], env=env,
+                             stdout=subprocess.PIPE, check=True)
+        self.assertEqual(res.stdout.decode().strip(), '')
+
+    def test_lazy_submodules(self):
+        for name in colourlab.__all__:
+            self.assertTrue(name in dir(colourlab))
+            self.assertEqual(getattr(colourlab, name).__name__,
+                             'colourlab.' + name)
+        self.assertRaises(AttributeError, getattr, colourlab, 'nonexistent')
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_instrument: Unittests for all functions in the instrument module.
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import threading
+import unittest
+import numpy as np
+from colourlab import instrument, space, data, parallel
+
+xyz_ = space.srgb.to_XYZ(np.random.rand(10, 3))
+
+
+class TestInstrument(unittest.TestCase):
+
+    def test_collect(self):
+        reports = []
+        instrument.add_hook(reports.append)
+        try:
+            self.assertFalse(instrument.enabled)
+            with instrument.collect() as report:
+                self.assertTrue(instrument.enabled)
+                dat = data.Points(space.xyz, xyz_)
+                dat.get(space.cielch)
+                dat.get(space.cielch)
+                space.srgb.to_XYZ(xyz_)
+                space.cielab.jacobian_XYZ(dat)
+            self.assertFalse(instrument.enabled)
+        finally:
+            instrument.remove_hook(reports.append)
+        self.assertEqual(reports, [report])
+        rec = report.records[(space.cielch, 'get')]
+        self.assertEqual((rec.calls, rec.hits, rec.misses), (2, 1, 1))
+        rec = report.records[(space.cielab, 'from_base')]
+        self.assertEqual((rec.calls, rec.elements), (1, 10))
+        self.assertEqual(report.records[(space.cielch, 'cache')].nbytes,
+                         xyz_.nbytes)
+        self.assertTrue((space.srgb, 'to_base') in report.records)
+        self.assertEqual(
+            report.records[(space.cielab, 'jacobian_base')].elements, 10)
+        rows = report.rows()
+        self.assertEqual(len(rows), len(report.records))
+        self.assertTrue('cielch' in [row['space'] for row in rows])
+        self.assertTrue('cielch' in str(report))
+
+    def test_threads(self):
+        def convert():
+            space.cielab.from_XYZ(xyz_)
+
+        with instrument.collect() as report:
+            thread = threading.Thread(target=convert)
+            thread.start()
+            thread.join()
+        self.assertFalse((space.cielab, 'from_base') in report.records)
+        with instrument.collect(all_threads=True) as report:
+            thread = threading.Thread(target=convert)
+            thread.start()
+            thread.join()
+        self.assertTrue((space.cielab, 'from_base') in report.records)
+        with instrument.collect() as report:
+            with parallel.using(2, 4):
+                convert()
+        rec = report.records[(space.cielab, 'from_base')]
+        self.assertEqual((rec.calls, rec.elements), (3, 10))
+
+    def test_evictions(self):
+        policy = data.CachePolicy(budget=2 * xyz_.nbytes)
+        with instrument.collect() as report:
+            dat = data.Points(space.xyz, xyz_, cache_policy=policy)
+            dat.get(space.cielab)
+            dat.get(space.cieluv)
+        rec = report.records[(space.cielab, 'cache')]
+        self.assertEqual((rec.calls, rec.nbytes, rec.evictions), (1, 0, 1))
+        rec = report.records[(space.cieluv, 'cache')]
+        self.assertEqual((rec.nbytes, rec.evictions), (xyz_.nbytes, 0))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_linalg: Unittests for all functions in the linalg module.
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import unittest
+import numpy as np
+from colourlab import linalg
+
+# Test data
+
+m = np.random.rand(100, 3, 3) - .5
+m_sing = np.array([[[1., 2, 3], [2, 4, 6], [0, 1, 0]],
+                   [[1., 0, 0], [0, 1, 0], [0, 0, 1]]])
+tetra = np.random.rand(50, 4, 3)
+
+
+class TestLinalg(unittest.TestCase):
+
+    def test_det3(self):
+        self.assertTrue(np.allclose(linalg.det3(m), np.linalg.det(m)))
+
+    def test_inv3(self):
+        self.assertTrue(np.allclose(linalg.inv3(m), np.linalg.inv(m)))
+        inv = linalg.inv3(m_sing)
+        self.assertTrue(np.all(np.isnan(inv[0])))
+        self.assertTrue(np.allclose(inv[1], np.eye(3)))
+        inv32 = linalg.inv3(m.astype(np.float32))
+        self.assertEqual(inv32.dtype, np.float32)
+        self.assertTrue(np.allclose(inv32, np.linalg.inv(m), rtol=1e-4,
+                                    atol=1e-4))
+
+    def test_singular(self):
+        self.assertEqual(list(linalg.singular(m_sing)), [True, False])
+        self.assertFalse(np.any(linalg.singular(m + 10 * np.eye(3))))
+
+    def test_orientation(self):
+        mat = np.ones((50, 4, 4))
+        mat[:, :3, :] = np.transpose(tetra, (0, 2, 1))
+        self.assertTrue(np.allclose(linalg.orientation(tetra),
+                                    np.linalg.det(mat)))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_lut: Unittests for all functions in the lut module.
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from colourlab import lut, space
+
+# Test data
+
+col = np.random.rand(200, 3)
+col8 = np.random.randint(0, 256, (10, 20, 3)).astype(np.uint8)
+lut_tetra = lut.LUT3D(space.srgb, space.cielab, size=33)
+lut_tri = lut.LUT3D(space.srgb, space.cielab, size=33,
+                    interpolation='trilinear')
+
+
+class TestLUT3D(unittest.TestCase):
+
+    def test_grid_exact(self):
+        grid = lut_tetra.grid()
+        exact = space.cielab.from_XYZ(space.srgb.to_XYZ(grid.reshape(-1, 3)))
+        for lt in [lut_tetra, lut_tri]:
+            self.assertTrue(np.allclose(lt.apply(grid).reshape(-1, 3), exact))
+
+    def test_apply(self):
+        exact = space.cielab.from_XYZ(space.srgb.to_XYZ(col))
+        for lt in [lut_tetra, lut_tri]:
+            res = lt.apply(col)
+            self.assertEqual(res.shape, col.shape)
+            self.assertTrue(np.max(np.abs(res - exact)) < 1)
+            index, frac = lt.positions(col)
+            res_np = getattr(lt, lt.interpolation)(index, frac)
+            self.assertTrue(np.allclose(res, res_np))
+            res8 = lt.apply(col8)
+            self.assertEqual(res8.shape, col8.shape)
+            self.assertTrue(np.allclose(res8, lt.apply(col8 / 255.)))
+            res16 = lt.apply(col8.astype(np.uint16) * 257)
+            self.assertTrue(np.allclose(res16, res8))
+
+    def test_linear(self):
+        lt = lut.LUT3D(space.xyz, space._ipt_lms, size=5,
+                       domain=[[0, 0, 0], [2, 2, 2]])
+        data = 2 * col
+        self.assertTrue(np.allclose(lt.apply(data),
+                                    space._ipt_lms.from_XYZ(data)))
+
+    def test_error(self):
+        err_tetra = lut_tetra.error()
+        err_tri = lut_tri.error()
+        self.assertTrue(err_tetra['max'] < 1)
+        self.assertTrue(err_tri['max'] < 1)
+        self.assertTrue(err_tetra['mean'] <= err_tetra['max'])
+        self.assertEqual(err_tetra['argmax'].shape, (3, ))
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = os.path.join(tmp, 'lut.npz')
+            lut_tri.save(fname)
+            lt = lut.LUT3D.load(fname)
+            self.assertEqual(lt.interpolation, 'trilinear')
+            self.assertTrue(np.allclose(lt.apply(col), lut_tri.apply(col)))
+            fname = os.path.join(tmp, 'lut.cube')
+            lut_tetra.save_cube(fname, title='sRGB to CIELAB')
+            lt = lut.LUT3D.load_cube(fname, space.srgb, space.cielab)
+            self.assertTrue(np.allclose(lt.table, lut_tetra.table))
+            self.assertTrue(np.allclose(lt.apply(col), lut_tetra.apply(col)))
@@ -19,6 +19,7 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import gc
 import unittest
 import numpy as np
 from colourlab import metric, data, space, tensor
@@ -41,3 +42,43 @@ class TestMetrics(unittest.TestCase):
             self.assertTrue(np.max(met(d1, d2) < 5))
         self.assertTrue(np.max(metric.linear(space.cielab, d1, d2, tensor.dE_ab)) < 2)
         self.assertTrue(np.max(metric.poincare_disk(poincare_space, d1, d2) < 2))
+
+    def test_linear(self):
+        d = metric.linear(space.cielab, d1, d2, tensor.dE_ab)
+        self.assertTrue(np.allclose(d, metric.dE_ab(d1, d2)))
+        mid = metric.midpoints(space.cielab, d1, d2)
+        self.assertIs(mid, metric.midpoints(space.cielab, d1, d2))
+        self.assertTrue(np.allclose(mid.get(space.cielab),
+                                    d1.get(space.cielab) + .5 / np.sqrt(3)))
+        d3 = data.Points(space.cielab, d2.get(space.cielab))
+        self.assertIsNot(mid, metric.midpoints(space.cielab, d1, d3))
+        self.assertEqual(len(metric._midpoints[d1]), 2)
+        del d3
+        gc.collect()
+        self.assertEqual(len(metric._midpoints[d1]), 1)
+
+    def test_pairwise(self):
+        e1 = data.Points(space.cielab, d1.get(space.cielab)[:30])
+        e2 = data.Points(space.cielab, d2.get(space.cielab)[:20])
+        dist = metric.pairwise(e1, e2, metric.dE_00, block_size=64)
+        self.assertEqual(dist.shape, (30, 20))
+        row = data.Points(space.cielab, np.tile(e1.get(space.cielab)[3],
+                                                (20, 1)))
+        self.assertTrue(np.allclose(dist[3], metric.dE_00(row, e2)))
+        dist32 = metric.pairwise(e1, e2, metric.dE_00, dtype=np.float32)
+        self.assertEqual(dist32.dtype, np.float32)
+        self.assertTrue(np.allclose(dist32, dist, atol=1e-3))
+        index, near = metric.pairwise(e1, e2, metric.dE_00, nearest=3,
+                                      block_size=8)
+        self.assertTrue(np.all(near == np.sort(dist, axis=1)[:, :3]))
+        self.assertTrue(np.all(np.take_along_axis(dist, index, 1) == near))
+        for rows, cols, block in metric.pairwise_blocks(
+                e1, e2, metric.dE_00, block_size=64):
+            self.assertTrue(np.all(block == dist[rows, cols]))
+        dist = metric.pairwise(e1, e2, metric.euclidean, sp=space.cielab)
+        self.assertTrue(np.allclose(dist, metric.pairwise(e1, e2)))
+        rgb1 = data.Points(space.srgb, np.array([[0, 0, 0], [3, 4, 0]],
+                                                np.uint8))
+        dist = metric.pairwise(rgb1, rgb1, metric.euclidean, sp=space.srgb)
+        self.assertEqual(dist.dtype, np.float32)
+        self.assertTrue(np.all(dist == [[0, 5], [5, 0]]))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_parallel: Unittests for all functions in the parallel module.
+
+Copyright (C) 2017 Ivar Farup
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at
+your option) any later version.
+
+This program is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import unittest
+from concurrent import futures
+import numpy as np
+from colourlab import parallel, space, data, metric, tensor
+
+xyz_ = space.srgb.to_XYZ(np.random.rand(1000, 3) * .9 + .05)
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_executor(self):
+        test_spaces = [space.cielab, space.cielch, space.din99d, space.srgb,
+                       space.ipt, space.FusedChain(space.din99d)]
+        serial = [sp.from_XYZ(xyz_) for sp in test_spaces]
+        dat = data.Points(space.xyz, xyz_)
+        dat2 = data.Points(space.xyz, xyz_[::-1])
+        serial += [metric.dE_00(dat, dat2), tensor.dE_00(dat).get(space.xyz)]
+        try:
+            parallel.set_executor(2, chunk_size=64)
+            self.assertTrue(isinstance(parallel.get_executor(),
+                                       futures.ThreadPoolExecutor))
+            res = [sp.from_XYZ(xyz_) for sp in test_spaces]
+            for sp, col in zip(test_spaces, res):
+                self.assertTrue(np.allclose(sp.to_XYZ(col), xyz_))
+            out = np.zeros(np.shape(xyz_))
+            self.assertTrue(space.cielab.from_XYZ(xyz_, out=out) is out)
+            dat = data.Points(space.xyz, xyz_)
+            dat2 = data.Points(space.xyz, xyz_[::-1])
+            self.assertTrue(np.allclose(dat.get(space.din99d), serial[2]))
+            res += [metric.dE_00(dat, dat2), tensor.dE_00(dat).get(space.xyz)]
+        finally:
+            parallel.set_executor(None)
+        for r1, r2 in zip(serial, res):
+            self.assertTrue(np.allclose(r1, r2))
+        with futures.ThreadPoolExecutor(3) as ex:
+            self.assertTrue(np.allclose(
+                space.cielab.from_XYZ(xyz_, executor=ex), serial[0]))
+            self.assertTrue(np.allclose(
+                metric.dE_00(dat, dat2, executor=ex), serial[-2]))
+
+    def test_current(self):
+        self.assertEqual(parallel.current(), (None, None))
+        self.assertEqual(parallel.current(1), (None, None))
+        ex = parallel.current(4)[0]
+        self.assertTrue(parallel.current(4)[0] is ex)
+        with parallel.using(ex, 10):
+            self.assertEqual(parallel.current(), (ex, 10))
+            with parallel.using(1):
+                self.assertEqual(parallel.current(), (None, None))
+            with parallel.using(None):
+                self.assertEqual(parallel.current(), (ex, 10))
+            chunks = []
+            parallel.run_chunks(chunks.append, 35)
+            self.assertEqual(sorted(c.start for c in chunks), [0, 10, 20, 30])
+        self.assertEqual(parallel.current(), (None, None))
+        self.assertTrue(parallel.chunk_size(10**7, 48, ex) >=
+                        parallel.MIN_CHUNK)
+        self.assertEqual(parallel.chunk_size(10, 48, ex), parallel.MIN_CHUNK)
+
+    def test_calibrate(self):
+        ex = parallel.current(2)[0]
+        rows = np.zeros(5 * 10**4, int)
+
+        def add_one(chunk):
+            rows[chunk] += 1
+
+        parallel.run_chunks(add_one, len(rows), 10**4, ex)
+        self.assertTrue(np.all(rows == 1))
+        key = parallel.kernel_key(add_one, 10**4, ex)
+        self.assertTrue(parallel._tuned[key] in (.25, .5, 1., 2.))
+        parallel.run_chunks(add_one, len(rows), 10**4, ex)
+        self.assertTrue(np.all(rows == 2))
@@ -19,9 +19,12 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import gc
+import pickle
+import weakref
 import unittest
 import numpy as np
-from colourlab import space, data
+from colourlab import space, space_core, data
 
 # Spaces and data for testing
 
@@ -77,3 +80,231 @@ class TestSpace(unittest.TestCase):
                 prod[i] = np.abs(prod[i] - np.eye(3))
             err = np.max(prod)
             self.assertTrue(err < 1e-6)
+
+    def test_inv_jacobians_base(self):
+        xyz_ = space.srgb.to_XYZ(np.random.rand(20, 3) * .9 + .05)
+        col_data = data.Points(space.xyz, xyz_)
+        test_spaces = [space.xyY, space.cielab, space.cieluv, space.cielch,
+                       space.ipt, space.ciede00lch, space.din99b,
+                       space.din99c, space.din99d, space.srgb,
+                       space.rgb_adobe, space.lgj_e,
+                       _test_space_cartesian,
+                       space.TransformPoincareDisk(space.cielab, 100.)]
+        for test_sp in test_spaces:
+            sp = test_sp
+            while isinstance(sp, space.Transform):
+                jac = sp.jacobian_base(col_data)
+                inv_jac = sp.inv_jacobian_base(col_data)
+                self.assertTrue(np.allclose(inv_jac, np.linalg.inv(jac),
+                                            rtol=1e-6, atol=1e-10))
+                sp = sp.base
+
+    def test_out(self):
+        col_data = data.Points(space.xyz, col)
+        for sp in [space.xyz, space.cielch, space.din99d, space.srgb,
+                   space.lgj_e, _test_ui]:
+            out = np.zeros(np.shape(col))
+            c1 = sp.from_XYZ(col)
+            self.assertTrue(sp.from_XYZ(col, out=out) is out)
+            self.assertTrue(np.allclose(out, c1))
+            self.assertTrue(sp.to_XYZ(out, out=out) is out)
+            self.assertTrue(np.allclose(out, sp.to_XYZ(c1)))
+            jac = np.zeros((np.shape(col)[0], 3, 3))
+            self.assertTrue(sp.jacobian_XYZ(col_data, out=jac) is jac)
+            self.assertTrue(np.allclose(jac, sp.jacobian_XYZ(col_data)))
+            sp.inv_jacobian_XYZ(col_data, out=jac)
+            self.assertTrue(np.allclose(jac, sp.inv_jacobian_XYZ(col_data)))
+        ws = space.Workspace()
+        arr = ws.array(space.cielab, (3, 3))
+        self.assertTrue(ws.array(space.cielab, (3, 3)) is arr)
+        self.assertFalse(ws.array(space.cielab, (4, 3)) is arr)
+        self.assertEqual(ws.nbytes(), 4 * 3 * 8)
+
+    def test_tape(self):
+        test_spaces = [space.xyz, space.cielch, space.ipt, space.din99d,
+                       space.srgb, space.lgj_e, space.ciede00lch,
+                       _test_ui, _test_space_poincare_disk,
+                       space.FusedChain(space.din99d)]
+        for sp in test_spaces:
+            col_data = data.Points(space.xyz, col)
+            ndata, jac, inv_jac = sp.tape_XYZ(col_data)
+            if sp is not space.xyz:
+                self.assertFalse(sp in col_data.data)
+            self.assertTrue(np.allclose(ndata, sp.from_XYZ(col)))
+            self.assertTrue(np.allclose(jac, sp.jacobian_XYZ(col_data)))
+            self.assertTrue(np.allclose(inv_jac,
+                                        sp.inv_jacobian_XYZ(col_data)))
+
+    def test_pickle(self):
+        for sp in [space.xyz, space.cielab, space.din99d, space._din99d_lab]:
+            self.assertTrue(pickle.loads(pickle.dumps(sp)) is sp)
+        sp = pickle.loads(pickle.dumps(_test_ui))
+        self.assertEqual(sp, _test_ui)
+        self.assertTrue(sp.base.base.base is space.xyz)
+        fused = pickle.loads(pickle.dumps(space.FusedChain(space.din99d)))
+        self.assertTrue(np.allclose(fused.from_XYZ(col),
+                                    space.din99d.from_XYZ(col)))
+        col_data = data.Points(space.xyz, col)
+        lab = col_data.get(space.cielab)
+        col_data = pickle.loads(pickle.dumps(col_data))
+        self.assertTrue(space.cielab in col_data.data)
+        self.assertTrue(np.allclose(col_data.get(space.cielab), lab))
+
+    def test_int_encoded(self):
+        im8 = np.random.randint(0, 256, (10, 10, 3)).astype(np.uint8)
+        im16 = np.random.randint(0, 65536, (20, 3)).astype(np.uint16)
+        for sp in [space.srgb, space.rgb_adobe]:
+            self.assertTrue(np.allclose(sp.to_XYZ(im8), sp.to_XYZ(im8 / 255.)))
+            self.assertTrue(np.allclose(sp.to_XYZ(im16),
+                                        sp.to_XYZ(im16 / 65535.)))
+            self.assertTrue(np.allclose(
+                data.Points(sp, im8).get(space.cielab),
+                data.Points(sp, im8 / 255.).get(space.cielab)))
+        self.assertEqual(len(space.srgb.int_table(np.uint8)), 256)
+
+    def test_fused_chain(self):
+        test_spaces = [space.xyz, space.xyY, space.cielab,
+                       space.cieluv, space.cielch, space.ipt,
+                       space.din99, space.din99b, space.din99c,
+                       space.din99d, space.srgb, space.rgb_adobe,
+                       _test_ui, _test_space_cartesian,
+                       _test_space_poincare_disk, _test_space_gamma]
+        for sp in test_spaces:
+            fused = space.FusedChain(sp)
+            c1 = sp.from_XYZ(col)
+            c2 = fused.from_XYZ(col)
+            self.assertTrue(np.allclose(c1, c2))
+            self.assertTrue(np.allclose(sp.to_XYZ(c1), fused.to_XYZ(c2)))
+        out = np.zeros(np.shape(col))
+        res = space.FusedChain(space.din99d).from_XYZ(col, out=out)
+        self.assertTrue(res is out)
+        self.assertTrue(np.allclose(out, space.din99d.from_XYZ(col)))
+        fused = space.FusedChain(space.TransformLinear(space.ciecat02,
+                                                       2 * np.eye(3)))
+        self.assertEqual(len(fused.stages), 1)
+        self.assertTrue(np.allclose(fused.stages[0].M, 2 * space.ciecat02.M))
+
+    def test_structural_equality(self):
+        lab = space.TransformCIELAB(space.xyz)
+        self.assertEqual(lab, space.cielab)
+        self.assertEqual(hash(lab), hash(space.cielab))
+        self.assertTrue(space.intern(lab) is space.cielab)
+        self.assertNotEqual(space.TransformCIELAB(space.xyz,
+                                                  space.xyz.white_D50),
+                            space.cielab)
+        self.assertNotEqual(space.TransformGamma(space.xyz, .5),
+                            _test_space_gamma)
+        self.assertEqual(space.TransformGamma(space.xyz, .43),
+                         _test_space_gamma)
+        col_data = data.Points(space.xyz, col)
+        lab_ndata = col_data.get(space.cielab)
+        self.assertTrue(col_data.get(lab) is lab_ndata)
+        d65 = data.Points(space.xyz, space.xyz.white_D65)
+        d50 = data.Points(space.xyz, space.xyz.white_D50)
+        p1 = col_data.new_white_point(space.srgb, d65, d50)
+        p2 = col_data.new_white_point(space.srgb, d65, d50)
+        self.assertTrue(p1.source is p2.source)
+        lin = space.intern(space.TransformLinear(space.xyz, 2 * np.eye(3)))
+        self.assertTrue(space.intern(space.TransformLinear(
+            space.xyz, 2 * np.eye(3))) is lin)
+        ref = weakref.ref(lin)
+        del lin
+        gc.collect()
+        self.assertTrue(ref() is None)
+
+    def test_identity_equality(self):
+
+        class Scale(space.Transform):
+
+            def __init__(self, base, scale):
+                super(Scale, self).__init__(base)
+                self.scale = scale
+
+            def to_base(self, ndata):
+                return ndata / self.scale
+
+            def from_base(self, ndata):
+                return ndata * self.scale
+
+        s1 = Scale(space.xyz, 1.)
+        s2 = Scale(space.xyz, 2.)
+        self.assertNotEqual(s1, s2)
+        self.assertNotEqual(hash(s1), hash(s2))
+        self.assertEqual(s1, s1)
+        self.assertTrue(space.intern(s2) is s2)
+        col_data = data.Points(space.xyz, np.ones((2, 3)))
+        self.assertTrue(np.all(col_data.get(s1) == 1))
+        self.assertTrue(np.all(col_data.get(s2) == 2))
+
+    def test_two_argument_transform(self):
+
+        class Scale(space.Transform):
+
+            def to_base(self, ndata):
+                return ndata / 2.
+
+            def from_base(self, ndata):
+                return ndata * 2.
+
+        sc = Scale(space.cielab)
+        lab = space.cielab.from_XYZ(col)
+        self.assertTrue(np.allclose(sc.from_XYZ(col), 2 * lab))
+        self.assertTrue(np.allclose(sc.to_XYZ(2 * lab), col))
+        out = np.empty_like(col)
+        self.assertTrue(sc.from_XYZ(col, out) is out)
+        self.assertTrue(np.allclose(out, 2 * lab))
+        self.assertTrue(np.allclose(space.FusedChain(sc).from_XYZ(col),
+                                    2 * lab))
+        col_data = data.Points(space.cielab, lab)
+        self.assertTrue(np.allclose(col_data.get(sc), 2 * lab))
+
+    @unittest.skipIf(not space_core.HAVE_NUMBA, 'numba not installed')
+    def test_backend(self):
+        xyz_ = space.srgb.to_XYZ(np.random.rand(50, 3) * .9 + .05)
+        xyz_[0] = 0
+        test_spaces = [space.xyY, space.cielab, space.cieluv, space.cielch,
+                       space.ciede00lch, space.srgb, space.rgb_adobe,
+                       space.din99, space.din99d, space.lgj_e,
+                       _test_space_cartesian, _test_space_gamma,
+                       space.TransformPoincareDisk(space.cielab, 100.)]
+        results = dict()
+        try:
+            for backend in ['numpy', 'numba']:
+                space.set_backend(backend)
+                self.assertEqual(space.get_backend(), backend)
+                col_data = data.Points(space.xyz, xyz_)
+                res = []
+                for sp in test_spaces:
+                    res += [sp.from_XYZ(xyz_), sp.jacobian_XYZ(col_data),
+                            sp.inv_jacobian_XYZ(col_data)]
+                    if sp is not space.ciede00lch:
+                        res.append(sp.to_XYZ(sp.from_XYZ(xyz_[1:])))
+                results[backend] = res
+        finally:
+            space.set_backend('numpy')
+        for r1, r2 in zip(results['numpy'], results['numba']):
+            self.assertTrue(np.allclose(r1, r2, rtol=1e-9, atol=1e-12,
+                                        equal_nan=True))
+        self.assertRaises(ValueError, space.set_backend, 'fortran')
+
+    def test_lgj_osa_inversion(self):
+        xyz_ = space.srgb.to_XYZ(np.random.rand(100, 3) * .9 + .05)
+        lgj = space.lgj_osa.from_base(xyz_)
+        xyz_newton, converged = space.lgj_osa.to_base_newton(lgj)
+        self.assertTrue(converged.all())
+        self.assertTrue(np.max(np.abs(xyz_newton - xyz_)) < 1e-8)
+        self.assertTrue(np.allclose(space.lgj_osa.to_base(lgj), xyz_))
+        lgj_fmin = space.TransformLGJOSA(space.xyz, inversion='fmin')
+        self.assertTrue(np.max(np.abs(lgj_fmin.to_base(lgj[:3]) -
+                                      xyz_[:3])) < 1e-3)
+
+    def test_lgj_osa_jacobian(self):
+        xyz_ = np.array([[.3, .4, .5], [.2, .25, .1], [.9, 1, 1.05]])
+        jac = space.lgj_osa.jacobian_base(data.Points(space.xyz, xyz_))
+        h = 1e-6
+        for j in range(3):
+            dx = np.zeros(3)
+            dx[j] = h
+            dlgj = (space.lgj_osa.from_base(xyz_ + dx) -
+                    space.lgj_osa.from_base(xyz_ - dx)) / (2 * h)
+            self.assertTrue(np.max(np.abs(jac[:, :, j] - dlgj)) < 1e-5)